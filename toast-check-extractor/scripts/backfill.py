@@ -149,7 +149,8 @@ def main() -> int:
 
         if args.refresh_views and loaded > 0:
             print("Refreshing materialized views...")
-            refresh_materialized_views(conn)
+            conn.commit()
+            refresh_materialized_views(args.database_url)
             print("Views refreshed.")
 
     return 0
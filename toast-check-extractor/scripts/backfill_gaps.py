@@ -214,10 +214,8 @@ def main() -> int:
     # Refresh materialized views if we loaded anything
     if args.refresh_views and load_ok > 0 and not args.extract_only:
         print("\nRefreshing materialized views...", flush=True)
-        import psycopg
         from schema import refresh_materialized_views
-        with psycopg.connect(args.database_url) as conn:
-            refresh_materialized_views(conn)
+        refresh_materialized_views(args.database_url)
         print("Views refreshed.", flush=True)
 
     print(f"\n{'='*60}", flush=True)
@@ -1,7 +1,8 @@
 """Incremental daily loader: finds and loads new files since last ETL run.
 
 Checks etl_load_log for the last loaded date, scans the output directory
-for new files, loads them, and refreshes materialized views.
+for new files, loads them, and refreshes the summary tables from the
+earliest newly loaded day onward.
 """
 
 from __future__ import annotations
@@ -15,7 +16,7 @@ from pathlib import Path
 
 from backfill import find_daily_files
 from loader import load_daily_file
-from schema import create_schema, refresh_materialized_views
+from schema import create_schema, refresh_delta
 
 
 def get_last_loaded_date(conn, restaurant_name: str) -> date | None:
@@ -87,24 +88,30 @@ def main() -> int:
 
         loaded = 0
         errors = 0
+        earliest_loaded: date | None = None
         for file_path in new_files:
             try:
                 result = load_daily_file(conn, file_path, args.restaurant)
                 loaded += 1
+                touched = [result["business_date"], *result["stale_dates_removed"]]
+                earliest_touched = date.fromisoformat(min(touched))
+                if earliest_loaded is None or earliest_touched < earliest_loaded:
+                    earliest_loaded = earliest_touched
                 print(
                     f"Loaded {result['business_date']}: "
                     f"{result['checks_loaded']} checks, {result['items_loaded']} items "
                     f"({result['duration_sec']}s)"
                 )
             except Exception as exc:
+                conn.rollback()
                 errors += 1
                 print(f"ERROR {file_path.name}: {exc}", file=sys.stderr)
 
         print(f"\nLoaded {loaded} files, {errors} errors")
 
-        if args.refresh_views and loaded > 0:
-            print("Refreshing materialized views...")
-            refresh_materialized_views(conn)
+        if args.refresh_views and earliest_loaded is not None:
+            print(f"Refreshing summary tables from {earliest_loaded}...")
+            refresh_delta(conn, earliest_loaded)
             print("Views refreshed.")
 
     return 0
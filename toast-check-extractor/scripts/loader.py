@@ -4,7 +4,7 @@ Processes one file at a time:
 1. Reads the daily JSON (envelope or bare list format)
 2. Auto-upserts dimension records (servers, revenue centers, menu items)
 3. Computes all derived columns
-4. Inserts/upserts checks, items, payments, discounts
+4. Bulk-loads checks, items, payments, discounts (binary COPY into staging + one upsert each)
 5. Tracks price changes in menu_item_prices
 6. Logs the load in etl_load_log
 
@@ -16,11 +16,12 @@ from __future__ import annotations
 import json
 import sys
 from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
 from typing import Any
 
+from schema import STAGING_COLUMNS, has_legacy_fact_tables
 from transforms import (
-    classify_meal_period,
     classify_menu_item,
     classify_party_size,
     dollars_to_cents,
@@ -36,6 +37,32 @@ def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# Binary COPY sends values as-is, so staging rows carry exactly the Python type
+# of each column (Postgres would otherwise have cast the text of the parameter).
+def _text(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _numeric(value: Any) -> Decimal | None:
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def _parse_iso_timestamp(value: Any) -> datetime | None:
+    """Parse the extractor's ISO-8601 extracted_at; naive values are taken as UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
 def _parse_business_date(file_path: Path, envelope: dict | None) -> date:
     """Extract business_date from the envelope or filename."""
     if envelope and envelope.get("from_date"):
@@ -145,14 +172,22 @@ def _track_price(
     )
 
 
-def _load_check(
+# One check's staging rows: the checks row, then its item, payment and discount
+# rows. Child rows leave out their leading check_id, known only after the merge.
+CheckRows = tuple[tuple, list[tuple], list[tuple], list[tuple]]
+
+
+def _check_rows(
     cur: Any, restaurant_id: int, record: dict, business_date: date,
-    menu_item_cache: dict,
-) -> tuple[int, int]:
-    """Load a single check record. Returns (check_id, items_loaded)."""
+    menu_item_cache: dict, loaded_at: datetime,
+) -> CheckRows | None:
+    """Build the staging rows for one check record, upserting its dimensions.
+
+    Rows follow schema.STAGING_COLUMNS. Returns None for records without a payment_id.
+    """
     payment_id = str(record.get("payment_id") or "").strip()
     if not payment_id:
-        return 0, 0
+        return None
 
     data = record.get("data") or {}
     metadata = record.get("metadata") or {}
@@ -168,12 +203,8 @@ def _load_check(
     server_id = _ensure_server(cur, restaurant_id, server_name, business_date)
     rev_center_id = _ensure_revenue_center(cur, restaurant_id, rev_center_name)
 
-    # Derived fields
-    hour_opened = time_opened.hour if time_opened else None
-    day_of_week = time_opened.weekday() if time_opened else None  # 0=Mon, 6=Sun
-    is_weekend = day_of_week >= 5 if day_of_week is not None else None
-    meal_period = classify_meal_period(hour_opened, day_of_week)
-
+    # hour_opened, day_of_week, is_weekend and meal_period are generated
+    # columns computed by Postgres from time_opened.
     guest_count = safe_int(data.get("guest_count"))
     party_size_category = classify_party_size(guest_count)
 
@@ -202,86 +233,19 @@ def _load_check(
     source = metadata.get("Source", "In Store")
     order_number = safe_int(metadata.get("Order #"))
 
-    # Upsert check
-    cur.execute(
-        """INSERT INTO checks (
-               restaurant_id, payment_id, check_number, business_date,
-               time_opened, time_closed, turnover_minutes,
-               server_id, revenue_center_id, server_name, revenue_center,
-               table_name, tab_name, guest_count,
-               subtotal, discount, tax, tip, gratuity, total,
-               hour_opened, meal_period, day_of_week, is_weekend,
-               party_size_category, tip_percentage, check_avg_per_guest,
-               has_discount, has_void,
-               source, order_number, extracted_at, raw_data, loaded_at
-           )
-           VALUES (
-               %s, %s, %s, %s,
-               %s, %s, %s,
-               %s, %s, %s, %s,
-               %s, %s, %s,
-               %s, %s, %s, %s, %s, %s,
-               %s, %s, %s, %s,
-               %s, %s, %s,
-               %s, %s,
-               %s, %s, %s, %s::jsonb, NOW()
-           )
-           ON CONFLICT (restaurant_id, payment_id) DO UPDATE SET
-               check_number = EXCLUDED.check_number,
-               business_date = EXCLUDED.business_date,
-               time_opened = EXCLUDED.time_opened,
-               time_closed = EXCLUDED.time_closed,
-               turnover_minutes = EXCLUDED.turnover_minutes,
-               server_id = EXCLUDED.server_id,
-               revenue_center_id = EXCLUDED.revenue_center_id,
-               server_name = EXCLUDED.server_name,
-               revenue_center = EXCLUDED.revenue_center,
-               table_name = EXCLUDED.table_name,
-               tab_name = EXCLUDED.tab_name,
-               guest_count = EXCLUDED.guest_count,
-               subtotal = EXCLUDED.subtotal,
-               discount = EXCLUDED.discount,
-               tax = EXCLUDED.tax,
-               tip = EXCLUDED.tip,
-               gratuity = EXCLUDED.gratuity,
-               total = EXCLUDED.total,
-               hour_opened = EXCLUDED.hour_opened,
-               meal_period = EXCLUDED.meal_period,
-               day_of_week = EXCLUDED.day_of_week,
-               is_weekend = EXCLUDED.is_weekend,
-               party_size_category = EXCLUDED.party_size_category,
-               tip_percentage = EXCLUDED.tip_percentage,
-               check_avg_per_guest = EXCLUDED.check_avg_per_guest,
-               has_discount = EXCLUDED.has_discount,
-               has_void = EXCLUDED.has_void,
-               source = EXCLUDED.source,
-               order_number = EXCLUDED.order_number,
-               extracted_at = EXCLUDED.extracted_at,
-               raw_data = EXCLUDED.raw_data,
-               loaded_at = NOW()
-           RETURNING check_id""",
-        (
-            restaurant_id, payment_id, safe_int(data.get("check_number")), business_date,
-            time_opened, time_closed, turnover_minutes,
-            server_id, rev_center_id, server_name, rev_center_name,
-            data.get("table"), data.get("tab_name"), guest_count,
-            subtotal, discount, tax, tip, gratuity, total,
-            hour_opened, meal_period, day_of_week, is_weekend,
-            party_size_category, tip_percentage, check_avg_per_guest,
-            has_discount, has_void,
-            source, order_number, record.get("extracted_at"),
-            json.dumps(record),
-        ),
+    check_row = (
+        restaurant_id, payment_id, safe_int(data.get("check_number")), business_date,
+        time_opened, time_closed, _numeric(turnover_minutes),
+        server_id, rev_center_id, _text(server_name), _text(rev_center_name),
+        _text(data.get("table")), _text(data.get("tab_name")), guest_count,
+        subtotal, discount, tax, tip, gratuity, total,
+        party_size_category, _numeric(tip_percentage), check_avg_per_guest,
+        has_discount, has_void,
+        _text(source), order_number, _parse_iso_timestamp(record.get("extracted_at")),
+        record, loaded_at,
     )
-    check_id = cur.fetchone()[0]
-
-    # Delete existing child rows for idempotent reload
-    cur.execute("DELETE FROM check_items WHERE check_id = %s", (check_id,))
-    cur.execute("DELETE FROM check_payments WHERE check_id = %s", (check_id,))
-    cur.execute("DELETE FROM check_discounts WHERE check_id = %s", (check_id,))
 
-    # Load items
-    items_loaded = 0
+    item_rows = []
     for idx, item in enumerate(items_list):
         item_name = item.get("item_name")
         unit_price_cents = dollars_to_cents(item.get("unit_price"))
@@ -297,92 +261,86 @@ def _load_check(
         # Track price (in cents)
         _track_price(cur, restaurant_id, menu_item_id, item_name, unit_price_cents, business_date)
 
-        cur.execute(
-            """INSERT INTO check_items (
-                   check_id, restaurant_id, menu_item_id, item_index,
-                   item_name, modifiers, quantity, unit_price, discount,
-                   line_total, line_tax, line_total_with_tax, voided, void_reason
-               )
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-               ON CONFLICT (check_id, item_index) DO UPDATE SET
-                   menu_item_id = EXCLUDED.menu_item_id,
-                   item_name = EXCLUDED.item_name,
-                   modifiers = EXCLUDED.modifiers,
-                   quantity = EXCLUDED.quantity,
-                   unit_price = EXCLUDED.unit_price,
-                   discount = EXCLUDED.discount,
-                   line_total = EXCLUDED.line_total,
-                   line_tax = EXCLUDED.line_tax,
-                   line_total_with_tax = EXCLUDED.line_total_with_tax,
-                   voided = EXCLUDED.voided,
-                   void_reason = EXCLUDED.void_reason""",
-            (
-                check_id, restaurant_id, menu_item_id, idx,
-                item_name, item.get("modifiers"), item.get("quantity"),
-                unit_price_cents, dollars_to_cents(item.get("discount")),
-                dollars_to_cents(item.get("line_total")), dollars_to_cents(item.get("line_tax")),
-                dollars_to_cents(item.get("line_total_with_tax")),
-                bool(item.get("voided")), item.get("reason"),
-            ),
+        item_rows.append((
+            business_date, restaurant_id, menu_item_id, idx,
+            _text(item_name), _text(item.get("modifiers")), _numeric(item.get("quantity")),
+            unit_price_cents, dollars_to_cents(item.get("discount")),
+            dollars_to_cents(item.get("line_total")), dollars_to_cents(item.get("line_tax")),
+            dollars_to_cents(item.get("line_total_with_tax")),
+            bool(item.get("voided")), _text(item.get("reason")),
+        ))
+
+    # Payments (monetary values in cents)
+    payment_rows = [
+        (
+            business_date, restaurant_id, idx,
+            _text(payment.get("payment_type")), parse_toast_datetime(payment.get("payment_date")),
+            dollars_to_cents(payment.get("amount")), dollars_to_cents(payment.get("tip")),
+            dollars_to_cents(payment.get("gratuity")), dollars_to_cents(payment.get("total")),
+            dollars_to_cents(payment.get("refund")), _text(payment.get("status")),
+            _text(payment.get("card_type")), _text(payment.get("card_last_4")),
         )
-        items_loaded += 1
+        for idx, payment in enumerate(data.get("payments") or [])
+    ]
 
-    # Load payments (monetary values in cents)
-    for idx, payment in enumerate(data.get("payments") or []):
-        payment_date = parse_toast_datetime(payment.get("payment_date"))
-        cur.execute(
-            """INSERT INTO check_payments (
-                   check_id, restaurant_id, payment_index,
-                   payment_type, payment_date, amount, tip, gratuity,
-                   total, refund, status, card_type, card_last_4
-               )
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-               ON CONFLICT (check_id, payment_index) DO UPDATE SET
-                   payment_type = EXCLUDED.payment_type,
-                   payment_date = EXCLUDED.payment_date,
-                   amount = EXCLUDED.amount,
-                   tip = EXCLUDED.tip,
-                   gratuity = EXCLUDED.gratuity,
-                   total = EXCLUDED.total,
-                   refund = EXCLUDED.refund,
-                   status = EXCLUDED.status,
-                   card_type = EXCLUDED.card_type,
-                   card_last_4 = EXCLUDED.card_last_4""",
-            (
-                check_id, restaurant_id, idx,
-                payment.get("payment_type"), payment_date,
-                dollars_to_cents(payment.get("amount")), dollars_to_cents(payment.get("tip")),
-                dollars_to_cents(payment.get("gratuity")), dollars_to_cents(payment.get("total")),
-                dollars_to_cents(payment.get("refund")), payment.get("status"),
-                payment.get("card_type"), payment.get("card_last_4"),
-            ),
+    # Discounts (amount in cents)
+    discount_rows = [
+        (
+            business_date, restaurant_id, idx,
+            _text(disc.get("name")), dollars_to_cents(disc.get("amount")),
+            parse_toast_datetime(disc.get("applied_date")),
+            _text(disc.get("approver")), _text(disc.get("reason")), _text(disc.get("comment")),
         )
+        for idx, disc in enumerate(data.get("discounts") or [])
+    ]
 
-    # Load discounts (amount in cents)
-    for idx, disc in enumerate(data.get("discounts") or []):
-        applied_date = parse_toast_datetime(disc.get("applied_date"))
-        cur.execute(
-            """INSERT INTO check_discounts (
-                   check_id, restaurant_id, discount_index,
-                   discount_name, amount, applied_date,
-                   approver, reason, comment
-               )
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-               ON CONFLICT (check_id, discount_index) DO UPDATE SET
-                   discount_name = EXCLUDED.discount_name,
-                   amount = EXCLUDED.amount,
-                   applied_date = EXCLUDED.applied_date,
-                   approver = EXCLUDED.approver,
-                   reason = EXCLUDED.reason,
-                   comment = EXCLUDED.comment""",
-            (
-                check_id, restaurant_id, idx,
-                disc.get("name"), dollars_to_cents(disc.get("amount")), applied_date,
-                disc.get("approver"), disc.get("reason"), disc.get("comment"),
-            ),
-        )
+    return check_row, item_rows, payment_rows, discount_rows
+
+
+def _load_checks(
+    conn: Any, cur: Any, restaurant_id: int, business_date: date,
+    rows_by_payment: dict[str, CheckRows],
+) -> list[date]:
+    """Merge a file's checks, then replace their child rows, one bulk load per table.
+
+    Returns the other business dates the file's payments were previously loaded under.
+    """
+    if not rows_by_payment:
+        return []
+    # The checks key includes business_date (the partition column), so a payment reloaded
+    # under a corrected date would be inserted beside its old row; remove that row first.
+    # Child rows go with it through ON DELETE CASCADE.
+    cur.execute(
+        """DELETE FROM checks
+           WHERE restaurant_id = %s AND payment_id = ANY(%s) AND business_date <> %s
+           RETURNING business_date""",
+        (restaurant_id, list(rows_by_payment), business_date),
+    )
+    stale_dates = sorted({row[0] for row in cur.fetchall()})
+    bulk_load(conn, "checks", [rows[0] for rows in rows_by_payment.values()])
+    cur.execute(
+        """SELECT payment_id, check_id FROM checks
+           WHERE restaurant_id = %s AND business_date = %s AND payment_id = ANY(%s)""",
+        (restaurant_id, business_date, list(rows_by_payment)),
+    )
+    check_ids = dict(cur.fetchall())
+
+    # Delete existing child rows for idempotent reload (business_date prunes to one partition)
+    ids = list(check_ids.values())
+    cur.execute(
+        "DELETE FROM check_items WHERE business_date = %s AND check_id = ANY(%s)",
+        (business_date, ids),
+    )
+    cur.execute("DELETE FROM check_payments WHERE check_id = ANY(%s)", (ids,))
+    cur.execute("DELETE FROM check_discounts WHERE check_id = ANY(%s)", (ids,))
 
-    return check_id, items_loaded
+    for table, position in (("check_items", 1), ("check_payments", 2), ("check_discounts", 3)):
+        bulk_load(conn, table, [
+            (check_ids[payment_id], *row)
+            for payment_id, rows in rows_by_payment.items()
+            for row in rows[position]
+        ])
+    return stale_dates
 
 
 def _load_menu_summary(
@@ -428,6 +386,88 @@ def _load_menu_summary(
     return loaded
 
 
+# Conflict targets used when merging a staging table into its fact table
+_STAGING_CONFLICT_KEYS: dict[str, tuple[str, ...]] = {
+    "checks": ("restaurant_id", "payment_id", "business_date"),
+    "check_items": ("check_id", "item_index", "business_date"),
+    "check_payments": ("check_id", "payment_index"),
+    "check_discounts": ("check_id", "discount_index"),
+}
+
+
+# Binary COPY sends integers at the column's width and psycopg wraps values that do
+# not fit, so out-of-range values are rejected here rather than stored wrapped.
+_INTEGER_BOUNDS: dict[str, tuple[int, int]] = {
+    "integer": (-(2**31), 2**31 - 1),
+    "bigint": (-(2**63), 2**63 - 1),
+}
+
+
+def _check_integer_ranges(table: str, spec: tuple[tuple[str, str], ...], rows: list[tuple]) -> None:
+    bounded = [
+        (index, name, *_INTEGER_BOUNDS[type_])
+        for index, (name, type_) in enumerate(spec)
+        if type_ in _INTEGER_BOUNDS
+    ]
+    for row in rows:
+        for index, name, low, high in bounded:
+            value = row[index]
+            if value is not None and not low <= value <= high:
+                raise ValueError(f"{table}.{name} value {value} is out of range for {spec[index][1]}")
+
+
+def bulk_load(conn: Any, table: str, rows: list[tuple]) -> int:
+    """Binary-COPY rows into <table>_staging, then upsert them into <table> in one statement.
+
+    Rows follow schema.STAGING_COLUMNS[table]. When a conflict key repeats within
+    the batch the last row wins, as it would with one upsert per row. Raises
+    ValueError before copying if an integer value does not fit its column. Runs in
+    the caller's transaction; returns rows merged.
+    """
+    from psycopg import sql
+
+    if not rows:
+        return 0
+    spec = STAGING_COLUMNS[table]
+    _check_integer_ranges(table, spec, rows)
+    columns = [name for name, _ in spec]
+    conflict_cols = _STAGING_CONFLICT_KEYS[table]
+    staging = sql.Identifier(f"{table}_staging")
+    col_list = sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+    keys = sql.SQL(", ").join(sql.Identifier(c) for c in conflict_cols)
+    updates = sql.SQL(", ").join(
+        sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c))
+        for c in columns
+        if c not in conflict_cols
+    )
+
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("TRUNCATE {}").format(staging))
+        with cur.copy(
+            sql.SQL("COPY {} ({}) FROM STDIN (FORMAT BINARY)").format(staging, col_list)
+        ) as copy:
+            copy.set_types([type_ for _, type_ in spec])
+            for row in rows:
+                copy.write_row(row)
+        # ON CONFLICT cannot touch one target row twice, so keep one row per key
+        cur.execute(
+            sql.SQL(
+                "INSERT INTO {target} ({cols}) "
+                "SELECT DISTINCT ON ({keys}) {cols} FROM {staging} ORDER BY {keys}, staged_seq DESC "
+                "ON CONFLICT ({keys}) DO UPDATE SET {updates}"
+            ).format(
+                target=sql.Identifier(table),
+                cols=col_list,
+                staging=staging,
+                keys=keys,
+                updates=updates,
+            )
+        )
+        merged = cur.rowcount
+        cur.execute(sql.SQL("TRUNCATE {}").format(staging))
+    return merged
+
+
 def load_daily_file(
     conn: Any,
     file_path: Path,
@@ -463,6 +503,11 @@ def load_daily_file(
     business_date = _parse_business_date(file_path, envelope)
 
     with conn.cursor() as cur:
+        if has_legacy_fact_tables(cur):
+            raise RuntimeError(
+                "checks is still the legacy unpartitioned table; run "
+                "`python schema.py migrate --database-url ...` once before loading."
+            )
         restaurant_id = _ensure_restaurant(cur, restaurant_name)
 
         # Log the load start
@@ -478,21 +523,28 @@ def load_daily_file(
         )
         load_id = cur.fetchone()[0]
 
+        # checks / check_items are partitioned by month; make sure this one exists
+        cur.execute("SELECT ensure_fact_partitions(%s)", (business_date,))
+
         # Shared menu item cache for this file
         menu_item_cache: dict[tuple[int, str], int | None] = {}
+        loaded_at = _utc_now()
 
         checks_loaded = 0
         total_items = 0
 
+        # A later record for the same payment_id replaces the earlier one, as
+        # loading them one after another would.
+        rows_by_payment: dict[str, CheckRows] = {}
         for record in checks:
             if not isinstance(record, dict):
                 continue
-            check_id, items_loaded = _load_check(
-                cur, restaurant_id, record, business_date, menu_item_cache,
-            )
-            if check_id:
+            rows = _check_rows(cur, restaurant_id, record, business_date, menu_item_cache, loaded_at)
+            if rows is not None:
+                rows_by_payment[rows[0][1]] = rows
                 checks_loaded += 1
-                total_items += items_loaded
+                total_items += len(rows[1])
+        stale_dates = _load_checks(conn, cur, restaurant_id, business_date, rows_by_payment)
 
         # Load menu summary
         summary_loaded = _load_menu_summary(
@@ -517,6 +569,8 @@ def load_daily_file(
         "checks_loaded": checks_loaded,
         "items_loaded": total_items,
         "menu_summary_loaded": summary_loaded,
+        # Dates whose checks moved to this file's date; their summaries change too
+        "stale_dates_removed": [d.isoformat() for d in stale_dates],
         "duration_sec": round((_utc_now() - started_at).total_seconds(), 2),
     }
 
@@ -4,15 +4,56 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import io
 import json
 import random
-import subprocess
+import re
+import shutil
 import sys
 import tempfile
 import time
+from dataclasses import dataclass
 from datetime import date, timedelta
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+_RUN_COMPLETE_RE = re.compile(rb'"event"\s*:\s*"run_complete"')
+# Keywords are ASCII, so IGNORECASE on a bytes pattern folds case inside the
+# regex engine (ASCII-only, no Unicode tables) without a lower()'d copy.
+_THROTTLE_RE = re.compile(
+    rb"(?:throttl|rate limit|429|too many|cloudflare|AUTH_BLOCKED)", re.IGNORECASE
+)
+# Per-line read limit for the extractor pipes; a longer line (e.g. an oversized
+# debug dump) is handed to the scanners in limit-sized pieces instead.
+_STREAM_LIMIT = 8 * 1024 * 1024
+
+
+# [epoch second, formatted timestamp]; log records within one second share a string.
+_TS_CACHE: list = [-1, ""]
+
+
+def _now_iso() -> str:
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[0] = now
+        _TS_CACHE[1] = time.strftime("%Y-%m-%dT%H:%M:%S%z", time.gmtime(now))
+    return _TS_CACHE[1]
+
+
+def _json_loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _json_line(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=True) + "\n").encode("ascii")
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -27,7 +68,18 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--adaptive-cooldown",
         action="store_true",
-        help="Double cooldown after throttle signals, reset after 3 clean days",
+        help="Halve the launch rate (double the cooldown) on throttle signals and recover gradually on clean days",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=1,
+        help="Max days extracted in parallel (default: 1). Throttle signals shrink this adaptively.",
+    )
+    parser.add_argument(
+        "--user-data-dir",
+        default=".toast_browser_profile",
+        help="Browser profile passed to toast_extract.py; parallel slots use <dir>-<slot> copies seeded from it",
     )
     parser.add_argument(
         "--extract-script",
@@ -45,92 +97,378 @@ def date_range(start: date, end: date):
         current += timedelta(days=1)
 
 
-def output_path_for_date(output_dir: str, d: date) -> Path:
-    """Return output/<YYYY-MM>/<YYYY-MM-DD>.json."""
-    return Path(output_dir) / d.strftime("%Y-%m") / f"{d.isoformat()}.json"
+def output_path_for_date(output_dir: Path, date_str: str) -> Path:
+    """Return output/<YYYY-MM>/<YYYY-MM-DD>.json for an ISO date string."""
+    return output_dir / date_str[:7] / f"{date_str}.json"
+
+
+@dataclass(frozen=True)
+class DayJob:
+    """Per-day strings and paths, computed once before any day runs."""
+
+    day: date
+    date_str: str
+    out_path: Path
+    state_file: Path
+    menu_file: Path
+    progress_file: Path
+    error_log_file: Path
+    artifact_dir: Path
+
+
+def build_day_jobs(days: list[date], output_dir: str, tmp_dir: Path) -> list[DayJob]:
+    out_root = Path(output_dir)
+    jobs = []
+    for d in days:
+        date_str = d.isoformat()
+        jobs.append(DayJob(
+            day=d,
+            date_str=date_str,
+            out_path=output_path_for_date(out_root, date_str),
+            state_file=tmp_dir / f"state_{date_str}.json",
+            menu_file=tmp_dir / f"menu_{date_str}.json",
+            progress_file=tmp_dir / f"progress_{date_str}.json",
+            # Kept after the run, and per day so concurrent extractors never share a file.
+            error_log_file=out_root / "toast_errors" / f"{date_str}.jsonl",
+            artifact_dir=out_root / "toast_artifacts" / date_str,
+        ))
+    return jobs
+
+
+# (path, mtime_ns, size) -> completeness, so unchanged files are inspected once.
+_COMPLETE_CACHE: dict[tuple[str, int, int], bool] = {}
+# (path, mtime_ns, size) -> number of checks, for days known to be complete.
+_CHECK_COUNTS: dict[tuple[str, int, int], int] = {}
+
+# Sidecar in the output root recording {path: [mtime_ns, size, checks]} for complete days,
+# so a fresh --resume pass trusts unchanged files without reading them again.
+COMPLETE_STAMP_NAME = ".complete_days.json"
+
+
+def _stat_key(path: Path) -> tuple[str, int, int]:
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def load_complete_stamps(output_dir: Path) -> None:
+    """Seed the completeness caches from the output root's stamp file, if any."""
+    try:
+        stamps = _json_loads((output_dir / COMPLETE_STAMP_NAME).read_bytes())
+        for path, (mtime_ns, size, n_checks) in stamps.items():
+            key = (path, int(mtime_ns), int(size))
+            _COMPLETE_CACHE[key] = True
+            _CHECK_COUNTS[key] = int(n_checks)
+    except (OSError, ValueError, TypeError, AttributeError):
+        # Missing or unreadable stamps only cost a re-check of each file.
+        return
+
+
+def save_complete_stamps(output_dir: Path) -> None:
+    """Persist the complete days seen this run (latest stat wins per path)."""
+    stamps = {path: [mtime_ns, size, n] for (path, mtime_ns, size), n in _CHECK_COUNTS.items()}
+    if not stamps:
+        return
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp_path = output_dir / COMPLETE_STAMP_NAME
+    tmp_path = stamp_path.with_name(stamp_path.name + ".tmp")
+    tmp_path.write_bytes(_json_line(stamps))
+    tmp_path.replace(stamp_path)
+
+
+def _looks_complete(path: Path, size: int) -> bool | None:
+    """Cheap head/tail check of a combined output file; None when inconclusive."""
+    with path.open("rb") as f:
+        head = f.read(1024)
+        f.seek(max(0, size - 512))
+        tail = f.read().rstrip()
+    # toast_extract.py replaces the file atomically and writes "checks" as the
+    # last key, so a document opening with from_date and closing with "]}" is done.
+    if (
+        head.lstrip().startswith(b"{")
+        and b'"from_date"' in head
+        and tail.endswith(b"}")
+        and tail[:-1].rstrip().endswith(b"]")
+    ):
+        return True
+    return None
 
 
 def is_day_complete(path: Path) -> bool:
     """Check if the output file exists and contains a checks array."""
-    if not path.exists():
-        return False
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        return isinstance(data.get("checks"), list)
-    except (json.JSONDecodeError, OSError):
+        key = _stat_key(path)
+    except OSError:
         return False
+    cached = _COMPLETE_CACHE.get(key)
+    if cached is not None:
+        return cached
 
-
-def run_day(d: date, args: argparse.Namespace, tmp_dir: Path) -> dict:
+    result = None
+    try:
+        size = key[2]
+        if size >= 256:
+            result = _looks_complete(path, size)
+        if result is None:
+            data = _json_loads(path.read_bytes())
+            result = isinstance(data.get("checks"), list)
+    except (json.JSONDecodeError, OSError):
+        result = False
+    _COMPLETE_CACHE[key] = result
+    return result
+
+
+def completed_check_count(path: Path) -> int:
+    """Number of checks in a complete day file, parsed at most once per file version."""
+    key = _stat_key(path)
+    n_checks = _CHECK_COUNTS.get(key)
+    if n_checks is None:
+        data = _json_loads(path.read_bytes())
+        n_checks = _CHECK_COUNTS[key] = len(data.get("checks", []))
+    return n_checks
+
+
+class WorkerSlots:
+    """Numbered worker slots with a limit that can shrink under throttling.
+
+    Each slot maps to its own browser profile so parallel toast_extract.py runs
+    don't contend for the same Chrome user-data-dir lock.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.max_size = max(1, size)
+        self.limit = self.max_size
+        self.waiting = 0
+        self._free = list(range(self.max_size))
+        self._in_use = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> int:
+        async with self._cond:
+            self.waiting += 1
+            try:
+                await self._cond.wait_for(lambda: bool(self._free) and self._in_use < self.limit)
+            finally:
+                self.waiting -= 1
+            self._in_use += 1
+            return self._free.pop(0)
+
+    async def release(self, slot: int) -> None:
+        async with self._cond:
+            self._in_use -= 1
+            self._free.append(slot)
+            self._free.sort()
+            self._cond.notify_all()
+
+    def shrink(self) -> None:
+        self.limit = max(1, self.limit // 2)
+
+    def grow(self) -> None:
+        self.limit = min(self.max_size, self.limit + 1)
+
+
+class TokenBucket:
+    """Day-launch pacing shared by all workers.
+
+    Every launch (including retries) takes one token. With adaptive pacing a
+    throttle divides the rate and drains the bucket, while clean days raise it
+    back toward the configured --cooldown ceiling.
+    """
+
+    def __init__(self, rate: float, *, floor: float, increase: float = 1.25, decrease: float = 2.0) -> None:
+        self.rate = rate
+        self.rate_cap = rate
+        self.floor = floor
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = 1.0
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(1.0, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1.0:
+                wait = (1.0 - self.tokens) / self.rate
+                await asyncio.sleep(wait + random.uniform(0, min(3.0, wait * 0.3)))
+                self._refill()
+            self.tokens -= 1.0
+
+    def on_success(self) -> None:
+        self.rate = min(self.rate * self.increase, self.rate_cap)
+
+    def on_throttle(self) -> None:
+        self._refill()
+        self.rate = max(self.rate / self.decrease, self.floor)
+        self.tokens = 0.0
+
+
+def profile_dir_for_slot(base: str, slot: int) -> str:
+    """Slot 0 reuses the base profile; extra slots get their own sibling directory."""
+    return base if slot == 0 else f"{base}-{slot}"
+
+
+# Chrome keeps the login session in the profile's cookie store (location varies by version).
+_PROFILE_COOKIE_FILES = ("Default/Network/Cookies", "Default/Cookies")
+# Lock/socket files belong to a running browser and must not be copied into a slot.
+_PROFILE_COPY_IGNORE = shutil.ignore_patterns("Singleton*", "lockfile", "*.lock", "LOCK")
+
+
+def _cookie_mtime(profile: Path) -> float:
+    mtimes = [
+        (profile / name).stat().st_mtime for name in _PROFILE_COOKIE_FILES if (profile / name).exists()
+    ]
+    return max(mtimes, default=0.0)
+
+
+def seed_slot_profiles(base: str, slots: int) -> None:
+    """Copy the authenticated base profile into every extra slot's profile directory.
+
+    Headless workers cannot log in interactively, so a slot profile without the base
+    session would stop at the login wall. Slots are re-seeded when the base profile
+    holds a newer session than their copy.
+    """
+    if slots <= 1:
+        return
+    base_path = Path(base)
+    base_cookies = _cookie_mtime(base_path)
+    if not base_cookies:
+        raise SystemExit(
+            f"Error: --max-concurrency {slots} needs a logged-in base profile at {base_path}, "
+            "but it has no session cookies. Log in once with "
+            f"'toast_extract.py --user-data-dir {base}' (headful), then rerun."
+        )
+    for slot in range(1, slots):
+        slot_path = Path(profile_dir_for_slot(base, slot))
+        if slot_path.exists() and _cookie_mtime(slot_path) >= base_cookies:
+            continue
+        shutil.rmtree(slot_path, ignore_errors=True)
+        shutil.copytree(base_path, slot_path, ignore=_PROFILE_COPY_IGNORE, symlinks=True)
+
+
+async def iter_stream_lines(stream: asyncio.StreamReader):
+    """Yield lines from a subprocess pipe; lines over the reader limit come in pieces.
+
+    ``async for line in stream`` raises ValueError on such a line, which would end
+    the scan while the child keeps writing into a pipe nobody reads.
+    """
+    while True:
+        try:
+            line = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as exc:
+            # EOF: whatever followed the last newline
+            if exc.partial:
+                yield exc.partial
+            return
+        except asyncio.LimitOverrunError as exc:
+            # Nothing was consumed; drain the oversized part and keep scanning.
+            yield await stream.read(exc.consumed)
+            continue
+        yield line
+
+
+async def run_day_async(job: DayJob, args: argparse.Namespace, slot: int) -> dict:
     """Run toast_extract.py for a single day. Returns a stats dict."""
-    date_str = d.isoformat()
-    out_path = output_path_for_date(args.output_dir, d)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
-    state_file = tmp_dir / f"state_{date_str}.json"
-    menu_file = tmp_dir / f"menu_{date_str}.json"
+    date_str = job.date_str
+    job.out_path.parent.mkdir(parents=True, exist_ok=True)
 
     cmd = [
         sys.executable,
         args.extract_script,
         "--start-date", date_str,
         "--end-date", date_str,
-        "--state-file", str(state_file),
-        "--menu-summary-file", str(menu_file),
+        "--state-file", str(job.state_file),
+        "--menu-summary-file", str(job.menu_file),
+        "--progress-file", str(job.progress_file),
+        "--error-log-file", str(job.error_log_file),
+        "--artifact-dir", str(job.artifact_dir),
+        "--user-data-dir", profile_dir_for_slot(args.user_data_dir, slot),
         "--headless",
-        "--combined-output", str(out_path),
+        "--combined-output", str(job.out_path),
     ]
 
-    start_time = time.monotonic()
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    elapsed = time.monotonic() - start_time
-
-    stdout = result.stdout or ""
-    stderr = result.stderr or ""
-    combined_output = stdout + "\n" + stderr
-
-    # Parse run_complete event from stdout
     stats: dict = {
         "date": date_str,
-        "exit_code": result.returncode,
-        "elapsed_sec": round(elapsed, 1),
+        "exit_code": -1,
+        "elapsed_sec": 0.0,
         "total": 0,
         "complete": 0,
         "incomplete": 0,
         "throttled": False,
         "error": "",
     }
+    last_err_line = b""
+
+    # stdout and stderr are scanned independently for throttle signals; they
+    # are never joined into one combined buffer just to search it.
+    async def scan_stdout(stream: asyncio.StreamReader) -> None:
+        # Lines are inspected as they arrive, so memory stays flat for long days.
+        async for line in iter_stream_lines(stream):
+            if not stats["throttled"] and _THROTTLE_RE.search(line):
+                stats["throttled"] = True
+            if _RUN_COMPLETE_RE.search(line):
+                try:
+                    event = _json_loads(line)
+                    stats["total"] = event.get("total", 0)
+                    stats["complete"] = event.get("complete", 0)
+                    stats["incomplete"] = event.get("incomplete", 0)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    pass
+
+    async def scan_stderr(stream: asyncio.StreamReader) -> None:
+        nonlocal last_err_line
+        async for line in iter_stream_lines(stream):
+            if not stats["throttled"] and _THROTTLE_RE.search(line):
+                stats["throttled"] = True
+            if line.strip():
+                last_err_line = line
 
-    for line in stdout.splitlines():
-        if '"event": "run_complete"' in line or '"event":"run_complete"' in line:
-            try:
-                event = json.loads(line)
-                stats["total"] = event.get("total", 0)
-                stats["complete"] = event.get("complete", 0)
-                stats["incomplete"] = event.get("incomplete", 0)
-            except json.JSONDecodeError:
-                pass
-
-    # Detect throttle/error signals
-    throttle_keywords = ["throttl", "rate limit", "429", "too many", "cloudflare", "AUTH_BLOCKED"]
-    for kw in throttle_keywords:
-        if kw.lower() in combined_output.lower():
-            stats["throttled"] = True
-            break
-
-    if result.returncode != 0:
-        # Capture last few lines of stderr for error context
-        err_lines = [l for l in stderr.strip().splitlines() if l.strip()]
-        stats["error"] = (err_lines[-1] if err_lines else f"exit code {result.returncode}")[:200]
+    start_time = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=_STREAM_LIMIT,
+    )
+    try:
+        await asyncio.gather(scan_stdout(proc.stdout), scan_stderr(proc.stderr))
+    except BaseException:
+        # Never leave the extractor running (or its browser open) behind a failed scan.
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        raise
+    finally:
+        returncode = await proc.wait()
+    stats["exit_code"] = returncode
+    stats["elapsed_sec"] = round(time.monotonic() - start_time, 1)
+
+    if returncode != 0:
+        # Last non-empty stderr line gives the error context
+        last_err = last_err_line.decode("utf-8", errors="replace").strip()
+        stats["error"] = (last_err or f"exit code {returncode}")[:200]
 
     return stats
 
 
-def append_log(log_path: Path, record: dict) -> None:
-    """Append a JSON record to the run log."""
+def open_log(log_path: Path) -> io.BufferedWriter:
+    """Open the run log once for the whole range; callers flush per day."""
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    with log_path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=True) + "\n")
+    return log_path.open("ab", buffering=64 * 1024)
+
+
+def append_log(log_file: io.BufferedWriter, record: dict) -> None:
+    """Append a JSON record to the run log."""
+    log_file.write(_json_line(record))
 
 
 def format_duration(seconds: float) -> str:
@@ -140,76 +478,73 @@ def format_duration(seconds: float) -> str:
     return f"{m}m{s}s"
 
 
-def main() -> None:
-    args = parse_args()
-    start = date.fromisoformat(args.start_date)
-    end = date.fromisoformat(args.end_date)
-
-    if start > end:
-        print(f"Error: start-date {start} is after end-date {end}", file=sys.stderr)
-        sys.exit(1)
-
-    log_path = Path(args.output_dir) / "run_range_log.jsonl"
-    days = list(date_range(start, end))
-
-    # Print header
-    header = f"{'Date':<12} {'Total':>8} {'Complete':>8} {'Errors':>8} {'Duration':>10} {'Notes'}"
-    sep = f"{'----------':<12} {'------':>8} {'--------':>8} {'------':>8} {'--------':>10} {'-----'}"
-    print(header)
-    print(sep)
-
-    grand_total = 0
-    grand_complete = 0
-    grand_incomplete = 0
-    grand_start = time.monotonic()
-
-    cooldown = args.cooldown
+async def _drive(days: list[date], args: argparse.Namespace, log_file: io.BufferedWriter) -> dict[str, int]:
+    """Extract days concurrently (bounded by --max-concurrency), printing rows in date order."""
+    totals = {"total": 0, "complete": 0, "incomplete": 0}
+    slots = WorkerSlots(args.max_concurrency)
+    lock = asyncio.Lock()
+    rows: dict[date, str] = {}
+    next_row = 0
+    # Rate ceiling is one launch per --cooldown; the floor matches the old 120s cooldown cap.
+    bucket = TokenBucket(1.0 / max(args.cooldown, 0.01), floor=1.0 / 120)
     clean_streak = 0
 
-    with tempfile.TemporaryDirectory(prefix="toast_range_") as tmp_dir:
-        tmp_path = Path(tmp_dir)
-
-        for i, d in enumerate(days):
-            out_path = output_path_for_date(args.output_dir, d)
-
-            # Resume: skip completed days
-            if args.resume and is_day_complete(out_path):
-                try:
-                    data = json.loads(out_path.read_text(encoding="utf-8"))
-                    n_checks = len(data.get("checks", []))
-                except (json.JSONDecodeError, OSError):
-                    n_checks = 0
-                notes = "SKIPPED (resume)"
-                print(f"{d.isoformat():<12} {n_checks:>8} {n_checks:>8} {0:>8} {'--':>10} {notes}")
-                grand_total += n_checks
-                grand_complete += n_checks
-                append_log(log_path, {
-                    "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.gmtime()),
+    def flush_rows() -> None:
+        # Days finish out of order; only print once every earlier day is done.
+        nonlocal next_row
+        while next_row < len(days) and days[next_row] in rows:
+            print(rows.pop(days[next_row]), flush=True)
+            next_row += 1
+
+    async def run_one(job: DayJob) -> None:
+        nonlocal clean_streak
+        d = job.day
+        date_str = job.date_str
+        out_path = job.out_path
+
+        # Resume: skip completed days
+        if args.resume and is_day_complete(out_path):
+            try:
+                n_checks = completed_check_count(out_path)
+            except (json.JSONDecodeError, OSError):
+                n_checks = 0
+            notes = "SKIPPED (resume)"
+            async with lock:
+                rows[d] = f"{date_str:<12} {n_checks:>8} {n_checks:>8} {0:>8} {'--':>10} {notes}"
+                totals["total"] += n_checks
+                totals["complete"] += n_checks
+                append_log(log_file, {
+                    "ts": _now_iso(),
                     "event": "day_skipped",
-                    "date": d.isoformat(),
+                    "date": date_str,
                     "checks": n_checks,
                 })
-                continue
+            return
 
+        slot = await slots.acquire()
+        try:
             # Run with retries
             stats: dict = {}
             for attempt in range(1, args.max_retries + 2):  # max_retries + 1 total attempts
-                stats = run_day(d, args, tmp_path)
+                await bucket.acquire()
+                stats = await run_day_async(job, args, slot)
 
                 if stats["exit_code"] == 0:
                     break
 
                 if attempt <= args.max_retries:
-                    backoff = cooldown * (2 ** (attempt - 1)) + random.uniform(0, 2)
-                    append_log(log_path, {
-                        "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.gmtime()),
-                        "event": "day_retry",
-                        "date": d.isoformat(),
-                        "attempt": attempt,
-                        "backoff_sec": round(backoff, 1),
-                        "error": stats.get("error", ""),
-                    })
-                    time.sleep(backoff)
+                    # Full jitter: spreads retries from parallel workers across the whole window
+                    backoff = random.uniform(0, min(bucket.interval * (2 ** attempt), 120))
+                    async with lock:
+                        append_log(log_file, {
+                            "ts": _now_iso(),
+                            "event": "day_retry",
+                            "date": date_str,
+                            "attempt": attempt,
+                            "backoff_sec": round(backoff, 1),
+                            "error": stats.get("error", ""),
+                        })
+                    await asyncio.sleep(backoff)
 
             # Build notes
             notes_parts: list[str] = []
@@ -222,56 +557,105 @@ def main() -> None:
             notes = " ".join(notes_parts)
 
             duration_str = format_duration(stats["elapsed_sec"])
-            print(
-                f"{d.isoformat():<12} {stats['total']:>8} {stats['complete']:>8} "
-                f"{stats['incomplete']:>8} {duration_str:>10} {notes}"
-            )
-
-            grand_total += stats["total"]
-            grand_complete += stats["complete"]
-            grand_incomplete += stats["incomplete"]
-
-            append_log(log_path, {
-                "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.gmtime()),
-                "event": "day_done",
-                "date": d.isoformat(),
-                **stats,
-            })
-
-            # Adaptive cooldown
-            if args.adaptive_cooldown:
-                if stats.get("throttled"):
-                    cooldown = min(cooldown * 2, 120)
-                    clean_streak = 0
-                else:
-                    clean_streak += 1
-                    if clean_streak >= 3:
-                        cooldown = max(args.cooldown, cooldown / 2)
+            async with lock:
+                rows[d] = (
+                    f"{date_str:<12} {stats['total']:>8} {stats['complete']:>8} "
+                    f"{stats['incomplete']:>8} {duration_str:>10} {notes}"
+                )
+                totals["total"] += stats["total"]
+                totals["complete"] += stats["complete"]
+                totals["incomplete"] += stats["incomplete"]
+
+                append_log(log_file, {
+                    "ts": _now_iso(),
+                    "event": "day_done",
+                    "date": date_str,
+                    **stats,
+                })
+
+                # Adaptive pacing (and concurrency) shared across workers
+                if args.adaptive_cooldown:
+                    if stats.get("throttled"):
+                        bucket.on_throttle()
                         clean_streak = 0
+                        slots.shrink()
+                    else:
+                        bucket.on_success()
+                        clean_streak += 1
+                        if clean_streak >= 3:
+                            clean_streak = 0
+                            slots.grow()
+                cooldown = bucket.interval
+                sleep_for = cooldown + random.uniform(0, min(3, cooldown * 0.3))
+
+            # Sleep before handing the slot to the next day (skip when nothing is queued)
+            if slots.waiting:
+                await asyncio.sleep(sleep_for)
+        finally:
+            await slots.release(slot)
 
-            # Sleep between days (skip after last day)
-            if i < len(days) - 1:
-                jitter = random.uniform(0, min(3, cooldown * 0.3))
-                time.sleep(cooldown + jitter)
+    with tempfile.TemporaryDirectory(prefix="toast_range_") as tmp_dir:
+        jobs = build_day_jobs(days, args.output_dir, Path(tmp_dir))
+        tasks = [asyncio.create_task(run_one(job)) for job in jobs]
+        for finished in asyncio.as_completed(tasks):
+            await finished
+            flush_rows()
+            log_file.flush()
 
-    grand_elapsed = time.monotonic() - grand_start
-    print()
-    print(
-        f"{'TOTALS':<12} {grand_total:>8} {grand_complete:>8} "
-        f"{grand_incomplete:>8} {format_duration(grand_elapsed):>10}"
-    )
+    return totals
+
+
+def main() -> None:
+    args = parse_args()
+    start = date.fromisoformat(args.start_date)
+    end = date.fromisoformat(args.end_date)
 
-    append_log(log_path, {
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.gmtime()),
-        "event": "range_done",
-        "start_date": args.start_date,
-        "end_date": args.end_date,
-        "grand_total": grand_total,
-        "grand_complete": grand_complete,
-        "grand_incomplete": grand_incomplete,
-        "grand_elapsed_sec": round(grand_elapsed, 1),
-    })
+    if start > end:
+        print(f"Error: start-date {start} is after end-date {end}", file=sys.stderr)
+        sys.exit(1)
 
+    log_path = Path(args.output_dir) / "run_range_log.jsonl"
+    days = list(date_range(start, end))
+    seed_slot_profiles(args.user_data_dir, args.max_concurrency)
+
+    # Print header
+    header = f"{'Date':<12} {'Total':>8} {'Complete':>8} {'Errors':>8} {'Duration':>10} {'Notes'}"
+    sep = f"{'----------':<12} {'------':>8} {'--------':>8} {'------':>8} {'--------':>10} {'-----'}"
+    print(header)
+    print(sep)
+
+    if args.resume:
+        load_complete_stamps(Path(args.output_dir))
+
+    log_file = open_log(log_path)
+    try:
+        grand_start = time.monotonic()
+        totals = asyncio.run(_drive(days, args, log_file))
+        grand_total = totals["total"]
+        grand_complete = totals["complete"]
+        grand_incomplete = totals["incomplete"]
+
+        grand_elapsed = time.monotonic() - grand_start
+        print()
+        print(
+            f"{'TOTALS':<12} {grand_total:>8} {grand_complete:>8} "
+            f"{grand_incomplete:>8} {format_duration(grand_elapsed):>10}"
+        )
+
+        append_log(log_file, {
+            "ts": _now_iso(),
+            "event": "range_done",
+            "start_date": args.start_date,
+            "end_date": args.end_date,
+            "grand_total": grand_total,
+            "grand_complete": grand_complete,
+            "grand_incomplete": grand_incomplete,
+            "grand_elapsed_sec": round(grand_elapsed, 1),
+        })
+    finally:
+        log_file.close()
+        if args.resume:
+            save_complete_stamps(Path(args.output_dir))
 
 if __name__ == "__main__":
     main()
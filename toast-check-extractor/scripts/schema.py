@@ -1,13 +1,25 @@
 """Database schema DDL for the restaurant analytics platform.
 
-Creates all dimension tables, fact tables, indexes, and materialized views.
+Creates all dimension tables, fact tables, indexes, and summary tables.
 This is the single source of truth for the database schema.
+
+create_schema also upgrades databases created before the fact tables were
+partitioned: the plain checks/check_items/check_payments/check_discounts tables
+are renamed to *_legacy, the partitioned tables are created, every row is copied
+across and the legacy tables are dropped, all in the create_schema transaction.
+Run ``schema.py migrate`` (same as ``create``) once before loading into such a
+database; loader.load_daily_file refuses to load into the old layout.
 """
 
 from __future__ import annotations
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from typing import Any
 
+SUMMARY_TABLE_NAMES = ["mv_daily_sales", "mv_server_performance", "mv_menu_item_weekly"]
+
 # ---------------------------------------------------------------------------
 # Table DDL
 # ---------------------------------------------------------------------------
@@ -58,11 +70,71 @@ CREATE TABLE IF NOT EXISTS menu_items (
 );
 """
 
+# Databases created before checks/check_items were partitioned still hold plain
+# fact tables, which CREATE TABLE IF NOT EXISTS would leave as they are. Move them
+# aside as *_legacy (with the indexes and sequences named after them, so the new
+# tables can reuse those names); MIGRATE_LEGACY_FACT_ROWS then copies the rows.
+LEGACY_FACT_TABLES_ASIDE = """
+DO $$
+DECLARE
+    tbl TEXT;
+    rel RECORD;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('checks')) IS DISTINCT FROM 'r' THEN
+        RETURN;
+    END IF;
+    FOREACH tbl IN ARRAY ARRAY['checks', 'check_items', 'check_payments', 'check_discounts'] LOOP
+        CONTINUE WHEN to_regclass(tbl) IS NULL;
+        FOR rel IN
+            SELECT c.relname, c.relkind
+            FROM pg_class c
+            WHERE c.oid IN (SELECT indexrelid FROM pg_index WHERE indrelid = to_regclass(tbl))
+               OR (
+                   c.relkind = 'S'
+                   AND c.oid IN (
+                       SELECT objid FROM pg_depend
+                       WHERE classid = 'pg_class'::regclass
+                         AND refobjid = to_regclass(tbl)
+                         AND deptype IN ('a', 'i')
+                   )
+               )
+        LOOP
+            EXECUTE FORMAT(
+                'ALTER %s %I RENAME TO %I',
+                CASE rel.relkind WHEN 'S' THEN 'SEQUENCE' ELSE 'INDEX' END,
+                rel.relname, rel.relname || '_legacy'
+            );
+        END LOOP;
+        EXECUTE FORMAT('ALTER TABLE %I RENAME TO %I', tbl, tbl || '_legacy');
+    END LOOP;
+END;
+$$;
+"""
+
 FACT_TABLES = """
+-- Meal period for a check opened at `opened` (restaurant local time). Mirrors
+-- transforms.classify_meal_period; backs the checks.meal_period generated column.
+CREATE OR REPLACE FUNCTION compute_meal_period(opened TIMESTAMPTZ) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN opened IS NULL THEN NULL
+        WHEN EXTRACT(HOUR FROM opened AT TIME ZONE 'America/New_York') < 15 THEN
+            CASE WHEN EXTRACT(ISODOW FROM opened AT TIME ZONE 'America/New_York') >= 6
+                 THEN 'Brunch' ELSE 'Lunch' END
+        WHEN EXTRACT(HOUR FROM opened AT TIME ZONE 'America/New_York') < 17 THEN 'Afternoon'
+        WHEN EXTRACT(HOUR FROM opened AT TIME ZONE 'America/New_York') < 22 THEN 'Dinner'
+        ELSE 'Late Night'
+    END
+$$;
+
 -- Fact: checks (one row per check)
--- All monetary columns stored as integer cents ($52.81 = 5281)
+-- All monetary columns stored as integer cents ($52.81 = 5281). Per-row amounts
+-- are INTEGER (max $21,474,836.47 per check/line/payment); aggregates in the
+-- materialized views are cast to BIGINT.
+-- Range-partitioned by month on business_date (see ensure_fact_partitions);
+-- keys include the partition column as Postgres requires.
 CREATE TABLE IF NOT EXISTS checks (
-    check_id                BIGSERIAL PRIMARY KEY,
+    check_id                BIGSERIAL,
     restaurant_id           INTEGER NOT NULL REFERENCES restaurants(restaurant_id),
     payment_id              TEXT NOT NULL,
     check_number            INTEGER,
@@ -77,19 +149,26 @@ CREATE TABLE IF NOT EXISTS checks (
     table_name              TEXT,
     tab_name                TEXT,
     guest_count             INTEGER,
-    subtotal                BIGINT,
-    discount                BIGINT,
-    tax                     BIGINT,
-    tip                     BIGINT,
-    gratuity                BIGINT,
-    total                   BIGINT,
-    hour_opened             SMALLINT,
-    meal_period             TEXT,
-    day_of_week             SMALLINT,
-    is_weekend              BOOLEAN,
+    subtotal                INTEGER,
+    discount                INTEGER,
+    tax                     INTEGER,
+    tip                     INTEGER,
+    gratuity                INTEGER,
+    total                   INTEGER,
+    -- Derived from time_opened in restaurant local time; day_of_week is 0=Mon..6=Sun
+    hour_opened             SMALLINT GENERATED ALWAYS AS (
+        EXTRACT(HOUR FROM time_opened AT TIME ZONE 'America/New_York')::smallint
+    ) STORED,
+    meal_period             TEXT GENERATED ALWAYS AS (compute_meal_period(time_opened)) STORED,
+    day_of_week             SMALLINT GENERATED ALWAYS AS (
+        (EXTRACT(ISODOW FROM time_opened AT TIME ZONE 'America/New_York') - 1)::smallint
+    ) STORED,
+    is_weekend              BOOLEAN GENERATED ALWAYS AS (
+        EXTRACT(ISODOW FROM time_opened AT TIME ZONE 'America/New_York') >= 6
+    ) STORED,
     party_size_category     TEXT,
     tip_percentage          NUMERIC(8,2),
-    check_avg_per_guest     BIGINT,
+    check_avg_per_guest     INTEGER,
     has_discount            BOOLEAN DEFAULT FALSE,
     has_void                BOOLEAN DEFAULT FALSE,
     source                  TEXT,
@@ -97,63 +176,76 @@ CREATE TABLE IF NOT EXISTS checks (
     extracted_at            TIMESTAMPTZ,
     raw_data                JSONB,
     loaded_at               TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    UNIQUE (restaurant_id, payment_id)
-);
+    PRIMARY KEY (check_id, business_date),
+    UNIQUE (restaurant_id, payment_id, business_date)
+) PARTITION BY RANGE (business_date);
 
 -- Fact: check_items (one row per line item)
 -- Monetary columns in cents; quantity stays NUMERIC
+-- business_date is copied from the parent check so items share its partitions
 CREATE TABLE IF NOT EXISTS check_items (
-    check_item_id           BIGSERIAL PRIMARY KEY,
-    check_id                BIGINT NOT NULL REFERENCES checks(check_id) ON DELETE CASCADE,
+    check_item_id           BIGSERIAL,
+    check_id                BIGINT NOT NULL,
+    business_date           DATE NOT NULL,
     restaurant_id           INTEGER NOT NULL REFERENCES restaurants(restaurant_id),
     menu_item_id            INTEGER REFERENCES menu_items(menu_item_id),
     item_index              INTEGER NOT NULL,
     item_name               TEXT,
     modifiers               TEXT,
     quantity                NUMERIC(8,2),
-    unit_price              BIGINT,
-    discount                BIGINT,
-    line_total              BIGINT,
-    line_tax                BIGINT,
-    line_total_with_tax     BIGINT,
+    unit_price              INTEGER,
+    discount                INTEGER,
+    line_total              INTEGER,
+    line_tax                INTEGER,
+    line_total_with_tax     INTEGER,
     voided                  BOOLEAN DEFAULT FALSE,
     void_reason             TEXT,
-    UNIQUE (check_id, item_index)
-);
+    PRIMARY KEY (check_item_id, business_date),
+    UNIQUE (check_id, item_index, business_date),
+    FOREIGN KEY (check_id, business_date)
+        REFERENCES checks (check_id, business_date) ON DELETE CASCADE
+) PARTITION BY RANGE (business_date);
 
 -- Fact: check_payments (one row per payment, monetary in cents)
+-- Insert-only (reloads delete and reinsert), so pages are packed full
 CREATE TABLE IF NOT EXISTS check_payments (
     check_payment_id        BIGSERIAL PRIMARY KEY,
-    check_id                BIGINT NOT NULL REFERENCES checks(check_id) ON DELETE CASCADE,
+    check_id                BIGINT NOT NULL,
+    business_date           DATE NOT NULL,
     restaurant_id           INTEGER NOT NULL REFERENCES restaurants(restaurant_id),
     payment_index           INTEGER NOT NULL,
     payment_type            TEXT,
     payment_date            TIMESTAMPTZ,
-    amount                  BIGINT,
-    tip                     BIGINT,
-    gratuity                BIGINT,
-    total                   BIGINT,
-    refund                  BIGINT,
+    amount                  INTEGER,
+    tip                     INTEGER,
+    gratuity                INTEGER,
+    total                   INTEGER,
+    refund                  INTEGER,
     status                  TEXT,
     card_type               TEXT,
     card_last_4             TEXT,
-    UNIQUE (check_id, payment_index)
-);
+    UNIQUE (check_id, payment_index),
+    FOREIGN KEY (check_id, business_date)
+        REFERENCES checks (check_id, business_date) ON DELETE CASCADE
+) WITH (fillfactor = 100);
 
 -- Fact: check_discounts (one row per discount)
 CREATE TABLE IF NOT EXISTS check_discounts (
     check_discount_id       BIGSERIAL PRIMARY KEY,
-    check_id                BIGINT NOT NULL REFERENCES checks(check_id) ON DELETE CASCADE,
+    check_id                BIGINT NOT NULL,
+    business_date           DATE NOT NULL,
     restaurant_id           INTEGER NOT NULL REFERENCES restaurants(restaurant_id),
     discount_index          INTEGER NOT NULL,
     discount_name           TEXT,
-    amount                  BIGINT,
+    amount                  INTEGER,
     applied_date            TIMESTAMPTZ,
     approver                TEXT,
     reason                  TEXT,
     comment                 TEXT,
-    UNIQUE (check_id, discount_index)
-);
+    UNIQUE (check_id, discount_index),
+    FOREIGN KEY (check_id, business_date)
+        REFERENCES checks (check_id, business_date) ON DELETE CASCADE
+) WITH (fillfactor = 100);
 
 -- Fact: menu_item_prices (price tracking over time)
 CREATE TABLE IF NOT EXISTS menu_item_prices (
@@ -161,7 +253,7 @@ CREATE TABLE IF NOT EXISTS menu_item_prices (
     restaurant_id           INTEGER NOT NULL REFERENCES restaurants(restaurant_id),
     menu_item_id            INTEGER REFERENCES menu_items(menu_item_id),
     item_name               TEXT NOT NULL,
-    unit_price              BIGINT NOT NULL,
+    unit_price              INTEGER NOT NULL,
     first_seen_date         DATE,
     last_seen_date          DATE,
     observation_count       INTEGER DEFAULT 1,
@@ -183,7 +275,9 @@ CREATE TABLE IF NOT EXISTS menu_item_daily_summary (
 );
 
 -- ETL tracking
-CREATE TABLE IF NOT EXISTS etl_load_log (
+-- UNLOGGED: written on every load and safe to lose on a crash (reloads are
+-- idempotent), so skip WAL for it. Not replicated to standbys.
+CREATE UNLOGGED TABLE IF NOT EXISTS etl_load_log (
     load_id                 BIGSERIAL PRIMARY KEY,
     restaurant_id           INTEGER REFERENCES restaurants(restaurant_id),
     business_date           DATE NOT NULL,
@@ -196,49 +290,388 @@ CREATE TABLE IF NOT EXISTS etl_load_log (
     error_message           TEXT,
     UNIQUE (restaurant_id, business_date, source_file)
 );
+
+-- Monthly partitions for checks / check_items; the loader calls this for
+-- each business_date before inserting. fillfactor 90 leaves room for HOT
+-- updates on reloads (storage parameters live on partitions, not the parent).
+CREATE OR REPLACE FUNCTION ensure_fact_partitions(for_date DATE) RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    start_date DATE := DATE_TRUNC('month', for_date)::date;
+    end_date   DATE := (DATE_TRUNC('month', for_date) + INTERVAL '1 month')::date;
+    suffix     TEXT := TO_CHAR(start_date, 'YYYYMM');
+BEGIN
+    EXECUTE FORMAT(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF checks FOR VALUES FROM (%L) TO (%L) '
+        'WITH (fillfactor = 90)',
+        'checks_' || suffix, start_date, end_date
+    );
+    EXECUTE FORMAT(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF check_items FOR VALUES FROM (%L) TO (%L) '
+        'WITH (fillfactor = 90)',
+        'check_items_' || suffix, start_date, end_date
+    );
+END;
+$$;
+
+-- raw_data is audit-only (nothing queries it), so make it cheap to carry:
+-- LZ4 TOAST compression is much faster than the default pglz. Partitions
+-- created later inherit the parent's setting, but setting it on the parent
+-- does not reach partitions that already exist, so each one is set too. Only
+-- values written afterwards use lz4; existing rows keep pglz until rewritten.
+-- ALTER TABLE takes an ACCESS EXCLUSIVE lock and create_schema runs on every
+-- load, so only tables not already set to lz4 are altered, and nothing is
+-- altered on servers without lz4 (PG14+ built with it); those keep pglz.
+DO $$
+DECLARE
+    rel REGCLASS;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_settings
+        WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals)
+    ) THEN
+        RETURN;
+    END IF;
+    FOR rel IN
+        SELECT attrelid::regclass
+        FROM pg_attribute
+        WHERE attname = 'raw_data'
+          AND NOT attisdropped
+          AND attcompression IS DISTINCT FROM 'l'
+          AND (
+              attrelid = 'checks'::regclass
+              OR attrelid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'checks'::regclass)
+          )
+    LOOP
+        EXECUTE FORMAT('ALTER TABLE ONLY %s ALTER COLUMN raw_data SET COMPRESSION lz4', rel);
+    END LOOP;
+EXCEPTION WHEN feature_not_supported OR syntax_error OR undefined_column THEN
+    NULL;
+END;
+$$;
+"""
+
+# Second half of the legacy upgrade (see LEGACY_FACT_TABLES_ASIDE): copy the
+# *_legacy rows into the partitioned tables, keeping their ids, then drop them.
+# Child rows take business_date from their check. The time-derived check columns
+# are generated now, so the legacy values are recomputed rather than copied.
+MIGRATE_LEGACY_FACT_ROWS = """
+DO $$
+BEGIN
+    IF to_regclass('checks_legacy') IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM ensure_fact_partitions(month)
+    FROM (SELECT DISTINCT DATE_TRUNC('month', business_date)::date AS month FROM checks_legacy) AS months;
+
+    INSERT INTO checks (
+        check_id, restaurant_id, payment_id, check_number, business_date,
+        time_opened, time_closed, turnover_minutes,
+        server_id, revenue_center_id, server_name, revenue_center,
+        table_name, tab_name, guest_count,
+        subtotal, discount, tax, tip, gratuity, total,
+        party_size_category, tip_percentage, check_avg_per_guest,
+        has_discount, has_void,
+        source, order_number, extracted_at, raw_data, loaded_at
+    )
+    SELECT
+        check_id, restaurant_id, payment_id, check_number, business_date,
+        time_opened, time_closed, turnover_minutes,
+        server_id, revenue_center_id, server_name, revenue_center,
+        table_name, tab_name, guest_count,
+        subtotal, discount, tax, tip, gratuity, total,
+        party_size_category, tip_percentage, check_avg_per_guest,
+        has_discount, has_void,
+        source, order_number, extracted_at, raw_data, loaded_at
+    FROM checks_legacy;
+
+    INSERT INTO check_items (
+        check_item_id, check_id, business_date, restaurant_id, menu_item_id, item_index,
+        item_name, modifiers, quantity, unit_price, discount,
+        line_total, line_tax, line_total_with_tax, voided, void_reason
+    )
+    SELECT
+        ci.check_item_id, ci.check_id, c.business_date, ci.restaurant_id, ci.menu_item_id, ci.item_index,
+        ci.item_name, ci.modifiers, ci.quantity, ci.unit_price, ci.discount,
+        ci.line_total, ci.line_tax, ci.line_total_with_tax, ci.voided, ci.void_reason
+    FROM check_items_legacy ci
+    JOIN checks_legacy c ON c.check_id = ci.check_id;
+
+    INSERT INTO check_payments (
+        check_payment_id, check_id, business_date, restaurant_id, payment_index,
+        payment_type, payment_date, amount, tip, gratuity,
+        total, refund, status, card_type, card_last_4
+    )
+    SELECT
+        cp.check_payment_id, cp.check_id, c.business_date, cp.restaurant_id, cp.payment_index,
+        cp.payment_type, cp.payment_date, cp.amount, cp.tip, cp.gratuity,
+        cp.total, cp.refund, cp.status, cp.card_type, cp.card_last_4
+    FROM check_payments_legacy cp
+    JOIN checks_legacy c ON c.check_id = cp.check_id;
+
+    INSERT INTO check_discounts (
+        check_discount_id, check_id, business_date, restaurant_id, discount_index,
+        discount_name, amount, applied_date, approver, reason, comment
+    )
+    SELECT
+        cd.check_discount_id, cd.check_id, c.business_date, cd.restaurant_id, cd.discount_index,
+        cd.discount_name, cd.amount, cd.applied_date, cd.approver, cd.reason, cd.comment
+    FROM check_discounts_legacy cd
+    JOIN checks_legacy c ON c.check_id = cd.check_id;
+
+    -- Ids were copied explicitly, so move each sequence past them
+    PERFORM setval(pg_get_serial_sequence('checks', 'check_id'),
+                   COALESCE((SELECT MAX(check_id) FROM checks), 0) + 1, false);
+    PERFORM setval(pg_get_serial_sequence('check_items', 'check_item_id'),
+                   COALESCE((SELECT MAX(check_item_id) FROM check_items), 0) + 1, false);
+    PERFORM setval(pg_get_serial_sequence('check_payments', 'check_payment_id'),
+                   COALESCE((SELECT MAX(check_payment_id) FROM check_payments), 0) + 1, false);
+    PERFORM setval(pg_get_serial_sequence('check_discounts', 'check_discount_id'),
+                   COALESCE((SELECT MAX(check_discount_id) FROM check_discounts), 0) + 1, false);
+
+    DROP TABLE check_discounts_legacy, check_payments_legacy, check_items_legacy, checks_legacy CASCADE;
+END;
+$$;
 """
 
+# Columns (and their types) a bulk load writes into each fact table, in COPY
+# order. Serial ids and generated columns are left out: Postgres fills them.
+# loader.bulk_load builds its rows in this order and uses the types for binary COPY.
+STAGING_COLUMNS: dict[str, tuple[tuple[str, str], ...]] = {
+    "checks": (
+        ("restaurant_id", "integer"),
+        ("payment_id", "text"),
+        ("check_number", "integer"),
+        ("business_date", "date"),
+        ("time_opened", "timestamptz"),
+        ("time_closed", "timestamptz"),
+        ("turnover_minutes", "numeric"),
+        ("server_id", "integer"),
+        ("revenue_center_id", "integer"),
+        ("server_name", "text"),
+        ("revenue_center", "text"),
+        ("table_name", "text"),
+        ("tab_name", "text"),
+        ("guest_count", "integer"),
+        ("subtotal", "integer"),
+        ("discount", "integer"),
+        ("tax", "integer"),
+        ("tip", "integer"),
+        ("gratuity", "integer"),
+        ("total", "integer"),
+        ("party_size_category", "text"),
+        ("tip_percentage", "numeric"),
+        ("check_avg_per_guest", "integer"),
+        ("has_discount", "boolean"),
+        ("has_void", "boolean"),
+        ("source", "text"),
+        ("order_number", "integer"),
+        ("extracted_at", "timestamptz"),
+        ("raw_data", "jsonb"),
+        ("loaded_at", "timestamptz"),
+    ),
+    "check_items": (
+        ("check_id", "bigint"),
+        ("business_date", "date"),
+        ("restaurant_id", "integer"),
+        ("menu_item_id", "integer"),
+        ("item_index", "integer"),
+        ("item_name", "text"),
+        ("modifiers", "text"),
+        ("quantity", "numeric"),
+        ("unit_price", "integer"),
+        ("discount", "integer"),
+        ("line_total", "integer"),
+        ("line_tax", "integer"),
+        ("line_total_with_tax", "integer"),
+        ("voided", "boolean"),
+        ("void_reason", "text"),
+    ),
+    "check_payments": (
+        ("check_id", "bigint"),
+        ("business_date", "date"),
+        ("restaurant_id", "integer"),
+        ("payment_index", "integer"),
+        ("payment_type", "text"),
+        ("payment_date", "timestamptz"),
+        ("amount", "integer"),
+        ("tip", "integer"),
+        ("gratuity", "integer"),
+        ("total", "integer"),
+        ("refund", "integer"),
+        ("status", "text"),
+        ("card_type", "text"),
+        ("card_last_4", "text"),
+    ),
+    "check_discounts": (
+        ("check_id", "bigint"),
+        ("business_date", "date"),
+        ("restaurant_id", "integer"),
+        ("discount_index", "integer"),
+        ("discount_name", "text"),
+        ("amount", "integer"),
+        ("applied_date", "timestamptz"),
+        ("approver", "text"),
+        ("reason", "text"),
+        ("comment", "text"),
+    ),
+}
+
+
+def _staging_table_ddl(table: str, columns: tuple[tuple[str, str], ...]) -> str:
+    column_defs = "".join(f",\n    {name:<23} {type_.upper()}" for name, type_ in columns)
+    return (
+        f"CREATE UNLOGGED TABLE IF NOT EXISTS {table}_staging (\n"
+        f"    staged_seq              BIGINT GENERATED ALWAYS AS IDENTITY{column_defs}\n);\n"
+    )
+
+
+# Bulk-ingest landing tables: COPY rows here, then merge into the fact table
+# with one INSERT ... SELECT (see loader.bulk_load). UNLOGGED because the
+# contents are transient and truncated after every merge. Created once rather
+# than dropped and recreated per create_schema, so loads do not churn the
+# catalog or pull the table out from under a concurrent loader. staged_seq
+# records COPY order so the merge can keep the last row per key.
+STAGING_TABLES = "".join(_staging_table_ddl(table, columns) for table, columns in STAGING_COLUMNS.items())
+
 INDEXES = """
 -- checks indexes
-CREATE INDEX IF NOT EXISTS idx_checks_business_date
-    ON checks (business_date);
-CREATE INDEX IF NOT EXISTS idx_checks_restaurant_date
-    ON checks (restaurant_id, business_date);
+-- Every extra index on checks is another btree insert per loaded row, so keep
+-- one composite for the restaurant/date access path the analytics use and
+-- drop single-column indexes it (or its key prefix) already serves.
+-- Low-cardinality meal_period/hour_opened/day_of_week are only queried within
+-- a restaurant/date range, where the composite narrows rows first.
+DROP INDEX IF EXISTS idx_checks_business_date;
+DROP INDEX IF EXISTS idx_checks_restaurant_date;
+DROP INDEX IF EXISTS idx_checks_mv_covering;
+DROP INDEX IF EXISTS idx_checks_meal_period;
+DROP INDEX IF EXISTS idx_checks_hour_opened;
+DROP INDEX IF EXISTS idx_checks_day_of_week;
+-- business_date is loaded roughly in order, so a BRIN index gives cheap
+-- cross-restaurant range scans at a fraction of a btree's size.
+CREATE INDEX IF NOT EXISTS brin_checks_business_date
+    ON checks USING BRIN (business_date) WITH (pages_per_range = 32);
+-- Reloads upsert every check of a day, and a changed INCLUDE column means a
+-- new index entry beside the old one, so the btrees on checks and check_items
+-- keep 10% free per leaf page (fillfactor 90) to absorb them without splits.
+-- Covers the summary tables' GROUP BY prefix and aggregated columns
+-- (index-only refresh scans)
+CREATE INDEX IF NOT EXISTS idx_checks_analytics
+    ON checks (restaurant_id, business_date, meal_period, hour_opened)
+    INCLUDE (revenue_center, subtotal, discount, tip, total,
+             check_avg_per_guest, tip_percentage, turnover_minutes, guest_count)
+    WITH (fillfactor = 90);
 CREATE INDEX IF NOT EXISTS idx_checks_server_id
-    ON checks (server_id);
+    ON checks (server_id) WITH (fillfactor = 90);
 CREATE INDEX IF NOT EXISTS idx_checks_revenue_center_id
-    ON checks (revenue_center_id);
-CREATE INDEX IF NOT EXISTS idx_checks_meal_period
-    ON checks (meal_period);
-CREATE INDEX IF NOT EXISTS idx_checks_hour_opened
-    ON checks (hour_opened);
-CREATE INDEX IF NOT EXISTS idx_checks_day_of_week
-    ON checks (day_of_week);
+    ON checks (revenue_center_id) WITH (fillfactor = 90);
 CREATE INDEX IF NOT EXISTS idx_checks_has_discount
     ON checks (has_discount) WHERE has_discount = TRUE;
 
 -- check_items indexes
-CREATE INDEX IF NOT EXISTS idx_check_items_check_id
-    ON check_items (check_id);
+-- Covering join index for mv_menu_item_weekly; also serves plain check_id lookups
+DROP INDEX IF EXISTS idx_check_items_check_id;
+CREATE INDEX IF NOT EXISTS idx_check_items_join
+    ON check_items (check_id)
+    INCLUDE (restaurant_id, menu_item_id, item_name, quantity, line_total, unit_price, voided)
+    WITH (fillfactor = 90);
 CREATE INDEX IF NOT EXISTS idx_check_items_menu_item_id
-    ON check_items (menu_item_id);
+    ON check_items (menu_item_id) WITH (fillfactor = 90);
 CREATE INDEX IF NOT EXISTS idx_check_items_voided
     ON check_items (voided) WHERE voided = TRUE;
 
--- check_payments indexes
-CREATE INDEX IF NOT EXISTS idx_check_payments_check_id
-    ON check_payments (check_id);
+-- check_payments / check_discounts: check_id lookups use the
+-- UNIQUE (check_id, ..._index) constraint indexes
+DROP INDEX IF EXISTS idx_check_payments_check_id;
+DROP INDEX IF EXISTS idx_check_discounts_check_id;
 CREATE INDEX IF NOT EXISTS idx_check_payments_status
     ON check_payments (status);
-
--- check_discounts indexes
-CREATE INDEX IF NOT EXISTS idx_check_discounts_check_id
-    ON check_discounts (check_id);
 """
 
-MATERIALIZED_VIEWS = """
+# Summary tables keep their historical mv_* names so analytics queries are
+# unchanged, but they are plain tables maintained incrementally: a refresh
+# deletes and re-aggregates only the slice from a given business_date onward.
+SUMMARY_TABLES = """
 -- Daily sales summary (all monetary values in cents)
-CREATE MATERIALIZED VIEW IF NOT EXISTS mv_daily_sales AS
+CREATE TABLE IF NOT EXISTS mv_daily_sales (
+    restaurant_id           INTEGER NOT NULL,
+    business_date           DATE NOT NULL,
+    meal_period             TEXT,
+    revenue_center          TEXT,
+    check_count             BIGINT,
+    total_guests            BIGINT,
+    avg_party_size          NUMERIC,
+    gross_sales_cents       BIGINT,
+    total_discounts_cents   BIGINT,
+    total_tips_cents        BIGINT,
+    total_revenue_cents     BIGINT,
+    avg_check_cents         NUMERIC,
+    avg_per_guest_cents     NUMERIC,
+    avg_tip_pct             NUMERIC,
+    avg_turnover_min        NUMERIC
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_daily_sales_pk
+    ON mv_daily_sales (restaurant_id, business_date, meal_period, revenue_center);
+
+-- Server performance (weekly, monetary in cents)
+CREATE TABLE IF NOT EXISTS mv_server_performance (
+    restaurant_id           INTEGER NOT NULL,
+    server_id               INTEGER NOT NULL,
+    server_name             TEXT,
+    week_start              DATE NOT NULL,
+    check_count             BIGINT,
+    gross_sales_cents       BIGINT,
+    avg_check_cents         NUMERIC,
+    avg_tip_pct             NUMERIC,
+    total_tips_cents        BIGINT
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_server_perf_pk
+    ON mv_server_performance (restaurant_id, server_id, week_start);
+
+-- Menu item weekly summary (monetary in cents)
+CREATE TABLE IF NOT EXISTS mv_menu_item_weekly (
+    restaurant_id           INTEGER NOT NULL,
+    menu_item_id            INTEGER,
+    item_name               TEXT,
+    week_start              DATE NOT NULL,
+    total_qty               NUMERIC,
+    total_revenue_cents     BIGINT,
+    avg_unit_price_cents    NUMERIC,
+    voided_qty              NUMERIC
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_menu_item_weekly_pk
+    ON mv_menu_item_weekly (restaurant_id, menu_item_id, week_start);
+"""
+
+# Databases created before the switch still have real materialized views
+# under these names; drop them so the tables can take their place.
+DROP_LEGACY_MATERIALIZED_VIEWS = """
+DO $$
+DECLARE
+    mv TEXT;
+BEGIN
+    FOR mv IN
+        SELECT matviewname FROM pg_matviews
+        WHERE schemaname = current_schema()
+          AND matviewname IN ('mv_daily_sales', 'mv_server_performance', 'mv_menu_item_weekly')
+    LOOP
+        EXECUTE FORMAT('DROP MATERIALIZED VIEW %I CASCADE', mv);
+    END LOOP;
+END;
+$$;
+"""
+
+# table -> (delete, insert) for the slice starting at %(since)s. Weekly
+# summaries widen the slice to the start of since's week.
+SUMMARY_REFRESH_SQL: dict[str, tuple[str, str]] = {
+    "mv_daily_sales": (
+        "DELETE FROM mv_daily_sales WHERE business_date >= %(since)s",
+        """
+INSERT INTO mv_daily_sales
 SELECT
     c.restaurant_id,
     c.business_date,
@@ -247,107 +680,231 @@ SELECT
     COUNT(*)                                    AS check_count,
     SUM(c.guest_count)                          AS total_guests,
     ROUND(AVG(c.guest_count)::numeric, 1)       AS avg_party_size,
-    SUM(c.subtotal)                             AS gross_sales_cents,
-    SUM(c.discount)                             AS total_discounts_cents,
-    SUM(c.tip)                                  AS total_tips_cents,
-    SUM(c.total)                                AS total_revenue_cents,
+    SUM(c.subtotal)::BIGINT                     AS gross_sales_cents,
+    SUM(c.discount)::BIGINT                     AS total_discounts_cents,
+    SUM(c.tip)::BIGINT                          AS total_tips_cents,
+    SUM(c.total)::BIGINT                        AS total_revenue_cents,
     ROUND(AVG(c.subtotal)::numeric, 0)          AS avg_check_cents,
     ROUND(AVG(c.check_avg_per_guest)::numeric, 0) AS avg_per_guest_cents,
     ROUND(AVG(c.tip_percentage)::numeric, 1)    AS avg_tip_pct,
     ROUND(AVG(c.turnover_minutes)::numeric, 1)  AS avg_turnover_min
 FROM checks c
-GROUP BY c.restaurant_id, c.business_date, c.meal_period, c.revenue_center;
-
-CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_daily_sales_pk
-    ON mv_daily_sales (restaurant_id, business_date, meal_period, revenue_center);
-
--- Server performance (weekly, monetary in cents)
-CREATE MATERIALIZED VIEW IF NOT EXISTS mv_server_performance AS
+WHERE c.business_date >= %(since)s
+GROUP BY c.restaurant_id, c.business_date, c.meal_period, c.revenue_center
+""",
+    ),
+    "mv_server_performance": (
+        "DELETE FROM mv_server_performance WHERE week_start >= DATE_TRUNC('week', %(since)s::date)::date",
+        """
+INSERT INTO mv_server_performance
 SELECT
     c.restaurant_id,
     c.server_id,
     c.server_name,
     DATE_TRUNC('week', c.business_date)::date   AS week_start,
     COUNT(*)                                     AS check_count,
-    SUM(c.subtotal)                              AS gross_sales_cents,
+    SUM(c.subtotal)::BIGINT                      AS gross_sales_cents,
     ROUND(AVG(c.subtotal)::numeric, 0)           AS avg_check_cents,
     ROUND(AVG(c.tip_percentage)::numeric, 1)     AS avg_tip_pct,
-    SUM(c.tip)                                   AS total_tips_cents
+    SUM(c.tip)::BIGINT                           AS total_tips_cents
 FROM checks c
 WHERE c.server_id IS NOT NULL
-GROUP BY c.restaurant_id, c.server_id, c.server_name, DATE_TRUNC('week', c.business_date);
-
-CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_server_perf_pk
-    ON mv_server_performance (restaurant_id, server_id, week_start);
-
--- Menu item weekly summary (monetary in cents)
-CREATE MATERIALIZED VIEW IF NOT EXISTS mv_menu_item_weekly AS
+  AND c.business_date >= DATE_TRUNC('week', %(since)s::date)::date
+GROUP BY c.restaurant_id, c.server_id, c.server_name, DATE_TRUNC('week', c.business_date)
+""",
+    ),
+    "mv_menu_item_weekly": (
+        "DELETE FROM mv_menu_item_weekly WHERE week_start >= DATE_TRUNC('week', %(since)s::date)::date",
+        """
+INSERT INTO mv_menu_item_weekly
 SELECT
     ci.restaurant_id,
     ci.menu_item_id,
     ci.item_name,
     DATE_TRUNC('week', c.business_date)::date    AS week_start,
     SUM(ci.quantity)                              AS total_qty,
-    SUM(ci.line_total)                            AS total_revenue_cents,
+    SUM(ci.line_total)::BIGINT                    AS total_revenue_cents,
     ROUND(AVG(ci.unit_price)::numeric, 0)         AS avg_unit_price_cents,
     SUM(CASE WHEN ci.voided THEN ci.quantity ELSE 0 END) AS voided_qty
 FROM check_items ci
-JOIN checks c ON c.check_id = ci.check_id
-GROUP BY ci.restaurant_id, ci.menu_item_id, ci.item_name, DATE_TRUNC('week', c.business_date);
-
-CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_menu_item_weekly_pk
-    ON mv_menu_item_weekly (restaurant_id, menu_item_id, week_start);
-"""
+JOIN checks c ON c.check_id = ci.check_id AND c.business_date = ci.business_date
+WHERE c.business_date >= DATE_TRUNC('week', %(since)s::date)::date
+  AND ci.business_date >= DATE_TRUNC('week', %(since)s::date)::date
+GROUP BY ci.restaurant_id, ci.menu_item_id, ci.item_name, DATE_TRUNC('week', c.business_date)
+""",
+    ),
+}
+
+# Lower bound used for a full rebuild
+_ALL_DATES = date(1, 1, 1)
+
+_DOLLAR_TAG_RE = re.compile(r"\$[A-Za-z_]*\$")
+
+
+def split_sql(script: str) -> list[str]:
+    """Split a DDL script on top-level semicolons.
+
+    Semicolons inside quotes, -- comments and $$-quoted function/DO bodies are
+    left alone. Chunks holding only comments are dropped.
+    """
+    statements: list[str] = []
+    start = 0
+    i = 0
+    n = len(script)
+    dollar_tag: str | None = None
+    in_quote = False
+    while i < n:
+        ch = script[i]
+        if dollar_tag:
+            if script.startswith(dollar_tag, i):
+                i += len(dollar_tag)
+                dollar_tag = None
+                continue
+        elif in_quote:
+            if ch == "'":
+                in_quote = False
+        elif ch == "'":
+            in_quote = True
+        elif script.startswith("--", i):
+            newline = script.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        elif ch == "$":
+            m = _DOLLAR_TAG_RE.match(script, i)
+            if m:
+                dollar_tag = m.group(0)
+                i = m.end()
+                continue
+        elif ch == ";":
+            statements.append(script[start:i])
+            start = i + 1
+        i += 1
+    statements.append(script[start:])
+    return [
+        stmt.strip()
+        for stmt in statements
+        if any(line.strip() and not line.strip().startswith("--") for line in stmt.splitlines())
+    ]
+
+
+# Every create_schema statement, split once at import so they can be pipelined
+SCHEMA_STATEMENTS: list[str] = [
+    stmt
+    for script in (
+        DIMENSION_TABLES,
+        # Before the migration: old materialized views depend on checks columns
+        DROP_LEGACY_MATERIALIZED_VIEWS,
+        LEGACY_FACT_TABLES_ASIDE,
+        FACT_TABLES,
+        MIGRATE_LEGACY_FACT_ROWS,
+        STAGING_TABLES,
+        INDEXES,
+        SUMMARY_TABLES,
+    )
+    for stmt in split_sql(script)
+]
+
+
+def has_legacy_fact_tables(cur: Any) -> bool:
+    """True when checks is still the plain (unpartitioned) table of older databases."""
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('checks')")
+    row = cur.fetchone()
+    return row is not None and row[0] == "r"
 
 
 def create_schema(conn: Any) -> None:
-    """Create all tables, indexes, and materialized views."""
+    """Create all tables, indexes, and summary tables in a single transaction.
+
+    Also migrates a legacy (unpartitioned) fact-table layout in place; see the
+    module docstring.
+    """
+    import psycopg
+
     with conn.cursor() as cur:
-        cur.execute(DIMENSION_TABLES)
-        cur.execute(FACT_TABLES)
-        cur.execute(INDEXES)
+        # DDL is idempotent and re-runnable, so skip the WAL flush wait on commit
+        cur.execute("SET LOCAL synchronous_commit = off")
+        cur.execute(
+            "SELECT COUNT(*) FROM pg_matviews WHERE schemaname = current_schema() AND matviewname = ANY(%s)",
+            (SUMMARY_TABLE_NAMES,),
+        )
+        had_legacy_views = cur.fetchone()[0] > 0
+        migrating_facts = has_legacy_fact_tables(cur)
+        if psycopg.Pipeline.is_supported():
+            # Send every statement without waiting for each one's round-trip
+            with conn.pipeline():
+                for stmt in SCHEMA_STATEMENTS:
+                    cur.execute(stmt)
+        else:
+            for stmt in SCHEMA_STATEMENTS:
+                cur.execute(stmt)
     conn.commit()
-    # Materialized views created separately (they may fail on empty tables)
+    if had_legacy_views or migrating_facts:
+        # Freshly converted tables start empty, and migrated checks recompute their
+        # time-derived columns; rebuild the summaries once.
+        refresh_delta(conn, _ALL_DATES)
+
+
+def refresh_delta(conn: Any, since_date: date) -> None:
+    """Re-aggregate every summary table from since_date onward in one transaction.
+
+    Cost scales with the days touched rather than the full history, so loaders
+    call this with the earliest business_date they just loaded.
+    """
+    params = {"since": since_date}
     with conn.cursor() as cur:
-        cur.execute(MATERIALIZED_VIEWS)
+        for delete_sql, insert_sql in SUMMARY_REFRESH_SQL.values():
+            cur.execute(delete_sql, params)
+            cur.execute(insert_sql, params)
     conn.commit()
 
 
-def refresh_materialized_views(conn: Any) -> None:
-    """Refresh all materialized views concurrently if possible."""
-    views = ["mv_daily_sales", "mv_server_performance", "mv_menu_item_weekly"]
-    for view in views:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(f"REFRESH MATERIALIZED VIEW {view}")
-                conn.commit()
-            except Exception:
-                conn.rollback()
+def _refresh_one(dsn: str, table: str) -> None:
+    """Fully rebuild one summary table on its own connection."""
+    import psycopg
+
+    delete_sql, insert_sql = SUMMARY_REFRESH_SQL[table]
+    params = {"since": _ALL_DATES}
+    with psycopg.connect(dsn) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SET max_parallel_workers_per_gather = 4")
+            # Aggregate/join partition by partition on the monthly fact partitions
+            cur.execute("SET enable_partitionwise_aggregate = on")
+            cur.execute("SET enable_partitionwise_join = on")
+            # DELETE + INSERT in one transaction: readers see the old rows until commit
+            cur.execute(delete_sql, params)
+            cur.execute(insert_sql, params)
+        conn.commit()
+
+
+def refresh_materialized_views(dsn: str) -> None:
+    """Fully rebuild all summary tables in parallel, one connection per table.
+
+    The tables don't depend on each other, so wall-clock time is the slowest
+    rebuild rather than the sum. Data must already be committed by the caller.
+    Prefer refresh_delta() after incremental loads.
+    """
+    tables = SUMMARY_TABLE_NAMES
+    with ThreadPoolExecutor(max_workers=len(tables)) as pool:
+        futures = [pool.submit(_refresh_one, dsn, table) for table in tables]
+    for future in futures:
+        future.result()
 
 
 def drop_all(conn: Any) -> None:
     """Drop all tables and views (for development/testing only)."""
     with conn.cursor() as cur:
-        cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_menu_item_weekly CASCADE")
-        cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_server_performance CASCADE")
-        cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_daily_sales CASCADE")
-        cur.execute("DROP TABLE IF EXISTS etl_load_log CASCADE")
-        cur.execute("DROP TABLE IF EXISTS menu_item_daily_summary CASCADE")
-        cur.execute("DROP TABLE IF EXISTS menu_item_prices CASCADE")
-        cur.execute("DROP TABLE IF EXISTS check_discounts CASCADE")
-        cur.execute("DROP TABLE IF EXISTS check_payments CASCADE")
-        cur.execute("DROP TABLE IF EXISTS check_items CASCADE")
-        cur.execute("DROP TABLE IF EXISTS checks CASCADE")
-        cur.execute("DROP TABLE IF EXISTS menu_items CASCADE")
-        cur.execute("DROP TABLE IF EXISTS servers CASCADE")
-        cur.execute("DROP TABLE IF EXISTS revenue_centers CASCADE")
-        cur.execute("DROP TABLE IF EXISTS restaurants CASCADE")
+        cur.execute("SET LOCAL synchronous_commit = off")
+        cur.execute(DROP_LEGACY_MATERIALIZED_VIEWS)
+        cur.execute(
+            """DROP TABLE IF EXISTS
+                   mv_menu_item_weekly, mv_server_performance, mv_daily_sales,
+                   checks_staging, check_items_staging, check_payments_staging,
+                   check_discounts_staging,
+                   etl_load_log, menu_item_daily_summary, menu_item_prices,
+                   check_discounts, check_payments, check_items, checks,
+                   menu_items, servers, revenue_centers, restaurants
+               CASCADE"""
+        )
     conn.commit()
 
 
@@ -356,7 +913,11 @@ if __name__ == "__main__":
     import os
 
     parser = argparse.ArgumentParser(description="Manage restaurant analytics schema")
-    parser.add_argument("action", choices=["create", "drop", "recreate", "refresh"])
+    parser.add_argument(
+        "action",
+        choices=["create", "migrate", "drop", "recreate", "refresh"],
+        help="migrate is create_schema run against an existing database (upgrades legacy fact tables)",
+    )
     parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
     args = parser.parse_args()
 
@@ -370,6 +931,9 @@ if __name__ == "__main__":
         if args.action == "create":
             create_schema(conn)
             print("Schema created.")
+        elif args.action == "migrate":
+            create_schema(conn)
+            print("Schema migrated.")
         elif args.action == "drop":
             drop_all(conn)
             print("Schema dropped.")
@@ -378,5 +942,5 @@ if __name__ == "__main__":
             create_schema(conn)
             print("Schema recreated.")
         elif args.action == "refresh":
-            refresh_materialized_views(conn)
-            print("Materialized views refreshed.")
+            refresh_materialized_views(args.database_url)
+            print("Summary tables refreshed.")
@@ -11,17 +11,42 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import hashlib
+import itertools
 import json
 import random
 import re
 import shutil
 import urllib.parse
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from html import unescape
 from pathlib import Path
 from typing import Any
-
-from playwright.async_api import BrowserContext, Error as PlaywrightError, Page, async_playwright
+from weakref import WeakKeyDictionary
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional; large state files are then parsed in one piece
+    ijson = None
+
+from playwright.async_api import (
+    BrowserContext,
+    Error as PlaywrightError,
+    Locator,
+    Page,
+    Route,
+    TimeoutError as PlaywrightTimeoutError,
+    async_playwright,
+)
 
 ORDER_DETAILS_URL = "https://www.toasttab.com/restaurants/admin/reports/home#sales-order-details"
 HEADLESS_CHROME_USER_AGENT = (
@@ -34,6 +59,12 @@ DEFAULT_CONFIG_PATH = (
 )
 
 
+PAYMENTS_ROOT = "#sales-payments"
+ORDER_DETAILS_ROOT = "#sales-order-details"
+PAYMENTDETAILS_PATH_FRAGMENT = "/restaurants/admin/reports/paymentdetails"
+# Order Details tab data: orderdetailstab (tab load) and orderdetailspage (paging)
+ORDER_DETAILS_PATH_FRAGMENT = "/restaurants/admin/reports/orderdetails"
+
 DEFAULT_SELECTORS: dict[str, Any] = {
     "payments": {
         "table_rows": "#sales-payments table tbody tr",
@@ -57,12 +88,8 @@ DEFAULT_SELECTORS: dict[str, Any] = {
             "#sales-payments .per-page-selector .dropdown-menu a:has-text('100')",
             "#sales-payments a:has-text('100')",
         ],
+        # Bare selectors: lookups try them under PAYMENTS_ROOT first, then page-wide.
         "date_start_input": [
-            "#sales-payments input[name='reportDateStart']",
-            "#sales-payments #startDate",
-            "#sales-payments input[name*='start' i]",
-            "#sales-payments input[aria-label*='start' i]",
-            "#sales-payments input[placeholder*='Start' i]",
             "input[name='reportDateStart']",
             "#startDate",
             "input[name*='start' i]",
@@ -70,11 +97,6 @@ DEFAULT_SELECTORS: dict[str, Any] = {
             "input[placeholder*='Start' i]",
         ],
         "date_end_input": [
-            "#sales-payments input[name='reportDateEnd']",
-            "#sales-payments #endDate",
-            "#sales-payments input[name*='end' i]",
-            "#sales-payments input[aria-label*='end' i]",
-            "#sales-payments input[placeholder*='End' i]",
             "input[name='reportDateEnd']",
             "#endDate",
             "input[name*='end' i]",
@@ -82,10 +104,6 @@ DEFAULT_SELECTORS: dict[str, Any] = {
             "input[placeholder*='End' i]",
         ],
         "apply_button": [
-            "#sales-payments #update-btn",
-            "#sales-payments #filter-apply-handler",
-            "#sales-payments button:has-text('Apply')",
-            "#sales-payments button:has-text('Update')",
             "#update-btn",
             "#filter-apply-handler",
             "button:has-text('Apply')",
@@ -180,13 +198,34 @@ DEFAULT_SELECTORS: dict[str, Any] = {
 }
 
 
+_UTC = timezone.utc
+
+
 def utc_now() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    # Second precision is plenty for log lines and avoids formatting microseconds.
+    return datetime.now(_UTC).isoformat(timespec="seconds")
+
+
+def utc_now_ms() -> str:
+    return datetime.now(_UTC).isoformat(timespec="milliseconds")
+
+
+def json_loads(data: str | bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def json_line(record: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=True) + "\n").encode("ascii")
 
 
 def log_event(event: str, **payload: Any) -> None:
     record = {"ts": utc_now(), "event": event, **payload}
-    print(json.dumps(record, ensure_ascii=True), flush=True)
+    if orjson is not None:
+        print(orjson.dumps(record).decode("utf-8"), flush=True)
+    else:
+        print(json.dumps(record, ensure_ascii=True), flush=True)
 
 
 def jitter_ms(min_ms: int, max_ms: int) -> int:
@@ -206,11 +245,16 @@ async def human_pause(
     delay = jitter_ms(min_ms, max_ms)
     if delay <= 0:
         return
-    if label:
+    if label and delay > 100:
         log_event("human_pause", label=label, ms=delay)
     await asyncio.sleep(delay / 1000.0)
 
 
+def poll_delay(attempt: int, base: float = 0.05, cap: float = 0.8) -> float:
+    """Truncated exponential poll interval in seconds: 50ms, 75ms, ... up to ``cap``."""
+    return min(cap, base * 1.5**attempt)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Extract Toast check data with resume support.")
     parser.add_argument("--start-date", help="Start date (YYYY-MM-DD) for payments report")
@@ -299,6 +343,12 @@ def parse_args() -> argparse.Namespace:
         default="output/toast_artifacts",
         help="Directory for auth/debug screenshots and HTML snapshots.",
     )
+    parser.add_argument(
+        "--deep-debug",
+        action="store_true",
+        help="Save full-page PNG debug screenshots instead of viewport JPEGs, and log the "
+        "report's date inputs after each date change.",
+    )
     parser.add_argument(
         "--config",
         default=str(DEFAULT_CONFIG_PATH),
@@ -317,6 +367,20 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Run browser in headless mode (default headful for manual login)",
     )
+    parser.add_argument(
+        "--block-resources",
+        dest="block_resources",
+        action="store_true",
+        help="Abort image, font and media requests; report tables only need the DOM (default).",
+    )
+    parser.add_argument(
+        "--no-block-resources",
+        dest="block_resources",
+        action="store_false",
+        help="Load every resource, e.g. when taking debug screenshots.",
+    )
+    # Stylesheets stay: visibility checks rely on computed style.
+    parser.set_defaults(block_resources=True)
     parser.add_argument(
         "--headless-user-agent",
         default=HEADLESS_CHROME_USER_AGENT,
@@ -355,14 +419,14 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--human-min-delay-ms",
         type=int,
-        default=250,
-        help="Minimum jitter delay between actions (milliseconds).",
+        default=None,
+        help="Minimum jitter delay between actions (milliseconds; default 250, or 0 with --headless).",
     )
     parser.add_argument(
         "--human-max-delay-ms",
         type=int,
-        default=900,
-        help="Maximum jitter delay between actions (milliseconds).",
+        default=None,
+        help="Maximum jitter delay between actions (milliseconds; default 900, or 50 with --headless).",
     )
     parser.add_argument(
         "--detail-start-min-interval-ms",
@@ -375,7 +439,13 @@ def parse_args() -> argparse.Namespace:
         default="",
         help="Path for combined JSON output (checks + menu summary). If set, writes the combined format.",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    # Unattended headless runs have nobody to look human for; explicit values still win.
+    if args.human_min_delay_ms is None:
+        args.human_min_delay_ms = 0 if args.headless else 250
+    if args.human_max_delay_ms is None:
+        args.human_max_delay_ms = 50 if args.headless else 900
+    return args
 
 
 def deep_merge(base: dict[str, Any], extra: dict[str, Any]) -> dict[str, Any]:
@@ -394,21 +464,115 @@ def load_config(path: str) -> dict[str, Any]:
     if config_path.exists():
         extra = json.loads(config_path.read_text(encoding="utf-8"))
         config = deep_merge(DEFAULT_SELECTORS, extra)
+    selectors_for(config)
     return config
 
 
+@dataclass(frozen=True, slots=True)
+class Selectors:
+    """Flattened, immutable view of a merged selector config.
+
+    Built once per config so hot loops read an attribute instead of walking
+    nested dicts and allocating default lists on every lookup.
+    """
+
+    payments_table_rows: str
+    payments_table_headers: str
+    payments_next_button: tuple[str, ...]
+    payments_per_page_select: tuple[str, ...]
+    payments_per_page_100_option: tuple[str, ...]
+    payments_date_start_input: tuple[str, ...]
+    payments_date_end_input: tuple[str, ...]
+    payments_apply_button: tuple[str, ...]
+    tab_link: tuple[str, ...]
+    top_items_table: tuple[str, ...]
+    top_items_per_page_select: tuple[str, ...]
+    top_items_per_page_100_option: tuple[str, ...]
+    top_items_next_button: tuple[str, ...]
+    show_hide_columns_button: tuple[str, ...]
+    order_blocks: tuple[str, ...]
+    order_next_button: tuple[str, ...]
+    logged_out_markers: tuple[str, ...]
+    username_inputs: tuple[str, ...]
+    password_inputs: tuple[str, ...]
+    submit_buttons: tuple[str, ...]
+    not_now_buttons: tuple[str, ...]
+    authenticated_markers: tuple[str, ...]
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "Selectors":
+        payments = config.get("payments") or {}
+        order_details = config.get("order_details") or {}
+        auth = config.get("auth") or {}
+
+        def many(section: dict[str, Any], key: str) -> tuple[str, ...]:
+            value = section.get(key) or ()
+            return (value,) if isinstance(value, str) else tuple(value)
+
+        return cls(
+            payments_table_rows=str(payments.get("table_rows") or ""),
+            payments_table_headers=str(payments.get("table_headers") or ""),
+            payments_next_button=many(payments, "next_button"),
+            payments_per_page_select=many(payments, "per_page_select"),
+            payments_per_page_100_option=many(payments, "per_page_100_option"),
+            payments_date_start_input=many(payments, "date_start_input"),
+            payments_date_end_input=many(payments, "date_end_input"),
+            payments_apply_button=many(payments, "apply_button"),
+            tab_link=many(order_details, "tab_link"),
+            top_items_table=many(order_details, "top_items_table"),
+            top_items_per_page_select=many(order_details, "top_items_per_page_select"),
+            top_items_per_page_100_option=many(order_details, "top_items_per_page_100_option"),
+            top_items_next_button=many(order_details, "top_items_next_button"),
+            show_hide_columns_button=many(order_details, "show_hide_columns_button"),
+            order_blocks=many(order_details, "order_blocks"),
+            order_next_button=many(order_details, "order_next_button"),
+            logged_out_markers=many(auth, "logged_out_markers"),
+            username_inputs=many(auth, "username_inputs"),
+            password_inputs=many(auth, "password_inputs"),
+            submit_buttons=many(auth, "submit_buttons"),
+            not_now_buttons=many(auth, "not_now_buttons"),
+            authenticated_markers=many(auth, "authenticated_markers"),
+        )
+
+
+_SELECTOR_SECTIONS = ("payments", "order_details", "auth")
+
+
+def _freeze_section(section: dict[str, Any]) -> tuple[tuple[str, Any], ...]:
+    # Selector sections are flat: each value is a selector or a list of them
+    return tuple(
+        (key, tuple(value) if isinstance(value, list) else value) for key, value in section.items()
+    )
+
+
+@lru_cache(maxsize=16)
+def _compiled_selectors(snapshot: tuple[Any, ...]) -> Selectors:
+    return Selectors.from_config(
+        {name: dict(section) for name, section in zip(_SELECTOR_SECTIONS, snapshot)}
+    )
+
+
+def selectors_for(config: dict[str, Any]) -> Selectors:
+    # Keyed on a snapshot of the selector sections rather than the dict itself,
+    # so an edited config never reads a stale compile.
+    return _compiled_selectors(
+        tuple(_freeze_section(config.get(name) or {}) for name in _SELECTOR_SECTIONS)
+    )
+
+
+# KEY=value lines; comment lines never match because a key cannot start with "#".
+# The value keeps everything after the first "=" (including "#"), as passwords may contain it.
+_ENV_LINE_RE = re.compile(r"^[ \t]*([^#\s=][^=\r\n]*?)[ \t]*=[ \t]*(.*?)[ \t]*\r?$", re.MULTILINE)
+
+
 def load_env_values(path: str) -> dict[str, str]:
     env_path = Path(path)
     if not env_path.exists():
         return {}
-    values: dict[str, str] = {}
-    for raw_line in env_path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        values[key.strip()] = value.strip().strip('"').strip("'")
-    return values
+    return {
+        match.group(1): match.group(2).strip('"').strip("'")
+        for match in _ENV_LINE_RE.finditer(env_path.read_text(encoding="utf-8"))
+    }
 
 
 def resolve_credentials(
@@ -424,10 +588,43 @@ def resolve_credentials(
     return None
 
 
-def load_state(path: Path) -> dict[str, dict[str, Any]]:
+def state_delta_path(path: Path) -> Path:
+    return path.with_suffix(".jsonl")
+
+
+def load_state_deltas(path: Path) -> list[dict[str, Any]]:
+    delta_path = state_delta_path(path)
+    if not delta_path.exists():
+        return []
+    records: list[dict[str, Any]] = []
+    for line in delta_path.read_bytes().splitlines():
+        try:
+            records.append(json_loads(line))
+        except ValueError:
+            # A crash mid-append leaves a torn final line; everything before it is intact.
+            continue
+    return records
+
+
+# Above this size the snapshot is streamed record by record (when ijson is available)
+# instead of holding the raw bytes and the decoded list in memory at once.
+STATE_STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+
+def iter_state_records(path: Path) -> Iterator[dict[str, Any]]:
     if not path.exists():
-        return {}
-    records = json.loads(path.read_text(encoding="utf-8"))
+        return
+    if ijson is not None and path.stat().st_size > STATE_STREAM_THRESHOLD_BYTES:
+        with path.open("rb") as handle:
+            # use_float keeps numbers as float rather than Decimal, which json/orjson cannot dump.
+            yield from ijson.items(handle, "item", use_float=True)
+        return
+    yield from json_loads(path.read_bytes())
+
+
+def load_state(path: Path) -> dict[str, dict[str, Any]]:
+    # Deltas left by an interrupted run replay on top of the snapshot, last write wins.
+    records = itertools.chain(iter_state_records(path), load_state_deltas(path))
     normalized: dict[str, dict[str, Any]] = {}
     for record in records:
         payment_id = record.get("payment_id")
@@ -445,19 +642,45 @@ def load_state(path: Path) -> dict[str, dict[str, Any]]:
     return normalized
 
 
-def save_state(path: Path, state: dict[str, dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    payload = sorted(state.values(), key=lambda row: row["payment_id"])
-    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+# Stdlib fallback: same output as json.dumps(..., indent=2) without rebuilding the encoder per save.
+_encode_indented = json.JSONEncoder(indent=2).encode
+
+
+def dumps_indented(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return _encode_indented(payload).encode("utf-8")
+
+
+_TMP_PATHS: dict[Path, Path] = {}
+
+
+def tmp_path_for(path: Path) -> Path:
+    tmp = _TMP_PATHS.get(path)
+    if tmp is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _TMP_PATHS[path] = path.with_suffix(path.suffix + ".tmp")
+    return tmp
+
+
+def write_json_atomic(path: Path, payload: Any) -> None:
+    tmp = tmp_path_for(path)
+    tmp.write_bytes(dumps_indented(payload))
     tmp.replace(path)
 
 
+def save_state(path: Path, state: dict[str, dict[str, Any]]) -> None:
+    write_json_atomic(path, [state[payment_id] for payment_id in sorted(state)])
+
+
+def compact_state(path: Path, state: dict[str, dict[str, Any]]) -> None:
+    # The in-memory state already holds every delta, so one full save supersedes the log.
+    save_state(path, state)
+    state_delta_path(path).unlink(missing_ok=True)
+
+
 def save_menu_summary(path: Path, rows: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(rows, indent=2), encoding="utf-8")
-    tmp.replace(path)
+    write_json_atomic(path, rows)
 
 
 def save_combined_output(
@@ -470,7 +693,6 @@ def save_combined_output(
     menu_items_summary: list[dict[str, Any]],
     checks: list[dict[str, Any]],
 ) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
     payload = {
         "from_date": from_date,
         "to_date": to_date,
@@ -479,33 +701,63 @@ def save_combined_output(
         "menu_items_summary": menu_items_summary,
         "checks": checks,
     }
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    tmp.replace(path)
+    write_json_atomic(path, payload)
+
+
+class AsyncJsonlWriter:
+    """Append-only JSONL file kept open for the duration of a batch.
 
+    Records are serialised when queued (callers may keep mutating them) and a
+    background task writes them through a 64 KiB buffer, flushing whenever the
+    queue drains rather than reopening the file per record.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._task = asyncio.create_task(self._run())
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._queue.put_nowait(json_line(record))
 
-def append_jsonl(path: Path, record: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        with self._path.open("ab", buffering=1 << 16) as handle:
+            while True:
+                line = await self._queue.get()
+                if line is None:
+                    return
+                handle.write(line)
+                if self._queue.empty():
+                    handle.flush()
 
 
 def save_progress(path: Path, state: dict[str, dict[str, Any]], run_id: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
     total = len(state)
     complete = sum(1 for row in state.values() if row.get("complete"))
     errored = sum(1 for row in state.values() if row.get("last_error"))
     payload = {
         "run_id": run_id,
-        "updated_at": utc_now(),
+        "updated_at": utc_now_ms(),
         "total": total,
         "complete": complete,
         "incomplete": total - complete,
         "errored": errored,
     }
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    tmp.replace(path)
+    write_json_atomic(path, payload)
+
+
+_SKIPPED_METADATA_KEYS = frozenset({"receipt", "detail_url", "columns", "raw_cells"})
 
 
 def normalize_metadata_fields(metadata: dict[str, Any]) -> dict[str, Any]:
@@ -516,81 +768,256 @@ def normalize_metadata_fields(metadata: dict[str, Any]) -> dict[str, Any]:
             flattened["payment_id"] = metadata["payment_id"]
         metadata = flattened
 
-    cleaned: dict[str, Any] = {}
-    for key, value in metadata.items():
-        key_text = str(key).strip()
-        if not key_text:
-            continue
-        if key_text.lower() in {"receipt", "detail_url", "columns", "raw_cells"}:
-            continue
-        cleaned[key_text] = value
-    return cleaned
+    return {
+        key_text: value
+        for key, value in metadata.items()
+        if (key_text := str(key).strip()) and key_text.lower() not in _SKIPPED_METADATA_KEYS
+    }
 
 
+@lru_cache(maxsize=128)
 def to_us_date(date_str: str) -> str:
-    parsed = datetime.strptime(date_str, "%Y-%m-%d")
+    year, month, day = (int(part) for part in date_str.split("-"))
     # Toast report date inputs use MM-DD-YYYY (for example: 02-06-2026).
-    return parsed.strftime("%m-%d-%Y")
+    return f"{month:02d}-{day:02d}-{year:04d}"
 
 
+@lru_cache(maxsize=128)
 def to_short_us_date(date_str: str) -> str:
-    parsed = datetime.strptime(date_str, "%Y-%m-%d")
+    year, month, day = (int(part) for part in date_str.split("-"))
     # Legacy hidden Toast fields use M/D/YY.
-    return f"{parsed.month}/{parsed.day}/{parsed.strftime('%y')}"
+    return f"{month}/{day}/{year % 100:02d}"
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
 
 
 def clean_text(value: Any) -> str:
-    text = re.sub(r"<[^>]+>", " ", str(value or ""))
-    text = unescape(text)
-    return re.sub(r"\s+", " ", text).strip()
+    text = str(value or "")
+    if "<" not in text and "&" not in text:
+        # Most cells arrive as plain textContent; split/join collapses whitespace in one pass.
+        return " ".join(text.split())
+    return _WS_RE.sub(" ", unescape(_TAG_RE.sub(" ", text))).strip()
+
+
+# Locators are lazy and stateless, so one per (page, selector) can be reused for the page's lifetime.
+_LOCATOR_CACHE: WeakKeyDictionary[Page, dict[str, Locator]] = WeakKeyDictionary()
+
+
+def first_locator(page: Page, selector: str) -> Locator:
+    per_page = _LOCATOR_CACHE.get(page)
+    if per_page is None:
+        per_page = _LOCATOR_CACHE[page] = {}
+        # Cached locators reference their page, so the weak key alone never expires.
+        page.once("close", lambda closed: _LOCATOR_CACHE.pop(closed, None))
+    locator = per_page.get(selector)
+    if locator is None:
+        locator = per_page[selector] = page.locator(selector).first
+    return locator
+
+
+# first_usable_locator() hits per page, keyed by (candidate list, require_visible). Retry
+# loops and per-date flows resolve the same lists repeatedly; a new document may match a
+# different candidate, so navigation clears them.
+_RESOLVED_SELECTORS: WeakKeyDictionary[Page, dict[tuple[tuple[str, ...], bool], str]] = (
+    WeakKeyDictionary()
+)
+
+
+def resolved_selectors(page: Page) -> dict[tuple[tuple[str, ...], bool], str]:
+    per_page = _RESOLVED_SELECTORS.get(page)
+    if per_page is None:
+        per_page = _RESOLVED_SELECTORS[page] = {}
+        page.on("framenavigated", lambda frame: frame.parent_frame is None and per_page.clear())
+    return per_page
+
+
+# probe_selectors() status codes, one per selector.
+_PROBE_UNSUPPORTED = -1  # Playwright-only syntax (:has-text, text=, ...); probe via a locator.
+_PROBE_MISSING = 0
+_PROBE_HIDDEN = 1
+_PROBE_VISIBLE = 2
+
+
+async def probe_selectors(
+    page: Page, selectors: Sequence[str], require_visible: bool
+) -> list[int] | None:
+    # One round-trip for every candidate instead of a locator.count() per selector.
+    try:
+        return await page.evaluate(
+            """({ sels, vis }) => {
+                const isVisible = (el) => {
+                    const r = el.getBoundingClientRect();
+                    if (r.width <= 0 || r.height <= 0) return false;
+                    return window.getComputedStyle(el).visibility !== 'hidden';
+                };
+                return sels.map((sel) => {
+                    let nodes;
+                    try {
+                        nodes = document.querySelectorAll(sel);
+                    } catch (_err) {
+                        return -1;
+                    }
+                    if (!nodes.length) return 0;
+                    if (!vis) return 1;
+                    for (const el of nodes) {
+                        if (isVisible(el)) return 2;
+                    }
+                    return 1;
+                });
+            }""",
+            {"sels": list(selectors), "vis": require_visible},
+        )
+    except Exception:
+        return None
+
+
+def scoped_candidates(scope: str, selectors: Sequence[str]) -> tuple[str, ...]:
+    # Every selector under the scope first, then the same selectors page-wide.
+    prefix = f"{scope} "
+    scoped = [sel if sel.startswith(prefix) else prefix + sel for sel in selectors]
+    return tuple(dict.fromkeys([*scoped, *selectors]))
 
 
 async def first_usable_locator(
-    page: Page, selectors: list[str], require_visible: bool = False
+    page: Page,
+    selectors: Sequence[str],
+    require_visible: bool = False,
+    *,
+    scope: str | None = None,
+    remember: bool = False,
 ) -> str | None:
-    for selector in selectors:
+    """Return the first candidate present on the page (visible, if required), else None.
+
+    With ``remember`` a hit is reused until the page navigates, for lookups repeated by
+    retry loops. Visibility can change without navigation, so callers remembering a
+    visible hit should :func:`forget_usable_locator` it when acting on it fails.
+    """
+    if scope:
+        selectors = scoped_candidates(scope, selectors)
+    cache = resolved_selectors(page) if remember else None
+    key = (tuple(selectors), require_visible)
+    if cache is not None and key in cache:
+        return cache[key]
+    resolved = await resolve_first_usable(page, key[0], require_visible)
+    if cache is not None and resolved is not None:
+        cache[key] = resolved
+    return resolved
+
+
+def forget_usable_locator(
+    page: Page,
+    selectors: Sequence[str],
+    require_visible: bool = False,
+    *,
+    scope: str | None = None,
+) -> None:
+    if scope:
+        selectors = scoped_candidates(scope, selectors)
+    resolved_selectors(page).pop((tuple(selectors), require_visible), None)
+
+
+async def locator_counts(page: Page, selectors: Sequence[str]) -> dict[str, int]:
+    """Count matches for each selector concurrently; selectors that error count as 0."""
+    counts = await asyncio.gather(
+        *(first_locator(page, selector).count() for selector in selectors),
+        return_exceptions=True,
+    )
+    return {
+        selector: count if isinstance(count, int) else 0
+        for selector, count in zip(selectors, counts)
+    }
+
+
+async def resolve_first_usable(page: Page, selectors: Sequence[str], require_visible: bool) -> str | None:
+    statuses = await probe_selectors(page, selectors, require_visible)
+    if statuses is None:
+        statuses = [_PROBE_UNSUPPORTED] * len(selectors)
+    # Selectors the in-page probe can't evaluate (Playwright-only syntax) fall back to
+    # locator counts. Only those ahead of the first in-page hit can matter; count them
+    # all at once rather than one round-trip after another.
+    fallback: list[str] = []
+    for selector, status in zip(selectors, statuses):
+        if status in (_PROBE_VISIBLE, _PROBE_HIDDEN):
+            break
+        if status == _PROBE_UNSUPPORTED:
+            fallback.extend([f"{selector}:visible", selector] if require_visible else [selector])
+    counts = await locator_counts(page, fallback) if fallback else {}
+
+    for selector, status in zip(selectors, statuses):
+        if status == _PROBE_MISSING:
+            continue
+        if status == _PROBE_VISIBLE:
+            return f"{selector}:visible" if require_visible else selector
+        if status == _PROBE_HIDDEN:
+            return selector
         candidates = [f"{selector}:visible", selector] if require_visible else [selector]
         for candidate in candidates:
-            locator = page.locator(candidate).first
-            try:
-                if await locator.count() > 0:
-                    return candidate
-            except Exception:
-                continue
+            if counts.get(candidate, 0) > 0:
+                return candidate
     return None
 
 
 async def click_first_available(
-    page: Page, selectors: list[str], require_visible: bool = True
+    page: Page, selectors: Sequence[str], require_visible: bool = True
 ) -> bool:
     selector = await first_usable_locator(page, selectors, require_visible=require_visible)
     if not selector:
         return False
     try:
-        await page.locator(selector).first.click()
+        await first_locator(page, selector).click()
         return True
     except Exception:
         return False
 
 
+_PAYMENTS_TABLE_READY = ", ".join(
+    [
+        "#sales-payments #payments-report_info",
+        "#sales-payments .per-page-selector",
+        "#sales-payments table tbody tr",
+    ]
+)
+_ORDER_DETAILS_TABLE_READY = ", ".join(
+    [
+        "#sales-order-details #top-items",
+        "#top-items_wrapper",
+        "#sales-order-details .pagination",
+    ]
+)
+
+
 async def wait_for_payments_table_ready(page: Page, timeout_sec: int = 20) -> None:
-    deadline = asyncio.get_event_loop().time() + max(1, timeout_sec)
-    while asyncio.get_event_loop().time() < deadline:
-        try:
-            if await page.locator("#sales-payments #payments-report_info").count() > 0:
-                return
-            if await page.locator("#sales-payments .per-page-selector").count() > 0:
-                return
-            if await page.locator("#sales-payments table tbody tr").count() > 0:
-                return
-        except Exception:
-            pass
-        await asyncio.sleep(0.4)
+    # Resolves as soon as any marker is attached; a timeout is not an error here.
+    try:
+        await page.wait_for_selector(
+            _PAYMENTS_TABLE_READY, state="attached", timeout=max(1, timeout_sec) * 1000
+        )
+    except PlaywrightError:
+        pass
+
+
+# Report tab each page is known to be showing. Tab links change the URL hash and Apply may
+# reload the document; either fires framenavigated, which forgets it.
+_ACTIVE_REPORT_TAB: WeakKeyDictionary[Page, dict[str, str]] = WeakKeyDictionary()
+
+
+def active_report_tab(page: Page) -> dict[str, str]:
+    state = _ACTIVE_REPORT_TAB.get(page)
+    if state is None:
+        state = _ACTIVE_REPORT_TAB[page] = {}
+        page.on("framenavigated", lambda frame: frame.parent_frame is None and state.clear())
+    return state
 
 
 async def ensure_payments_tab(page: Page) -> None:
+    state = active_report_tab(page)
+    if state.get("tab") == PAYMENTS_ROOT:
+        return
     active_selector = "#sales-payments.tab-pane.active, #sales-payments.active"
     if await page.locator(active_selector).count() > 0:
+        state["tab"] = PAYMENTS_ROOT
         return
 
     tab_selectors = [
@@ -599,7 +1026,7 @@ async def ensure_payments_tab(page: Page) -> None:
     ]
     for selector in tab_selectors:
         try:
-            locator = page.locator(selector).first
+            locator = first_locator(page, selector)
             if await locator.count() > 0 and await locator.is_visible():
                 await locator.click()
                 break
@@ -608,35 +1035,32 @@ async def ensure_payments_tab(page: Page) -> None:
 
     try:
         await page.wait_for_selector(active_selector, timeout=8000)
+        state["tab"] = PAYMENTS_ROOT
     except Exception:
         pass
 
 
 async def wait_for_order_details_table_ready(page: Page, timeout_sec: int = 20) -> None:
-    selectors = [
-        "#sales-order-details #top-items",
-        "#top-items_wrapper",
-        "#sales-order-details .pagination",
-    ]
-    deadline = asyncio.get_event_loop().time() + max(1, timeout_sec)
-    while asyncio.get_event_loop().time() < deadline:
-        for selector in selectors:
-            try:
-                if await page.locator(selector).count() > 0:
-                    return
-            except Exception:
-                continue
-        await asyncio.sleep(0.4)
+    try:
+        await page.wait_for_selector(
+            _ORDER_DETAILS_TABLE_READY, state="attached", timeout=max(1, timeout_sec) * 1000
+        )
+    except PlaywrightError:
+        pass
 
 
 async def ensure_order_details_tab(page: Page, config: dict[str, Any]) -> None:
+    state = active_report_tab(page)
+    if state.get("tab") == ORDER_DETAILS_ROOT:
+        return
     active_selector = "#sales-order-details.tab-pane.active, #sales-order-details.active"
     if await page.locator(active_selector).count() > 0:
+        state["tab"] = ORDER_DETAILS_ROOT
         return
 
-    for selector in config.get("order_details", {}).get("tab_link", []):
+    for selector in selectors_for(config).tab_link:
         try:
-            locator = page.locator(selector).first
+            locator = first_locator(page, selector)
             if await locator.count() > 0 and await locator.is_visible():
                 await locator.click()
                 break
@@ -645,6 +1069,7 @@ async def ensure_order_details_tab(page: Page, config: dict[str, Any]) -> None:
 
     try:
         await page.wait_for_selector(active_selector, timeout=8000)
+        state["tab"] = ORDER_DETAILS_ROOT
     except Exception:
         pass
 
@@ -658,9 +1083,9 @@ async def set_top_items_per_page(
     human_max_delay_ms: int = 900,
 ) -> None:
     await wait_for_order_details_table_ready(page, timeout_sec=20)
-    selectors = config.get("order_details", {}).get("top_items_per_page_select", [])
+    selectors = selectors_for(config).top_items_per_page_select
     for _ in range(4):
-        selector = await first_usable_locator(page, selectors, require_visible=False)
+        selector = await first_usable_locator(page, selectors, require_visible=False, remember=True)
         if selector:
             try:
                 js_updated = await page.evaluate(
@@ -678,7 +1103,7 @@ async def set_top_items_per_page(
                     {"selectors": selectors, "value": str(per_page)},
                 )
                 if not js_updated:
-                    await page.locator(selector).first.select_option(str(per_page), force=True, timeout=2000)
+                    await first_locator(page, selector).select_option(str(per_page), force=True, timeout=2000)
                 await page.wait_for_timeout(700)
                 await human_pause(
                     page,
@@ -694,12 +1119,12 @@ async def set_top_items_per_page(
     if per_page == 100:
         option_selector = await first_usable_locator(
             page,
-            config.get("order_details", {}).get("top_items_per_page_100_option", []),
+            selectors_for(config).top_items_per_page_100_option,
             require_visible=True,
         )
         if option_selector:
             try:
-                await page.locator(option_selector).first.click(timeout=3000)
+                await first_locator(page, option_selector).click(timeout=3000)
                 await page.wait_for_timeout(700)
                 return
             except Exception:
@@ -710,13 +1135,13 @@ async def expand_menu_item_summary_columns(page: Page, config: dict[str, Any]) -
     # Column visibility is optional; if unavailable we keep default columns and continue.
     button_selector = await first_usable_locator(
         page,
-        config.get("order_details", {}).get("show_hide_columns_button", []),
+        selectors_for(config).show_hide_columns_button,
         require_visible=True,
     )
     if not button_selector:
         return
     try:
-        await page.locator(button_selector).first.click(timeout=2000)
+        await first_locator(page, button_selector).click(timeout=2000)
         await page.wait_for_timeout(250)
         await page.evaluate(
             """() => {
@@ -725,25 +1150,9 @@ async def expand_menu_item_summary_columns(page: Page, config: dict[str, Any]) -
                     document.querySelector('.ColVis_collectionBackground')?.nextElementSibling;
                 if (!collection) return false;
 
-                const clickNode = (node) => {
-                    if (!node) return;
-                    if (node.tagName && node.tagName.toLowerCase() === 'input') {
-                        if (!node.checked) node.click();
-                        return;
-                    }
-                    const checkbox = node.querySelector('input[type="checkbox"]');
-                    if (checkbox && !checkbox.checked) {
-                        checkbox.click();
-                        return;
-                    }
-                    const marker = node.className || '';
-                    if (String(marker).includes('ColVis')) {
-                        node.click();
-                    }
-                };
-
-                for (const item of Array.from(collection.querySelectorAll('li, button, a, span'))) {
-                    clickNode(item);
+                // Unchecked boxes are exactly the hidden columns; one selector query finds them all.
+                for (const checkbox of collection.querySelectorAll('input[type="checkbox"]:not(:checked)')) {
+                    checkbox.click();
                 }
                 return true;
             }"""
@@ -757,28 +1166,70 @@ async def expand_menu_item_summary_columns(page: Page, config: dict[str, Any]) -
             pass
 
 
-async def extract_menu_item_summary_rows(page: Page, config: dict[str, Any]) -> list[dict[str, Any]]:
-    table_selector = await first_usable_locator(
-        page,
-        config.get("order_details", {}).get("top_items_table", []),
-        require_visible=False,
-    )
-    if not table_selector:
-        return []
+_MENU_SUMMARY_TABLE_JS = """(tableSelectors) => {
+    let table = null;
+    for (const selector of tableSelectors || []) {
+        try {
+            table = document.querySelector(selector);
+        } catch (err) {
+            continue;
+        }
+        if (table) break;
+    }
+    if (!table) return { headers: [], rows: [] };
+    const headers = Array.from(table.querySelectorAll("thead th"))
+        .map((el) => (el.textContent || "").trim());
+    const rows = Array.from(table.querySelectorAll("tbody tr")).map((row) =>
+        Array.from(row.querySelectorAll("th,td")).map((cell) => (cell.textContent || "").trim())
+    );
+    return { headers, rows };
+}"""
+
+_CLICK_ENABLED_NEXT_JS = """(candidateSelectors) => {
+    // Native check covers display/visibility/opacity, including ancestors.
+    const isVisible = (el) =>
+        !!el && el.checkVisibility({ checkOpacity: true, checkVisibilityCSS: true });
+    for (const selector of candidateSelectors || []) {
+        let nodes;
+        try {
+            nodes = Array.from(document.querySelectorAll(selector));
+        } catch (err) {
+            // Playwright-only syntax such as :has-text() is not valid CSS here.
+            continue;
+        }
+        for (const node of nodes) {
+            if (!isVisible(node)) continue;
+            const ariaDisabled = (node.getAttribute('aria-disabled') || '').toLowerCase() === 'true';
+            const disabledAttr = node.getAttribute('disabled') != null;
+            const className = (node.getAttribute('class') || '').toLowerCase();
+            const parentClass = (node.parentElement?.getAttribute('class') || '').toLowerCase();
+            if (ariaDisabled || disabledAttr) continue;
+            if (className.includes('disabled') || parentClass.includes('disabled')) continue;
+            node.click();
+            return true;
+        }
+    }
+    return false;
+}"""
+
+# One round-trip per page: read the table, then (optionally) click Next. The click comes
+# last so the rows always describe the page as it was before paginating.
+_MENU_SUMMARY_STEP_JS = (
+    """({ tableSelectors, nextSelectors, advance }) => {
+    const readTable = ("""
+    + _MENU_SUMMARY_TABLE_JS
+    + """);
+    const clickNext = ("""
+    + _CLICK_ENABLED_NEXT_JS
+    + """);
+    const table = readTable(tableSelectors);
+    const clicked = advance ? clickNext(nextSelectors) : false;
+    return { table, clicked };
+}"""
+)
 
-    payload = await page.evaluate(
-        """(selector) => {
-            const table = document.querySelector(selector);
-            if (!table) return { headers: [], rows: [] };
-            const headers = Array.from(table.querySelectorAll("thead th"))
-                .map((el) => (el.textContent || "").trim());
-            const rows = Array.from(table.querySelectorAll("tbody tr")).map((row) =>
-                Array.from(row.querySelectorAll("th,td")).map((cell) => (cell.textContent || "").trim())
-            );
-            return { headers, rows };
-        }""",
-        table_selector,
-    )
+
+def map_menu_summary_table(payload: dict[str, Any]) -> list[dict[str, Any]]:
     headers = [clean_text(header) for header in payload.get("headers", []) if clean_text(header)]
     mapped_rows: list[dict[str, Any]] = []
     for row in payload.get("rows", []):
@@ -794,44 +1245,85 @@ async def extract_menu_item_summary_rows(page: Page, config: dict[str, Any]) ->
     return mapped_rows
 
 
-async def click_next_menu_item_summary_page(page: Page, config: dict[str, Any]) -> bool:
-    selectors = config.get("order_details", {}).get("top_items_next_button", [])
-    try:
-        clicked = await page.evaluate(
-            """(candidateSelectors) => {
-                const isVisible = (el) => {
-                    if (!el) return false;
-                    const r = el.getBoundingClientRect();
-                    if (r.width <= 0 || r.height <= 0) return false;
-                    const style = window.getComputedStyle(el);
-                    if (!style) return true;
-                    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') return false;
-                    return true;
-                };
-                for (const selector of candidateSelectors || []) {
-                    const nodes = Array.from(document.querySelectorAll(selector));
-                    for (const node of nodes) {
-                        if (!isVisible(node)) continue;
-                        const ariaDisabled = (node.getAttribute('aria-disabled') || '').toLowerCase() === 'true';
-                        const disabledAttr = node.getAttribute('disabled') != null;
-                        const className = (node.getAttribute('class') || '').toLowerCase();
-                        const parentClass = (node.parentElement?.getAttribute('class') || '').toLowerCase();
-                        if (ariaDisabled || disabledAttr) continue;
-                        if (className.includes('disabled') || parentClass.includes('disabled')) continue;
-                        node.click();
-                        return true;
-                    }
-                }
-                return false;
-            }""",
-            selectors,
-        )
-        if clicked:
-            await page.wait_for_timeout(700)
-            return True
-    except Exception:
-        pass
-    return False
+async def fetch_menu_item_summary_page(
+    page: Page,
+    config: dict[str, Any],
+    *,
+    advance: bool,
+) -> tuple[list[dict[str, Any]], bool]:
+    """Read the menu item summary table and, if ``advance``, click Next in the same evaluate."""
+    selectors = selectors_for(config)
+    result = await page.evaluate(
+        _MENU_SUMMARY_STEP_JS,
+        {
+            "tableSelectors": list(selectors.top_items_table),
+            "nextSelectors": list(selectors.top_items_next_button),
+            "advance": advance,
+        },
+    )
+    return map_menu_summary_table(result.get("table") or {}), bool(result.get("clicked"))
+
+
+def row_digest(row: dict[str, Any]) -> bytes:
+    # Rows are built in header order from the same table on every page, so item order is
+    # already canonical; empty cells are omitted, hence column names are part of the digest.
+    canonical = "\x1f".join(f"{key}\x1e{value}" for key, value in row.items())
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+class MenuSummaryColumns:
+    """Accepted menu summary rows stored column-wise: one list per header, not a dict per row.
+
+    Empty cells are omitted from rows, so a column a row lacks holds None and ``to_rows()``
+    drops it again.
+    """
+
+    __slots__ = ("columns", "length")
+
+    def __init__(self) -> None:
+        self.columns: dict[str, list[Any]] = {}
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, row: dict[str, Any]) -> None:
+        columns = self.columns
+        for key, value in row.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * self.length
+            column.append(value)
+        self.length += 1
+        if len(row) != len(columns):
+            for column in columns.values():
+                if len(column) < self.length:
+                    column.append(None)
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        items = self.columns.items()
+        return [
+            {key: column[index] for key, column in items if column[index] is not None}
+            for index in range(self.length)
+        ]
+
+
+def dedup_menu_rows(
+    rows: list[dict[str, Any]],
+    seen_keys: set[bytes],
+    all_rows: MenuSummaryColumns,
+) -> bytes:
+    """Append unseen rows to ``all_rows`` and return the digest of the page's first row."""
+    first_row_key = b""
+    for row in rows:
+        key = row_digest(row)
+        if not first_row_key:
+            first_row_key = key
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        all_rows.append(row)
+    return first_row_key
 
 
 async def crawl_menu_item_summary(
@@ -843,7 +1335,8 @@ async def crawl_menu_item_summary(
     *,
     human_min_delay_ms: int = 250,
     human_max_delay_ms: int = 900,
-) -> list[dict[str, Any]]:
+    deep_debug: bool = False,
+) -> MenuSummaryColumns:
     await page.goto(ORDER_DETAILS_URL, wait_until="domcontentloaded", timeout=45000)
     await ensure_order_details_tab(page, config)
     await set_date_range(
@@ -853,6 +1346,7 @@ async def crawl_menu_item_summary(
         end_date,
         human_min_delay_ms=human_min_delay_ms,
         human_max_delay_ms=human_max_delay_ms,
+        deep_debug=deep_debug,
     )
     await ensure_order_details_tab(page, config)
     await wait_for_order_details_table_ready(page, timeout_sec=20)
@@ -865,27 +1359,32 @@ async def crawl_menu_item_summary(
     )
     await expand_menu_item_summary_columns(page, config)
 
-    all_rows: list[dict[str, Any]] = []
-    seen_keys: set[str] = set()
-    page_signatures: set[str] = set()
+    all_rows = MenuSummaryColumns()
+    # 16-byte digests keep the dedup set small however many pages the crawl covers.
+    seen_keys: set[bytes] = set()
+    page_signatures: set[int] = set()
     page_count = 0
     while True:
         page_count += 1
-        rows = await extract_menu_item_summary_rows(page, config)
-        signature_parts: list[str] = []
-        for row in rows:
-            key = "|".join(f"{k}:{row[k]}" for k in sorted(row.keys()))
-            if key in seen_keys:
-                continue
-            seen_keys.add(key)
-            all_rows.append(row)
-            if len(signature_parts) < 4:
-                signature_parts.append(key)
+        rows, clicked = await fetch_menu_item_summary_page(
+            page,
+            config,
+            advance=not (max_pages and page_count >= max_pages),
+        )
+        # The click went out with the extraction, so dedup this page in a worker thread
+        # while the browser renders the next one.
+        dedup = asyncio.to_thread(dedup_menu_rows, rows, seen_keys, all_rows)
+        if clicked:
+            first_row_key, _ = await asyncio.gather(dedup, page.wait_for_timeout(700))
+        else:
+            first_row_key = await dedup
 
         log_event("menu_summary_page_fetched", page=page_count, rows=len(rows), accepted=len(all_rows))
 
-        signature = "|".join(signature_parts) if signature_parts else ""
-        if signature:
+        # Keyed on the page as fetched (not only newly accepted rows), so a "next" click
+        # that leaves the table unchanged is caught on the repeat.
+        if first_row_key:
+            signature = int.from_bytes(first_row_key[:8], "big")
             if signature in page_signatures:
                 log_event(
                     "menu_summary_pagination_stalled",
@@ -895,9 +1394,7 @@ async def crawl_menu_item_summary(
                 break
             page_signatures.add(signature)
 
-        if max_pages and page_count >= max_pages:
-            break
-        if not await click_next_menu_item_summary_page(page, config):
+        if not clicked:
             break
         await human_pause(
             page,
@@ -909,77 +1406,592 @@ async def crawl_menu_item_summary(
     return all_rows
 
 
-async def detect_no_items_message(page: Page) -> str | None:
-    """Return a snippet containing the 'no items/no data' message if present."""
-    try:
-        snippet = await page.evaluate(
-            """() => {
-                const text = (document.body?.innerText || '').replace(/\\s+/g, ' ').trim();
-                const lower = text.toLowerCase();
-                const patterns = [
-                    'no items exist for this time period',
-                    'no items exist',
-                    'no results',
-                    'no data',
-                ];
-                for (const pat of patterns) {
-                    const idx = lower.indexOf(pat);
-                    if (idx >= 0) {
-                        return text.slice(Math.max(0, idx - 80), Math.min(text.length, idx + pat.length + 160));
-                    }
+# Page-side helpers for the order details report. install_page_helpers() defines them once
+# per context as window.__toast so each call ships only a name over CDP instead of the
+# source; call_page_helper() falls back to evaluating the source on documents that predate
+# the install (or contexts that never ran it, such as the pagination test).
+PAGE_HELPERS_JS: dict[str, str] = {
+    "detectNoItems": """() => {
+        const patterns = [
+            'no items exist for this time period',
+            'no items exist',
+            'no results',
+            'no data',
+        ];
+        const snippetOf = (raw) => {
+            const text = (raw || '').replace(/\\s+/g, ' ').trim();
+            const lower = text.toLowerCase();
+            for (const pat of patterns) {
+                const idx = lower.indexOf(pat);
+                if (idx >= 0) {
+                    return text.slice(Math.max(0, idx - 80), Math.min(text.length, idx + pat.length + 160));
                 }
-                return '';
-            }"""
-        )
-        return snippet if isinstance(snippet, str) and snippet.strip() else None
-    except Exception:
-        return None
-
+            }
+            return '';
+        };
+        // innerText would materialise (and lay out) the whole report on every poll. Check
+        // the usual empty-state containers, then walk text nodes and stop at the first
+        // visible match; visibility is only computed for candidate matches.
+        const shown = (el) => el.checkVisibility({ checkVisibilityCSS: true });
+        const containers = document.querySelectorAll(
+            ".dataTables_empty, .no-results, .empty-state, [data-empty='true'], [role='status']"
+        );
+        for (const el of containers) {
+            const snippet = snippetOf(el.textContent);
+            if (snippet && shown(el)) return snippet;
+        }
+        if (!document.body) return '';
+        const skip = new Set(['NOSCRIPT', 'SCRIPT', 'STYLE', 'TEMPLATE']);
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+        for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+            const parent = n.parentElement;
+            if (!parent || skip.has(parent.tagName) || n.data.length < 7) continue;
+            if (!snippetOf(n.data) || !shown(parent)) continue;
+            const block = parent.closest('div, p, td, li, section') || parent;
+            return snippetOf(block.textContent) || snippetOf(n.data);
+        }
+        return '';
+    }""",
+    "paginationSummary": """() => {
+        const spans = Array.from(document.querySelectorAll('.pagination-summary'));
+        if (!spans.length) return null;
+        const last = spans[spans.length - 1];
+        const text = (last.textContent || '').trim();
+        const m = text.match(/Showing\\s+(\\d+)\\s+through\\s+(\\d+)\\s+of\\s+(\\d+)/i);
+        if (!m) return null;
+        return { start: parseInt(m[1], 10), end: parseInt(m[2], 10), total: parseInt(m[3], 10) };
+    }""",
+    "clickNextOrderPage": """() => {
+        // Native check covers display/visibility/opacity, including ancestors.
+        const isVisible = (el) =>
+            !!el && el.checkVisibility({ checkOpacity: true, checkVisibilityCSS: true });
+        const paginationDivs = Array.from(document.querySelectorAll('.pagination'));
+        if (!paginationDivs.length) return false;
+        const lastPagination = paginationDivs[paginationDivs.length - 1];
+        const nextLi = lastPagination.querySelector('li.next');
+        if (!nextLi) return false;
+        const className = (nextLi.getAttribute('class') || '').toLowerCase();
+        if (className.includes('disabled')) return false;
+        const anchor = nextLi.querySelector('a');
+        if (!anchor || !isVisible(anchor)) return false;
+        anchor.click();
+        return true;
+    }""",
+    "extractBlocks": """(orderSelectors) => {
+        const blocks = [];
+        const seen = new Set();
+        for (const selector of orderSelectors) {
+            for (const node of Array.from(document.querySelectorAll(selector))) {
+                if (seen.has(node)) continue;
+                seen.add(node);
+                blocks.push(node);
+            }
+        }
 
-async def wait_for_order_details_idle(page: Page, timeout_sec: int = 35) -> None:
-    """Heuristic wait for the report to stop showing spinners/loading overlays."""
-    deadline = asyncio.get_event_loop().time() + max(1, timeout_sec)
-    while asyncio.get_event_loop().time() < deadline:
-        try:
-            loading_visible = await page.evaluate(
-                """() => {
-                    const selectors = [
-                        '[aria-busy=\"true\"]',
-                        '.loading',
-                        '.spinner',
-                        '.progress',
-                        'img[alt*=\"Loading\" i]',
-                    ];
-                    const isVisible = (el) => {
-                        const r = el.getBoundingClientRect();
-                        return r.width > 0 && r.height > 0;
-                    };
-                    for (const sel of selectors) {
-                        const el = document.querySelector(sel);
-                        if (el && isVisible(el)) return true;
+        // Compiled once per call rather than per block.
+        const ORDER_NUMBER_RE = /Order\\s*#\\s*(\\d+)/i;
+        const SOURCE_RE = /Source\\s*:\\s*\\n+([^\\n]+)/i;
+        const CHECK_ID_RE = /ID\\s*:\\s*([A-Za-z0-9_-]+)/i;
+        const FORM_ID_RE = /id=([A-Za-z0-9_-]+)/i;
+
+        // Header and label strings repeat across blocks, so memoise per evaluate call.
+        const normCache = new Map();
+        const normalize = (text) => {
+            if (!text) return "";
+            let out = normCache.get(text);
+            if (out === undefined) {
+                out = text.replace(/\\s+/g, " ").trim();
+                normCache.set(text, out);
+            }
+            return out;
+        };
+        // Line-structured text like innerText, but read from the DOM without forcing a
+        // layout: a break at <br> and block boundaries, script/style and hidden nodes skipped.
+        const BLOCK_TAGS = new Set([
+            "ADDRESS", "ARTICLE", "BR", "DD", "DIV", "DL", "DT", "FORM", "H1", "H2", "H3", "H4",
+            "H5", "H6", "HR", "LI", "OL", "OPTION", "P", "SECTION", "TABLE", "TBODY", "TFOOT",
+            "THEAD", "TR", "UL",
+        ]);
+        const SKIP_TAGS = new Set(["NOSCRIPT", "SCRIPT", "STYLE", "TEMPLATE"]);
+        // Table contents already travel in `tables`; leave them out of bodyText
+        // (map_detail_payload gives the regex fallbacks their text back from `tables`).
+        const BODY_SKIP_TAGS = new Set([...SKIP_TAGS, "TABLE"]);
+        const textLines = (root, skipTags = SKIP_TAGS) => {
+            const lines = [];
+            let current = "";
+            const breakLine = () => {
+                const line = normalize(current);
+                if (line) lines.push(line);
+                current = "";
+            };
+            const walk = (node) => {
+                for (let child = node.firstChild; child; child = child.nextSibling) {
+                    if (child.nodeType === Node.TEXT_NODE) {
+                        current += child.data;
+                        continue;
                     }
-                    return false;
-                }"""
-            )
-            if not loading_visible:
-                return
-        except Exception:
-            return
-        await asyncio.sleep(0.4)
+                    if (child.nodeType !== Node.ELEMENT_NODE) continue;
+                    const tag = child.tagName;
+                    if (skipTags.has(tag) || child.hidden || child.style?.display === "none") continue;
+                    const block = BLOCK_TAGS.has(tag);
+                    if (block) breakLine();
+                    walk(child);
+                    if (block) breakLine();
+                    else if (tag === "TD" || tag === "TH") current += " ";
+                }
+            };
+            walk(root);
+            breakLine();
+            return lines;
+        };
+        const summaryClasses = [
+            ["check-discounts", "discount"],
+            ["check-credits", "credits"],
+            ["check-subtotal", "subtotal"],
+            ["check-tax", "tax"],
+            ["check-tip", "tip"],
+            ["check-gratuity", "gratuity"],
+            ["check-total", "total"],
+        ];
+        // One walk over the block collects every element the extraction below needs,
+        // in document order, instead of a separate querySelector(All) per lookup.
+        const scan = (order) => {
+            const found = {
+                rows: [],
+                dls: [],
+                tables: [],
+                spanBolds: [],
+                metaIds: [],
+                summaryNodes: {},
+                serverDetails: null,
+                guestInput: null,
+                revenueCenter: null,
+                orderHeader: null,
+                reopenForm: null,
+            };
+            const walker = document.createTreeWalker(order, NodeFilter.SHOW_ELEMENT);
+            for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+                switch (n.tagName) {
+                    case "TR":
+                        found.rows.push(n);
+                        break;
+                    case "DL":
+                        found.dls.push(n);
+                        break;
+                    case "TABLE":
+                        found.tables.push(n);
+                        break;
+                    case "B":
+                        if (n.closest("div.span2")) found.spanBolds.push(n);
+                        break;
+                    case "FORM":
+                        if (!found.reopenForm && (n.getAttribute("action") || "").includes("reopencheck?id=")) {
+                            found.reopenForm = n;
+                        }
+                        break;
+                }
+                switch (n.id) {
+                    case "":
+                        break;
+                    case "num-guests":
+                        found.guestInput = found.guestInput || n;
+                        break;
+                    case "revenue-center-name":
+                        found.revenueCenter = found.revenueCenter || n;
+                        break;
+                    case "order-summary-header":
+                        found.orderHeader = found.orderHeader || n;
+                        break;
+                }
+                const classes = n.classList;
+                if (!classes.length) continue;
+                for (const [cls, field] of summaryClasses) {
+                    if (!found.summaryNodes[field] && classes.contains(cls)) found.summaryNodes[field] = n;
+                }
+                if (!found.serverDetails && classes.contains("check-server-details")) found.serverDetails = n;
+                if (classes.contains("order-detail-meta-id")) found.metaIds.push(n);
+            }
+            return found;
+        };
 
+        const records = [];
+        for (let idx = 0; idx < blocks.length; idx += 1) {
+            const order = blocks[idx];
+            const found = scan(order);
+            const pairs = {};
+
+            for (const row of found.rows) {
+                const cells = Array.from(row.querySelectorAll("th, td"))
+                    .map((el) => normalize(el.textContent))
+                    .filter(Boolean);
+                if (cells.length === 2) {
+                    const key = cells[0];
+                    if (key && !pairs[key]) {
+                        pairs[key] = cells[1];
+                    }
+                }
+            }
+
+            for (const dl of found.dls) {
+                const dts = Array.from(dl.querySelectorAll("dt"));
+                const dds = Array.from(dl.querySelectorAll("dd"));
+                for (let i = 0; i < Math.min(dts.length, dds.length); i += 1) {
+                    const key = normalize(dts[i].textContent);
+                    const val = normalize(dds[i].textContent);
+                    if (key && !pairs[key]) {
+                        pairs[key] = val;
+                    }
+                }
+            }
+
+            const tables = found.tables.map((table) => {
+                const headers = Array.from(table.querySelectorAll("thead th"))
+                    .map((el) => normalize(el.textContent));
+                const rows = Array.from(table.querySelectorAll("tbody tr")).map((row) =>
+                    Array.from(row.querySelectorAll("th, td")).map((el) => normalize(el.textContent))
+                );
+                return { headers, rows };
+            });
+
+            const summary = {};
+            for (const [, field] of summaryClasses) {
+                summary[field] = normalize(found.summaryNodes[field]?.textContent);
+            }
+
+            // Fallback: extract tip/total/gratuity from <b> label divs
+            // when CSS class selectors return empty.
+            if (!summary.tip || !summary.total || !summary.gratuity) {
+                for (const bold of found.spanBolds) {
+                    const label = normalize(bold.textContent).replace(/:$/, "").toLowerCase();
+                    const parentDiv = bold.closest("div.span2");
+                    const siblingDiv = parentDiv ? parentDiv.nextElementSibling : null;
+                    if (!siblingDiv) continue;
+                    const val = normalize(siblingDiv.textContent);
+                    if (!val) continue;
+                    if (label === "tip" && !summary.tip) summary.tip = val;
+                    if (label === "total" && !summary.total) summary.total = val;
+                    if (label === "gratuity" && !summary.gratuity) summary.gratuity = val;
+                }
+            }
+
+            const summaryDetails = {};
+            const detailsBlock = found.serverDetails;
+            if (detailsBlock) {
+                const lines = textLines(detailsBlock);
+                const labelBlock = detailsBlock.previousElementSibling;
+                const labels = [];
+                if (labelBlock) {
+                    for (const el of Array.from(labelBlock.querySelectorAll("b"))) {
+                        const label = normalize(el.textContent).replace(/:$/, "").toLowerCase();
+                        if (label) labels.push(label);
+                    }
+                }
+                const byLabel = {};
+                let labelIndex = 0;
+                let lastLabel = "";
+                for (const line of lines) {
+                    const isContinuation = line.startsWith("(") && lastLabel;
+                    if (isContinuation) {
+                        byLabel[lastLabel] = `${byLabel[lastLabel]} ${line}`.trim();
+                        continue;
+                    }
+                    if (labelIndex < labels.length) {
+                        const label = labels[labelIndex];
+                        byLabel[label] = line;
+                        lastLabel = label;
+                        labelIndex += 1;
+                    } else if (lastLabel) {
+                        byLabel[lastLabel] = `${byLabel[lastLabel]} ${line}`.trim();
+                    }
+                }
+                if (byLabel["time opened"]) summaryDetails.time_opened = byLabel["time opened"];
+                if (byLabel["server"]) summaryDetails.server = byLabel["server"];
+                if (!summaryDetails.server && byLabel["opened by server"]) {
+                    summaryDetails.server = byLabel["opened by server"];
+                }
+                if (byLabel["table"]) summaryDetails.table = byLabel["table"];
+                if (byLabel["tab name"]) summaryDetails.tab_name = byLabel["tab name"];
+                if (!summaryDetails.time_opened && lines.length > 0) {
+                    summaryDetails.time_opened = lines[0];
+                }
+                if (!summaryDetails.server && lines.length > 1) {
+                    summaryDetails.server = lines[1];
+                }
+                if (!summaryDetails.table && lines.length > 1) {
+                    const fallbackIndex = Math.max(0, lines.length - 2);
+                    summaryDetails.table = lines[fallbackIndex] || lines[lines.length - 1];
+                }
+            }
+            const guestInput = found.guestInput;
+            if (guestInput && guestInput.value) {
+                summaryDetails.guest_count = normalize(guestInput.value);
+            }
+            const revenueCenter = found.revenueCenter;
+            if (revenueCenter) {
+                summaryDetails.revenue_center = normalize(revenueCenter.textContent);
+            }
+
+            const bodyText = textLines(order, BODY_SKIP_TAGS).join("\\n");
+            let orderNumber = "";
+            const orderHeaderText = normalize(found.orderHeader?.textContent);
+            if (orderHeaderText) {
+                const match = orderHeaderText.match(ORDER_NUMBER_RE);
+                if (match) orderNumber = match[1];
+            }
+
+            let source = "";
+            const sourceMatch = bodyText.match(SOURCE_RE);
+            if (sourceMatch) {
+                source = normalize(sourceMatch[1]);
+            }
+
+            let checkId = "";
+            for (const el of found.metaIds) {
+                const match = normalize(el.textContent).match(CHECK_ID_RE);
+                if (match) {
+                    checkId = match[1];
+                    break;
+                }
+            }
+            if (!checkId) {
+                const form = found.reopenForm;
+                if (form) {
+                    const action = form.getAttribute("action") || "";
+                    const match = action.match(FORM_ID_RE);
+                    if (match) checkId = match[1];
+                }
+            }
+            if (!checkId) {
+                checkId = `order-${orderNumber || idx + 1}`;
+            }
+
+            const metadata = {
+                payment_id: checkId,
+                "Order #": orderNumber,
+                Source: source,
+                "Revenue Center": summaryDetails.revenue_center || "",
+            };
+
+            records.push({
+                payment_id: checkId,
+                metadata,
+                payload: {
+                    pairs,
+                    tables,
+                    summary,
+                    summaryDetails,
+                    bodyText,
+                },
+                parsed_url: `${window.location.origin}${window.location.pathname}${window.location.search}#check-${checkId}`,
+            });
+        }
+
+        return records;
+    }""",
+}
+# Composed from the helpers above (rather than calling window.__toast) so the uninstalled
+# fallback in call_page_helper() can evaluate it standalone. The click runs last, so rows
+# and summary describe the page as it was before paginating.
+PAGE_HELPERS_JS["fetchPageAndAdvance"] = (
+    """({ selectors, advance, maxRows }) => {
+        const extractBlocks = ("""
+    + PAGE_HELPERS_JS["extractBlocks"]
+    + """);
+        const paginationSummary = ("""
+    + PAGE_HELPERS_JS["paginationSummary"]
+    + """);
+        const detectNoItems = ("""
+    + PAGE_HELPERS_JS["detectNoItems"]
+    + """);
+        const clickNextOrderPage = ("""
+    + PAGE_HELPERS_JS["clickNextOrderPage"]
+    + """);
+        const rows = extractBlocks(selectors);
+        const summary = paginationSummary();
+        const atEnd = !!summary && summary.end >= summary.total;
+        let noItems = null;
+        let clicked = false;
+        if (advance && rows.length && !atEnd && !(maxRows && rows.length >= maxRows)) {
+            noItems = detectNoItems();
+            if (!noItems) clicked = clickNextOrderPage();
+        }
+        return { rows, summary, noItems, clicked };
+    }"""
+)
+PAGE_HELPERS_INIT_JS = (
+    "window.__toast = Object.assign(window.__toast || {}, {"
+    + ", ".join(f"{name}: ({source})" for name, source in PAGE_HELPERS_JS.items())
+    + "});"
+)
+
+
+def page_selectors_init_js(config: dict[str, Any]) -> str:
+    # Selector lists that per-date evaluates would otherwise re-send on every call.
+    selectors = selectors_for(config)
+    table = {
+        "dateStart": list(selectors.payments_date_start_input),
+        "dateEnd": list(selectors.payments_date_end_input),
+    }
+    return f"window.__toast = Object.assign(window.__toast || {{}}, {{ selectors: {json.dumps(table)} }});"
+
+
+async def install_page_helpers(context: BrowserContext, config: dict[str, Any] | None = None) -> None:
+    await context.add_init_script(PAGE_HELPERS_INIT_JS)
+    if config is not None:
+        await context.add_init_script(page_selectors_init_js(config))
+
+
+async def call_page_helper(page: Page, name: str, arg: Any = None) -> Any:
+    result = await page.evaluate(
+        """([name, arg]) => {
+            const helper = window.__toast && window.__toast[name];
+            return helper ? { installed: true, value: helper(arg) } : { installed: false };
+        }""",
+        [name, arg],
+    )
+    if isinstance(result, dict) and result.get("installed"):
+        return result.get("value")
+    return await page.evaluate(PAGE_HELPERS_JS[name], arg)
 
-async def save_order_details_debug_artifacts(page: Page, artifact_dir: Path, label: str) -> None:
-    """Write screenshot + HTML + basic DOM summary to help diagnose selector mismatches."""
-    artifact_dir.mkdir(parents=True, exist_ok=True)
-    safe = re.sub(r"[^a-zA-Z0-9_.-]+", "_", label).strip("_") or "debug"
 
+async def detect_no_items_message(page: Page) -> str | None:
+    """Return a snippet containing the 'no items/no data' message if present."""
+    try:
+        snippet = await call_page_helper(page, "detectNoItems")
+        return snippet if isinstance(snippet, str) and snippet.strip() else None
+    except Exception:
+        return None
+
+
+def mutation_wait_js(predicate: str) -> str:
+    """Wrap a page predicate so one evaluate resolves with its first truthy value.
+
+    The predicate is re-checked inside the page on every DOM mutation instead of
+    being polled over CDP; the promise resolves with null after ``timeoutMs``.
+    """
+    return (
+        """([arg, timeoutMs]) => new Promise((resolve) => {
+    const predicate = """
+        + predicate
+        + """;
+    let observer = null;
+    let timer = null;
+    const finish = (value) => {
+        if (observer) observer.disconnect();
+        clearTimeout(timer);
+        resolve(value);
+    };
+    const check = () => {
+        const value = predicate(arg);
+        if (value) finish(value);
+        return value;
+    };
+    if (check()) return;
+    observer = new MutationObserver(check);
+    observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    timer = setTimeout(() => finish(null), timeoutMs);
+})"""
+    )
+
+
+# Spinners and loading overlays; the report is idle once the first match of each is hidden.
+_LOADING_INDICATOR_SELECTORS = (
+    '[aria-busy="true"]',
+    ".loading",
+    ".spinner",
+    ".progress",
+    'img[alt*="Loading" i]',
+)
+
+# Like mutation_wait_js, but split so mutation batches stay cheap while the report renders:
+# each batch only checks whether any indicator exists (no layout), and the visibility
+# measurement, which forces a layout, runs at most once per 100ms while some exist.
+_ORDER_DETAILS_IDLE_WAIT_JS = (
+    """([selectors, timeoutMs]) => new Promise((resolve) => {
+    const anySelector = selectors.join(', ');
+    let observer = null;
+    let timer = null;
+    let measureTimer = null;
+    const finish = (value) => {
+        if (observer) observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(measureTimer);
+        resolve(value);
+    };
+    const loadingVisible = () => {
+        for (const sel of selectors) {
+            const el = document.querySelector(sel);
+            if (!el) continue;
+            const r = el.getBoundingClientRect();
+            if (r.width > 0 && r.height > 0) return true;
+        }
+        return false;
+    };
+    const measure = () => {
+        measureTimer = null;
+        if (!loadingVisible()) finish(true);
+    };
+    const check = () => {
+        if (!document.querySelector(anySelector)) {
+            finish(true);
+        } else if (measureTimer === null) {
+            measureTimer = setTimeout(measure, 100);
+        }
+    };
+    if (!document.querySelector(anySelector) || !loadingVisible()) return finish(true);
+    observer = new MutationObserver(check);
+    observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    timer = setTimeout(() => finish(null), timeoutMs);
+})"""
+)
+
+
+async def wait_for_order_details_idle(page: Page, timeout_sec: int = 35) -> None:
+    """Heuristic wait for the report to stop showing spinners/loading overlays."""
+    # Timeouts resolve to null and navigation errors fall through, as the poll loop did.
     try:
-        await page.screenshot(path=str(artifact_dir / f"{safe}.png"), full_page=True)
+        await page.evaluate(
+            _ORDER_DETAILS_IDLE_WAIT_JS, [list(_LOADING_INDICATOR_SELECTORS), max(1, timeout_sec) * 1000]
+        )
+    except PlaywrightError:
+        return
+
+
+async def save_debug_screenshot(page: Page, base: Path, deep_debug: bool = False) -> None:
+    # Full-page PNGs re-lay out the whole report and are slow to encode; the viewport as a
+    # q60 JPEG is enough for routine diagnosis.
+    try:
+        if deep_debug:
+            await page.screenshot(path=str(base.with_suffix(".png")), full_page=True)
+        else:
+            await page.screenshot(path=str(base.with_suffix(".jpg")), type="jpeg", quality=60)
     except Exception:
         pass
+
+
+async def save_page_html(page: Page, path: Path) -> None:
+    # Report pages run to several MB; encode once and write off the event loop.
+    html = await page.content()
+    await asyncio.to_thread(path.write_bytes, html.encode("utf-8"))
+
+
+_LABEL_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9_.-]+")
+
+
+async def save_order_details_debug_artifacts(
+    page: Page,
+    artifact_dir: Path,
+    label: str,
+    *,
+    deep_debug: bool = False,
+) -> None:
+    """Write screenshot + HTML + basic DOM summary to help diagnose selector mismatches."""
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    safe = _LABEL_UNSAFE_RE.sub("_", label).strip("_") or "debug"
+
+    await save_debug_screenshot(page, artifact_dir / safe, deep_debug)
     try:
-        html = await page.content()
-        (artifact_dir / f"{safe}.html").write_text(html, encoding="utf-8")
+        await save_page_html(page, artifact_dir / f"{safe}.html")
     except Exception:
         pass
     try:
@@ -998,35 +2010,43 @@ async def save_order_details_debug_artifacts(page: Page, artifact_dir: Path, lab
                 return { url: location.href, title: document.title, blocks, tables };
             }"""
         )
-        (artifact_dir / f"{safe}.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        (artifact_dir / f"{safe}.json").write_bytes(dumps_indented(summary))
         log_event("order_details_debug_saved", label=label, artifact_dir=str(artifact_dir))
     except Exception:
         pass
 
 
-async def wait_for_order_detail_blocks_ready(page: Page, config: dict[str, Any], timeout_sec: int = 45) -> None:
-    selectors = config.get("order_details", {}).get("order_blocks", [])
-    deadline = asyncio.get_event_loop().time() + max(1, timeout_sec)
-    while asyncio.get_event_loop().time() < deadline:
-        no_items = await detect_no_items_message(page)
-        if no_items:
-            log_event("order_details_no_items", snippet=no_items)
-            return
+_ORDER_BLOCKS_READY_JS = """({ selectors }) => {
+    const noItems = (""" + PAGE_HELPERS_JS["detectNoItems"] + """)();
+    if (noItems) return { noItems };
+    for (const selector of selectors) {
+        try {
+            if (document.querySelector(selector)) return { ready: true };
+        } catch (_err) {
+            // Non-CSS selector; nothing to match in the page context.
+        }
+    }
+    // Some Toast views lazy-render order blocks after scrolling.
+    window.scrollBy(0, Math.max(400, Math.floor(window.innerHeight * 0.85)));
+    return false;
+}"""
 
-        for selector in selectors:
-            try:
-                if await page.locator(selector).count() > 0:
-                    return
-            except Exception:
-                continue
-        # Some Toast views lazy-render order blocks after scrolling.
-        try:
-            await page.evaluate(
-                "() => window.scrollBy(0, Math.max(400, Math.floor(window.innerHeight * 0.85)))"
-            )
-        except Exception:
-            pass
-        await asyncio.sleep(0.5)
+
+async def wait_for_order_detail_blocks_ready(page: Page, config: dict[str, Any], timeout_sec: int = 45) -> None:
+    # Polled on an in-page 500ms interval rather than on mutations: the scroll step has to
+    # run even when nothing changes, or lazily rendered blocks would never appear.
+    try:
+        handle = await page.wait_for_function(
+            _ORDER_BLOCKS_READY_JS,
+            arg={"selectors": list(selectors_for(config).order_blocks)},
+            polling=500,
+            timeout=max(1, timeout_sec) * 1000,
+        )
+        result = await handle.json_value()
+    except PlaywrightError:
+        return
+    if isinstance(result, dict) and result.get("noItems"):
+        log_event("order_details_no_items", snippet=result["noItems"])
 
 
 async def get_pagination_summary(page: Page) -> dict[str, int]:
@@ -1036,17 +2056,7 @@ async def get_pagination_summary(page: Page) -> dict[str, int]:
     element is absent or the text doesn't match the expected pattern.
     """
     try:
-        info = await page.evaluate(
-            """() => {
-                const spans = Array.from(document.querySelectorAll('.pagination-summary'));
-                if (!spans.length) return null;
-                const last = spans[spans.length - 1];
-                const text = (last.textContent || '').trim();
-                const m = text.match(/Showing\\s+(\\d+)\\s+through\\s+(\\d+)\\s+of\\s+(\\d+)/i);
-                if (!m) return null;
-                return { start: parseInt(m[1], 10), end: parseInt(m[2], 10), total: parseInt(m[3], 10) };
-            }"""
-        )
+        info = await call_page_helper(page, "paginationSummary")
         return info if isinstance(info, dict) else {}
     except Exception:
         return {}
@@ -1060,347 +2070,171 @@ async def click_next_order_details_page(page: Page, config: dict[str, Any]) -> b
     one so that we paginate the *orders* table.
     """
     try:
-        clicked = await page.evaluate(
-            """() => {
-                const isVisible = (el) => {
-                    if (!el) return false;
-                    const r = el.getBoundingClientRect();
-                    if (r.width <= 0 || r.height <= 0) return false;
-                    const style = window.getComputedStyle(el);
-                    if (!style) return true;
-                    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') return false;
-                    return true;
-                };
-                const paginationDivs = Array.from(document.querySelectorAll('.pagination'));
-                if (!paginationDivs.length) return false;
-                const lastPagination = paginationDivs[paginationDivs.length - 1];
-                const nextLi = lastPagination.querySelector('li.next');
-                if (!nextLi) return false;
-                const className = (nextLi.getAttribute('class') || '').toLowerCase();
-                if (className.includes('disabled')) return false;
-                const anchor = nextLi.querySelector('a');
-                if (!anchor || !isVisible(anchor)) return false;
-                anchor.click();
-                return true;
-            }"""
-        )
+        clicked = await call_page_helper(page, "clickNextOrderPage")
         return bool(clicked)
     except Exception:
         pass
     return False
 
 
+_PAGINATION_CHANGED_JS = """(old) => {
+    const spans = document.querySelectorAll('.pagination-summary');
+    if (!spans.length) return false;
+    const text = (spans[spans.length - 1].textContent || '').trim();
+    const m = text.match(/Showing\\s+(\\d+)\\s+through\\s+(\\d+)\\s+of\\s+(\\d+)/i);
+    if (!m) return false;
+    const summary = { start: parseInt(m[1], 10), end: parseInt(m[2], 10), total: parseInt(m[3], 10) };
+    return summary.start !== old.start || summary.end !== old.end ? summary : false;
+}"""
+_PAGINATION_CHANGE_WAIT_JS = mutation_wait_js(_PAGINATION_CHANGED_JS)
+
+
 async def wait_for_pagination_change(
     page: Page,
     old_summary: dict[str, int],
     timeout_sec: int = 30,
 ) -> dict[str, int]:
-    """Poll until the pagination-summary text changes from *old_summary*.
+    """Wait until the pagination-summary text changes from *old_summary*.
 
     After clicking 'Next', Toast replaces the order-detail blocks
     asynchronously.  This helper watches the LAST ``.pagination-summary``
-    span until its ``start``/``end`` values differ from *old_summary*,
-    indicating the new page has loaded.
+    span (re-checked in the page on every DOM mutation) until its
+    ``start``/``end`` values differ from *old_summary*, indicating the new
+    page has loaded, then lets any loading spinners clear.
 
     Returns the new summary dict, or the old one on timeout.
     """
-    deadline = asyncio.get_event_loop().time() + max(1, timeout_sec)
-    while asyncio.get_event_loop().time() < deadline:
-        await asyncio.sleep(0.5)
-        # Also wait for loading spinners to clear.
-        await wait_for_order_details_idle(page, timeout_sec=5)
-        new_summary = await get_pagination_summary(page)
-        if not new_summary:
-            continue
-        # The page has changed when start or end differs.
-        if (
-            new_summary.get("start") != old_summary.get("start")
-            or new_summary.get("end") != old_summary.get("end")
-        ):
-            return new_summary
-    return old_summary
+    old = {"start": old_summary.get("start"), "end": old_summary.get("end")}
+    try:
+        new_summary = await page.evaluate(_PAGINATION_CHANGE_WAIT_JS, [old, max(1, timeout_sec) * 1000])
+    except PlaywrightError:
+        return old_summary
+    await wait_for_order_details_idle(page, timeout_sec=5)
+    return new_summary if isinstance(new_summary, dict) else old_summary
 
 
 async def extract_order_detail_blocks(page: Page, config: dict[str, Any]) -> list[dict[str, Any]]:
-    selectors = config.get("order_details", {}).get("order_blocks", [])
-    payload = await page.evaluate(
-        """(orderSelectors) => {
-            const blocks = [];
-            const seen = new Set();
-            for (const selector of orderSelectors) {
-                for (const node of Array.from(document.querySelectorAll(selector))) {
-                    if (seen.has(node)) continue;
-                    seen.add(node);
-                    blocks.push(node);
-                }
-            }
-
-            const normalize = (text) => (text || "").replace(/\\s+/g, " ").trim();
-            const records = [];
-            for (let idx = 0; idx < blocks.length; idx += 1) {
-                const order = blocks[idx];
-                const pairs = {};
-
-                for (const row of Array.from(order.querySelectorAll("tr"))) {
-                    const cells = Array.from(row.querySelectorAll("th, td"))
-                        .map((el) => normalize(el.textContent))
-                        .filter(Boolean);
-                    if (cells.length === 2) {
-                        const key = cells[0];
-                        if (key && !pairs[key]) {
-                            pairs[key] = cells[1];
-                        }
-                    }
-                }
-
-                for (const dl of Array.from(order.querySelectorAll("dl"))) {
-                    const dts = Array.from(dl.querySelectorAll("dt"));
-                    const dds = Array.from(dl.querySelectorAll("dd"));
-                    for (let i = 0; i < Math.min(dts.length, dds.length); i += 1) {
-                        const key = normalize(dts[i].textContent);
-                        const val = normalize(dds[i].textContent);
-                        if (key && !pairs[key]) {
-                            pairs[key] = val;
-                        }
-                    }
-                }
-
-                const tables = Array.from(order.querySelectorAll("table")).map((table) => {
-                    const headers = Array.from(table.querySelectorAll("thead th"))
-                        .map((el) => normalize(el.textContent));
-                    const rows = Array.from(table.querySelectorAll("tbody tr")).map((row) =>
-                        Array.from(row.querySelectorAll("th, td")).map((el) => normalize(el.textContent))
-                    );
-                    return { headers, rows };
-                });
-
-                const byClassText = (selector) => normalize(order.querySelector(selector)?.textContent);
-                const summary = {
-                    discount: byClassText(".check-discounts"),
-                    credits: byClassText(".check-credits"),
-                    subtotal: byClassText(".check-subtotal"),
-                    tax: byClassText(".check-tax"),
-                    tip: byClassText(".check-tip"),
-                    gratuity: byClassText(".check-gratuity"),
-                    total: byClassText(".check-total"),
-                };
-
-                // Fallback: extract tip/total/gratuity from <b> label divs
-                // when CSS class selectors return empty.
-                if (!summary.tip || !summary.total || !summary.gratuity) {
-                    for (const bold of Array.from(order.querySelectorAll("div.span2 b"))) {
-                        const label = normalize(bold.textContent).replace(/:$/, "").toLowerCase();
-                        const parentDiv = bold.closest("div.span2");
-                        const siblingDiv = parentDiv ? parentDiv.nextElementSibling : null;
-                        if (!siblingDiv) continue;
-                        const val = normalize(siblingDiv.textContent);
-                        if (!val) continue;
-                        if (label === "tip" && !summary.tip) summary.tip = val;
-                        if (label === "total" && !summary.total) summary.total = val;
-                        if (label === "gratuity" && !summary.gratuity) summary.gratuity = val;
-                    }
-                }
-
-                const summaryDetails = {};
-                const detailsBlock = order.querySelector(".check-server-details");
-                if (detailsBlock) {
-                    const lines = (detailsBlock.innerText || "")
-                        .split(/\\n+/)
-                        .map((line) => normalize(line))
-                        .filter(Boolean);
-                    const labelBlock = detailsBlock.previousElementSibling;
-                    const labels = [];
-                    if (labelBlock) {
-                        for (const el of Array.from(labelBlock.querySelectorAll("b"))) {
-                            const label = normalize(el.textContent).replace(/:$/, "").toLowerCase();
-                            if (label) labels.push(label);
-                        }
-                    }
-                    const byLabel = {};
-                    let labelIndex = 0;
-                    let lastLabel = "";
-                    for (const line of lines) {
-                        const isContinuation = line.startsWith("(") && lastLabel;
-                        if (isContinuation) {
-                            byLabel[lastLabel] = `${byLabel[lastLabel]} ${line}`.trim();
-                            continue;
-                        }
-                        if (labelIndex < labels.length) {
-                            const label = labels[labelIndex];
-                            byLabel[label] = line;
-                            lastLabel = label;
-                            labelIndex += 1;
-                        } else if (lastLabel) {
-                            byLabel[lastLabel] = `${byLabel[lastLabel]} ${line}`.trim();
-                        }
-                    }
-                    if (byLabel["time opened"]) summaryDetails.time_opened = byLabel["time opened"];
-                    if (byLabel["server"]) summaryDetails.server = byLabel["server"];
-                    if (!summaryDetails.server && byLabel["opened by server"]) {
-                        summaryDetails.server = byLabel["opened by server"];
-                    }
-                    if (byLabel["table"]) summaryDetails.table = byLabel["table"];
-                    if (byLabel["tab name"]) summaryDetails.tab_name = byLabel["tab name"];
-                    if (!summaryDetails.time_opened && lines.length > 0) {
-                        summaryDetails.time_opened = lines[0];
-                    }
-                    if (!summaryDetails.server && lines.length > 1) {
-                        summaryDetails.server = lines[1];
-                    }
-                    if (!summaryDetails.table && lines.length > 1) {
-                        const fallbackIndex = Math.max(0, lines.length - 2);
-                        summaryDetails.table = lines[fallbackIndex] || lines[lines.length - 1];
-                    }
-                }
-                const guestInput = order.querySelector("#num-guests");
-                if (guestInput && guestInput.value) {
-                    summaryDetails.guest_count = normalize(guestInput.value);
-                }
-                const revenueCenter = order.querySelector("#revenue-center-name");
-                if (revenueCenter) {
-                    summaryDetails.revenue_center = normalize(revenueCenter.textContent);
-                }
-
-                const bodyText = order.innerText || "";
-                let orderNumber = "";
-                const orderHeaderText = normalize(order.querySelector("#order-summary-header")?.textContent);
-                if (orderHeaderText) {
-                    const match = orderHeaderText.match(/Order\\s*#\\s*(\\d+)/i);
-                    if (match) orderNumber = match[1];
-                }
-
-                let source = "";
-                const sourceMatch = bodyText.match(/Source\\s*:\\s*\\n+([^\\n]+)/i);
-                if (sourceMatch) {
-                    source = normalize(sourceMatch[1]);
-                }
-
-                let checkId = "";
-                for (const el of Array.from(order.querySelectorAll(".order-detail-meta-id"))) {
-                    const match = normalize(el.textContent).match(/ID\\s*:\\s*([A-Za-z0-9_-]+)/i);
-                    if (match) {
-                        checkId = match[1];
-                        break;
-                    }
-                }
-                if (!checkId) {
-                    const form = order.querySelector("form[action*='reopencheck?id=']");
-                    if (form) {
-                        const action = form.getAttribute("action") || "";
-                        const match = action.match(/id=([A-Za-z0-9_-]+)/i);
-                        if (match) checkId = match[1];
-                    }
-                }
-                if (!checkId) {
-                    checkId = `order-${orderNumber || idx + 1}`;
-                }
+    selectors = selectors_for(config).order_blocks
+    payload = await call_page_helper(page, "extractBlocks", selectors)
+    return [row for row in payload if isinstance(row, dict)]
 
-                const metadata = {
-                    payment_id: checkId,
-                    "Order #": orderNumber,
-                    Source: source,
-                    "Revenue Center": summaryDetails.revenue_center || "",
-                };
 
-                records.push({
-                    payment_id: checkId,
-                    metadata,
-                    payload: {
-                        pairs,
-                        tables,
-                        summary,
-                        summaryDetails,
-                        bodyText,
-                    },
-                    parsed_url: `${window.location.origin}${window.location.pathname}${window.location.search}#check-${checkId}`,
-                });
-            }
+async def fetch_order_details_page(
+    page: Page,
+    config: dict[str, Any],
+    *,
+    advance: bool,
+    max_rows: int = 0,
+) -> dict[str, Any]:
+    """Extract the current order blocks and, when there is a next page, click it in one evaluate.
 
-            return records;
-        }""",
-        selectors,
+    The click is skipped when ``advance`` is false, the page is empty or last, a "no
+    items" message is showing, or the page holds at least ``max_rows`` blocks. Returns
+    ``rows``, ``summary``, ``no_items`` (None when not checked) and ``clicked``.
+    """
+    payload = await call_page_helper(
+        page,
+        "fetchPageAndAdvance",
+        {"selectors": list(selectors_for(config).order_blocks), "advance": advance, "maxRows": max_rows},
     )
-    return [row for row in payload if isinstance(row, dict)]
+    payload = payload if isinstance(payload, dict) else {}
+    summary = payload.get("summary")
+    return {
+        "rows": [row for row in payload.get("rows") or [] if isinstance(row, dict)],
+        "summary": summary if isinstance(summary, dict) else {},
+        "no_items": payload.get("noItems"),
+        "clicked": bool(payload.get("clicked")),
+    }
 
 
-async def capture_debug_artifacts(page: Page, artifact_dir: Path, label: str) -> None:
+async def capture_debug_artifacts(
+    page: Page,
+    artifact_dir: Path,
+    label: str,
+    *,
+    deep_debug: bool = False,
+) -> None:
     artifact_dir.mkdir(parents=True, exist_ok=True)
     stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
     base = artifact_dir / f"{stamp}_{label}"
+    await save_debug_screenshot(page, base, deep_debug)
     try:
-        await page.screenshot(path=str(base.with_suffix(".png")), full_page=True)
-    except Exception:
-        pass
-    try:
-        html = await page.content()
-        base.with_suffix(".html").write_text(html, encoding="utf-8")
+        await save_page_html(page, base.with_suffix(".html"))
     except Exception:
         pass
 
 
+# Title first (cheapest), then the Turnstile/challenge-platform elements, then the
+# interstitial copy, all in one round-trip.
+_CLOUDFLARE_CHALLENGE_JS = """() => {
+    const title = (document.title || '').toLowerCase();
+    if (title.includes('just a moment')) return true;
+    if (document.querySelector("input[name='cf-turnstile-response'], script[src*='challenge-platform']")) {
+        return true;
+    }
+    const text = (document.body?.innerText || '').toLowerCase();
+    return text.includes('verifying you are human')
+        || text.includes('needs to review the security of your connection');
+}"""
+
+
 async def is_cloudflare_challenge(page: Page) -> bool:
     try:
-        title = (await page.title()).lower()
+        return bool(await page.evaluate(_CLOUDFLARE_CHALLENGE_JS))
     except Exception:
-        title = ""
-    if "just a moment" in title:
-        return True
-
-    markers = [
-        "text=Verifying you are human",
-        "text=needs to review the security of your connection",
-        "input[name='cf-turnstile-response']",
-        "script[src*='challenge-platform']",
-    ]
-    for marker in markers:
-        try:
-            if await page.locator(marker).first.count() > 0:
-                return True
-        except Exception:
-            continue
-    return False
+        return False
 
 
 async def wait_for_challenge_clear(page: Page, timeout_sec: int) -> bool:
     if timeout_sec <= 0:
         return not await is_cloudflare_challenge(page)
-    deadline = asyncio.get_event_loop().time() + timeout_sec
-    while asyncio.get_event_loop().time() < deadline:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_sec
+    attempt = 0
+    while True:
         if not await is_cloudflare_challenge(page):
             return True
-        await asyncio.sleep(1)
-    return False
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        # Challenges take seconds to solve; back off 1s, 2s, 4s, 8s (jittered) between probes.
+        delay = min(8.0, 2.0**attempt) * random.uniform(0.8, 1.2)
+        await asyncio.sleep(min(delay, remaining))
+        attempt += 1
+
+
+# URL parts that settle the auth state without touching the DOM. The bad ones
+# are whole path segments (e.g. /u/login/identifier), so a query string or
+# report path that merely contains "login" does not count.
+AUTH_BAD_PATH_SEGMENTS = frozenset({"login", "signin"})
+AUTH_OK_URL_FRAGMENTS = ("restaurants/admin/reports",)
+
+
+def url_means_logged_out(url: str) -> bool:
+    path = urllib.parse.urlsplit(url).path.lower()
+    return not AUTH_BAD_PATH_SEGMENTS.isdisjoint(path.split("/"))
 
 
 async def is_logged_out(page: Page, config: dict[str, Any]) -> bool:
-    if "login" in page.url.lower():
+    if url_means_logged_out(page.url):
         return True
-    for selector in config["auth"]["logged_out_markers"]:
-        try:
-            if await page.locator(selector).first.count() > 0:
-                return True
-        except Exception:
-            continue
-    return False
+    return await first_usable_locator(page, selectors_for(config).logged_out_markers) is not None
 
 
 async def is_authenticated(page: Page, config: dict[str, Any]) -> bool:
     url = page.url.lower()
-    if "restaurants/admin/reports" in url and not await is_logged_out(page, config):
+    # Auth-wait loops sit on the login pages; answer those from the URL alone.
+    if url_means_logged_out(url):
+        return False
+    if any(fragment in url for fragment in AUTH_OK_URL_FRAGMENTS) and not await is_logged_out(page, config):
         return True
-    for selector in config["auth"].get("authenticated_markers", []):
-        try:
-            if await page.locator(selector).first.count() > 0:
-                return True
-        except Exception:
-            continue
-    return False
+    return await first_usable_locator(page, selectors_for(config).authenticated_markers) is not None
 
 
 async def dismiss_post_login_prompts(page: Page, config: dict[str, Any]) -> bool:
     clicked = await click_first_available(
         page,
-        config["auth"].get("not_now_buttons", []),
+        selectors_for(config).not_now_buttons,
         require_visible=True,
     )
     if clicked:
@@ -1420,19 +2254,19 @@ async def try_login_with_credentials(
 ) -> bool:
     user_selector = await first_usable_locator(
         page,
-        config["auth"].get("username_inputs", []),
+        selectors_for(config).username_inputs,
     )
     if user_selector:
-        await page.locator(user_selector).first.fill(username)
+        await first_locator(page, user_selector).fill(username)
         await human_pause(
             page,
             min_ms=human_min_delay_ms,
             max_ms=human_max_delay_ms,
             label="auth_filled_username",
         )
-        continue_selector = await first_usable_locator(page, config["auth"].get("submit_buttons", []))
+        continue_selector = await first_usable_locator(page, selectors_for(config).submit_buttons)
         if continue_selector:
-            await page.locator(continue_selector).first.click()
+            await first_locator(page, continue_selector).click()
             await page.wait_for_timeout(1200)
             await human_pause(
                 page,
@@ -1443,21 +2277,21 @@ async def try_login_with_credentials(
 
     pass_selector = await first_usable_locator(
         page,
-        config["auth"].get("password_inputs", []),
+        selectors_for(config).password_inputs,
     )
     if not pass_selector:
         return False
 
-    await page.locator(pass_selector).first.fill(password)
+    await first_locator(page, pass_selector).fill(password)
     await human_pause(
         page,
         min_ms=human_min_delay_ms,
         max_ms=human_max_delay_ms,
         label="auth_filled_password",
     )
-    submit_selector = await first_usable_locator(page, config["auth"].get("submit_buttons", []))
+    submit_selector = await first_usable_locator(page, selectors_for(config).submit_buttons)
     if submit_selector:
-        await page.locator(submit_selector).first.click()
+        await first_locator(page, submit_selector).click()
         await human_pause(
             page,
             min_ms=human_min_delay_ms,
@@ -1478,7 +2312,9 @@ async def ensure_authenticated(
     artifact_dir: Path | None = None,
     human_min_delay_ms: int = 250,
     human_max_delay_ms: int = 900,
+    deep_debug: bool = False,
 ) -> None:
+    loop = asyncio.get_running_loop()
     try:
         await page.goto(ORDER_DETAILS_URL, wait_until="domcontentloaded", timeout=45000)
     except Exception as exc:
@@ -1493,7 +2329,9 @@ async def ensure_authenticated(
         log_event("auth_challenge_detected", phase="initial")
         if not await wait_for_challenge_clear(page, challenge_timeout_sec):
             if artifact_dir:
-                await capture_debug_artifacts(page, artifact_dir, "cloudflare_challenge_timeout")
+                await capture_debug_artifacts(
+                    page, artifact_dir, "cloudflare_challenge_timeout", deep_debug=deep_debug
+                )
             raise RuntimeError("AUTH_BLOCKED: Cloudflare challenge did not clear.")
 
     await dismiss_post_login_prompts(page, config)
@@ -1503,18 +2341,18 @@ async def ensure_authenticated(
     if not credentials:
         if allow_manual_login:
             print("Authentication required. Complete login in the opened browser window...")
-            deadline = asyncio.get_event_loop().time() + timeout_sec
-            while asyncio.get_event_loop().time() < deadline:
+            deadline = loop.time() + timeout_sec
+            while loop.time() < deadline:
                 await dismiss_post_login_prompts(page, config)
                 if await is_authenticated(page, config):
                     print("Login detected. Continuing extraction.")
                     return
                 await asyncio.sleep(1)
             if artifact_dir:
-                await capture_debug_artifacts(page, artifact_dir, "manual_auth_timeout")
+                await capture_debug_artifacts(page, artifact_dir, "manual_auth_timeout", deep_debug=deep_debug)
             raise TimeoutError("AUTH_FAILED: manual login timeout.")
         if artifact_dir:
-            await capture_debug_artifacts(page, artifact_dir, "missing_credentials")
+            await capture_debug_artifacts(page, artifact_dir, "missing_credentials", deep_debug=deep_debug)
         raise RuntimeError("AUTH_FAILED: no usable credentials found in env file.")
 
     username, password = credentials
@@ -1537,8 +2375,8 @@ async def ensure_authenticated(
             if not await wait_for_challenge_clear(page, challenge_timeout_sec):
                 continue
 
-        deadline = asyncio.get_event_loop().time() + timeout_sec
-        while asyncio.get_event_loop().time() < deadline:
+        deadline = loop.time() + timeout_sec
+        while loop.time() < deadline:
             await dismiss_post_login_prompts(page, config)
             if await is_authenticated(page, config):
                 log_event("auth_success", attempt=attempt)
@@ -1554,7 +2392,7 @@ async def ensure_authenticated(
         log_event("auth_attempt_timeout", attempt=attempt)
 
     if artifact_dir:
-        await capture_debug_artifacts(page, artifact_dir, "auth_failed")
+        await capture_debug_artifacts(page, artifact_dir, "auth_failed", deep_debug=deep_debug)
     raise RuntimeError("AUTH_FAILED: credential login did not reach Toast reports dashboard.")
 
 
@@ -1569,7 +2407,7 @@ async def set_per_page(
     await wait_for_payments_table_ready(page, timeout_sec=20)
     for _ in range(5):
         selector = await first_usable_locator(
-            page, config["payments"]["per_page_select"], require_visible=False
+            page, selectors_for(config).payments_per_page_select, require_visible=False, remember=True
         )
         if selector is not None:
             try:
@@ -1586,10 +2424,10 @@ async def set_per_page(
                         }
                         return false;
                     }""",
-                    {"selectors": config["payments"]["per_page_select"], "value": str(per_page)},
+                    {"selectors": selectors_for(config).payments_per_page_select, "value": str(per_page)},
                 )
                 if not js_updated:
-                    await page.locator(selector).first.select_option(
+                    await first_locator(page, selector).select_option(
                         str(per_page),
                         force=True,
                         timeout=2000,
@@ -1609,12 +2447,12 @@ async def set_per_page(
     if per_page == 100:
         option_selector = await first_usable_locator(
             page,
-            config["payments"].get("per_page_100_option", []),
+            selectors_for(config).payments_per_page_100_option,
             require_visible=True,
         )
         if option_selector is not None:
             try:
-                await page.locator(option_selector).first.click(timeout=3000)
+                await first_locator(page, option_selector).click(timeout=3000)
                 await page.wait_for_timeout(700)
                 await human_pause(
                     page,
@@ -1629,6 +2467,145 @@ async def set_per_page(
     print("Warning: could not find per-page selector; continuing with default.")
 
 
+_SYNC_DATES_JS = """({ root, startSelectors, endSelectors, startValue, endValue, startShort, endShort }) => {
+    if (!startSelectors || !endSelectors) {
+        // Selector lists come from install_page_helpers() unless the caller sends them.
+        const installed = window.__toast && window.__toast.selectors;
+        if (!installed) return { missingSelectors: true };
+        startSelectors = installed.dateStart;
+        endSelectors = installed.dateEnd;
+    }
+    const isShown = (el) => !!el && window.getComputedStyle(el).display !== 'none';
+    // Toast reports use a date-range dropdown (Today / Last 7 Days / Custom Date). If we don't
+    // switch to "Custom Date", the report keeps using the preset even if we mutate the inputs.
+    let openedCustom = false;
+    if (document.querySelector('#date-dropdown-container') && !isShown(document.querySelector('.custom-range'))) {
+        const option =
+            document.querySelector("#date-dropdown-container ul.dropdown-menu a[data-value='custom']") ||
+            document.querySelector("a[data-value='custom']");
+        if (option) {
+            option.click();
+            openedCustom = true;
+        }
+    }
+    const assign = (node, value) => {
+        node.value = value;
+        node.dispatchEvent(new Event('input', { bubbles: true }));
+        node.dispatchEvent(new Event('change', { bubbles: true }));
+    };
+    // Broad candidates such as input[name*='start' i] also match unrelated inputs, so only
+    // the first hit is written: every selector under the payments root, then page-wide.
+    const scopes = [document.querySelector(root), document].filter(Boolean);
+    const setFirst = (selectors, primary, legacy, token) => {
+        for (const scope of scopes) {
+            for (const selector of selectors) {
+                let node = null;
+                try {
+                    node = scope.querySelector(selector);
+                } catch (e) {
+                    continue;  // Playwright-only syntax; set_date_range fills these via locators
+                }
+                if (!node) continue;
+                const id = (node.id || '').toLowerCase();
+                const name = (node.name || '').toLowerCase();
+                assign(node, id === token || name === token ? legacy : primary);
+                return 1;
+            }
+        }
+        return 0;
+    };
+    const startTouched = setFirst(startSelectors, startValue, startShort, 'startdate');
+    const endTouched = setFirst(endSelectors, endValue, endShort, 'enddate');
+    // Many Toast legacy reports read hidden #startDate/#endDate (M/D/YY) and the reportDate*
+    // backing inputs; write them last so nothing above can clobber what the report reads.
+    const hidden = [
+        ['#startDate', startShort],
+        ['#endDate', endShort],
+        ["input[name='reportDateStart']", startValue],
+        ["input[name='reportDateEnd']", endValue],
+    ];
+    let hiddenTouched = 0;
+    for (const [selector, value] of hidden) {
+        const el = document.querySelector(selector);
+        if (!el) continue;
+        assign(el, value);
+        hiddenTouched += 1;
+    }
+    return {
+        startTouched,
+        endTouched,
+        hiddenTouched,
+        openedCustom,
+        customRangeVisible: isShown(document.querySelector('.custom-range')),
+    };
+}"""
+
+# What the report thinks its dates are once Apply has run; logged to debug "0 rows" runs.
+_DATE_RANGE_VALUES_JS = """() => {
+    const getVal = (sel) => {
+        const el = document.querySelector(sel);
+        return el ? (el.value || el.getAttribute('value') || '') : '';
+    };
+    const dateDropdown = document.querySelector('#date-dropdown-container');
+    const dateLabel = dateDropdown?.querySelector('.dropdown-label')?.textContent || '';
+    const customRange = document.querySelector('.custom-range');
+    return {
+        startDateHidden: getVal('#startDate'),
+        endDateHidden: getVal('#endDate'),
+        startDateBacking: getVal("input[name='reportDateStart']"),
+        endDateBacking: getVal("input[name='reportDateEnd']"),
+        dateRangeValue: dateDropdown?.getAttribute('data-value') || '',
+        dateRangeLabel: dateLabel.trim(),
+        customRangeVisible: !!customRange && window.getComputedStyle(customRange).display !== 'none',
+    };
+}"""
+
+
+def is_playwright_only_selector(selector: str) -> bool:
+    # Playwright selector-engine syntax that document.querySelector rejects.
+    return ":has-text(" in selector or "text=" in selector
+
+
+async def fill_date_input_via_locator(
+    page: Page,
+    selectors: Sequence[str],
+    value: str,
+    short_value: str,
+    token: str,
+    *,
+    every_candidate: bool = False,
+) -> bool:
+    """Fill date inputs through locators; True when any was filled.
+
+    By default only the first resolving Playwright-only selector is filled, since
+    _SYNC_DATES_JS skips those. With ``every_candidate`` (the sync evaluate itself
+    failed) every candidate that resolves is filled, plain CSS ones included.
+    """
+    filled = False
+    for selector in scoped_candidates(PAYMENTS_ROOT, selectors):
+        if not every_candidate and not is_playwright_only_selector(selector):
+            continue
+        locator = page.locator(selector).first
+        try:
+            if await locator.count() == 0:
+                continue
+            # Legacy #startDate/#endDate inputs take M/D/YY
+            await locator.fill(short_value if token in selector.lower() else value, timeout=1000)
+        except Exception:
+            continue
+        filled = True
+        if not every_candidate:
+            break
+    return filled
+
+
+def is_report_data_response(response: Any) -> bool:
+    # Only the payments and order-details data endpoints: other report XHRs (search
+    # widgets, employee reloads) also fire around Apply and say nothing about the dates.
+    url = response.url
+    return PAYMENTDETAILS_PATH_FRAGMENT in url or ORDER_DETAILS_PATH_FRAGMENT in url
+
+
 async def set_date_range(
     page: Page,
     config: dict[str, Any],
@@ -1637,260 +2614,170 @@ async def set_date_range(
     *,
     human_min_delay_ms: int = 250,
     human_max_delay_ms: int = 900,
+    deep_debug: bool = False,
 ) -> None:
-    # Toast reports use a date-range dropdown (Today / Last 7 Days / Custom Date).
-    # If we don't switch to "Custom Date", the report can keep using the preset even if
-    # we mutate the start/end inputs.
-    try:
-        if await page.locator("#date-dropdown-container").count() > 0:
-            try:
-                await page.locator("#date-dropdown-container button.dropdown-toggle").first.click(
-                    timeout=2000
-                )
-                await page.locator(
-                    "#date-dropdown-container ul.dropdown-menu a[data-value='custom']"
-                ).first.click(timeout=2000)
-            except Exception:
-                # Fallback: click any visible custom-date option.
-                try:
-                    await page.locator("a[data-value='custom']").first.click(timeout=2000)
-                except Exception:
-                    pass
-            try:
-                await page.wait_for_selector(".custom-range:visible", timeout=6000)
-            except Exception:
-                pass
-    except Exception:
-        pass
-
-    start_selector = await first_usable_locator(
-        page, config["payments"]["date_start_input"], require_visible=False
-    )
-    end_selector = await first_usable_locator(
-        page, config["payments"]["date_end_input"], require_visible=False
-    )
-
-    if start_selector is None or end_selector is None:
-        print("Warning: could not find date inputs; continuing with current report dates.")
-        return
-
+    selectors = selectors_for(config)
     start_value = to_us_date(start)
     end_value = to_us_date(end)
     start_short = to_short_us_date(start)
     end_short = to_short_us_date(end)
+    sync_args = {
+        "root": PAYMENTS_ROOT,
+        "startValue": start_value,
+        "endValue": end_value,
+        "startShort": start_short,
+        "endShort": end_short,
+    }
 
-    # Many Toast legacy reports (including sales reports) rely on hidden #startDate/#endDate
-    # in M/D/YY format, even if other visible inputs exist.
+    async def sync_dates() -> dict[str, Any]:
+        result = await page.evaluate(_SYNC_DATES_JS, sync_args)
+        if result.get("missingSelectors"):
+            # Documents loaded before install_page_helpers() ran lack the selector table.
+            # The script tries each selector under the payments root itself.
+            sync_args["startSelectors"] = selectors.payments_date_start_input
+            sync_args["endSelectors"] = selectors.payments_date_end_input
+            result = await page.evaluate(_SYNC_DATES_JS, sync_args)
+        return result
+
+    # One roundtrip switches to "Custom Date", writes the start/end and hidden date
+    # inputs and reads the resulting state back.
+    sync_failed = False
     try:
-        await page.evaluate(
-            """({ startShort, endShort, startValue, endValue }) => {
-                const setValue = (selector, value) => {
-                    const el = document.querySelector(selector);
-                    if (!el) return 0;
-                    el.value = value;
-                    el.dispatchEvent(new Event('input', { bubbles: true }));
-                    el.dispatchEvent(new Event('change', { bubbles: true }));
-                    return 1;
-                };
-                let touched = 0;
-                touched += setValue('#startDate', startShort);
-                touched += setValue('#endDate', endShort);
-                touched += setValue(\"input[name='reportDateStart']\", startValue);
-                touched += setValue(\"input[name='reportDateEnd']\", endValue);
-                return touched;
-            }""",
-            {
-                "startShort": start_short,
-                "endShort": end_short,
-                "startValue": start_value,
-                "endValue": end_value,
-            },
-        )
+        synced = await sync_dates()
+        if synced.get("openedCustom") and not synced.get("customRangeVisible"):
+            # The custom range rendered asynchronously; let it settle, then write again.
+            try:
+                await page.wait_for_selector(".custom-range:visible", timeout=6000)
+            except Exception:
+                pass
+            synced = await sync_dates()
     except Exception:
-        pass
+        # e.g. the page navigated after the Custom Date click; fill through locators instead.
+        synced = {}
+        sync_failed = True
+
+    for touched_key, candidates, value, short_value, token in (
+        ("startTouched", selectors.payments_date_start_input, start_value, start_short, "startdate"),
+        ("endTouched", selectors.payments_date_end_input, end_value, end_short, "enddate"),
+    ):
+        if not int(synced.get(touched_key) or 0) and await fill_date_input_via_locator(
+            page, candidates, value, short_value, token, every_candidate=sync_failed
+        ):
+            synced[touched_key] = 1
 
-    updated_inputs = 0
-    # Keep both backing and visible date inputs in sync.
-    for selector in config["payments"]["date_start_input"]:
-        locator = page.locator(selector).first
+    if not (int(synced.get("startTouched") or 0) > 0 and int(synced.get("endTouched") or 0) > 0):
+        print("Warning: could not set date range; continuing with current report dates.")
+        return
+    if sync_failed:
+        # Re-sync the hidden fields Toast actually reads before clicking Apply, so the
+        # backing inputs do not keep the preset dates.
         try:
-            if await locator.count() > 0:
-                value = start_short if "startDate" in selector else start_value
-                await locator.fill(value, timeout=1000)
-                updated_inputs += 1
-                await human_pause(
-                    page,
-                    min_ms=human_min_delay_ms,
-                    max_ms=human_max_delay_ms,
-                    label="date_start_fill",
-                )
+            await sync_dates()
         except Exception:
-            continue
-    for selector in config["payments"]["date_end_input"]:
-        locator = page.locator(selector).first
-        try:
-            if await locator.count() > 0:
-                value = end_short if "endDate" in selector else end_value
-                await locator.fill(value, timeout=1000)
-                updated_inputs += 1
+            pass
+    await human_pause(
+        page,
+        min_ms=human_min_delay_ms,
+        max_ms=human_max_delay_ms,
+        label="date_fill",
+    )
+
+    # The apply button survives date changes, so multi-date crawls resolve it once per document.
+    apply_selector = await first_usable_locator(
+        page,
+        selectors.payments_apply_button,
+        require_visible=True,
+        scope=PAYMENTS_ROOT,
+        remember=True,
+    )
+    async def apply_dates() -> None:
+        applied = False
+        if apply_selector:
+            try:
+                await first_locator(page, apply_selector).click(timeout=3000)
+                applied = True
                 await human_pause(
                     page,
                     min_ms=human_min_delay_ms,
                     max_ms=human_max_delay_ms,
-                    label="date_end_fill",
+                    label="date_apply_click",
+                )
+            except Exception:
+                applied = False
+                forget_usable_locator(
+                    page, selectors.payments_apply_button, require_visible=True, scope=PAYMENTS_ROOT
                 )
-        except Exception:
-            continue
 
-    if updated_inputs < 2:
-        # Some Toast views use hidden backing inputs with custom visible controls.
-        js_updated = await page.evaluate(
-            """({ startSelectors, endSelectors, startValue, endValue, startShort, endShort }) => {
-                const setAll = (selectors, primary, legacy, token) => {
-                    let touched = 0;
-                    for (const selector of selectors) {
+        if not applied:
+            js_apply_selectors = [
+                selector
+                for selector in scoped_candidates(PAYMENTS_ROOT, selectors.payments_apply_button)
+                if not is_playwright_only_selector(selector)
+            ]
+            js_applied = await page.evaluate(
+                """({ applySelectors }) => {
+                    const findVisible = (selector) => {
                         const nodes = Array.from(document.querySelectorAll(selector));
-                        for (const node of nodes) {
-                            const id = (node.id || '').toLowerCase();
-                            const name = (node.name || '').toLowerCase();
-                            const useLegacy = id === token || name === token;
-                            node.value = useLegacy ? legacy : primary;
-                            node.dispatchEvent(new Event('input', { bubbles: true }));
-                            node.dispatchEvent(new Event('change', { bubbles: true }));
-                            touched += 1;
-                        }
+                        return nodes.find((el) => {
+                            const rect = el.getBoundingClientRect();
+                            return rect.width > 0 && rect.height > 0;
+                        }) || nodes[0] || null;
+                    };
+                    for (const selector of applySelectors) {
+                        const btn = findVisible(selector);
+                        if (!btn) continue;
+                        btn.click();
+                        btn.dispatchEvent(new MouseEvent('click', { bubbles: true, cancelable: true }));
+                        return true;
                     }
-                    return touched;
-                };
-                const startTouched = setAll(startSelectors, startValue, startShort, 'startdate');
-                const endTouched = setAll(endSelectors, endValue, endShort, 'enddate');
-                return startTouched > 0 && endTouched > 0;
-            }""",
-            {
-                "startSelectors": config["payments"]["date_start_input"],
-                "endSelectors": config["payments"]["date_end_input"],
-                "startValue": start_value,
-                "endValue": end_value,
-                "startShort": start_short,
-                "endShort": end_short,
-            },
-        )
-        if not js_updated:
-            print("Warning: could not set date range; continuing with current report dates.")
-            return
+                    const byId = document.querySelector('#filter-apply-handler');
+                    if (byId) {
+                        byId.click();
+                        byId.dispatchEvent(new MouseEvent('click', { bubbles: true, cancelable: true }));
+                        return true;
+                    }
+                    return false;
+                }""",
+                {"applySelectors": js_apply_selectors},
+            )
+            if not js_applied:
+                await page.keyboard.press("Enter")
 
-    # Regardless of which selectors were fill()-able, force-sync the hidden fields Toast actually reads
-    # right before clicking Update. This avoids the "backing inputs changed but report still uses today"
-    # failure mode.
-    try:
-        await page.evaluate(
-            """({ startShort, endShort, startValue, endValue }) => {
-                const setValue = (selector, value) => {
-                    const el = document.querySelector(selector);
-                    if (!el) return 0;
-                    el.value = value;
-                    el.dispatchEvent(new Event('input', { bubbles: true }));
-                    el.dispatchEvent(new Event('change', { bubbles: true }));
-                    return 1;
-                };
-                let touched = 0;
-                touched += setValue('#startDate', startShort);
-                touched += setValue('#endDate', endShort);
-                touched += setValue(\"input[name='reportDateStart']\", startValue);
-                touched += setValue(\"input[name='reportDateEnd']\", endValue);
-                return touched;
-            }""",
-            {
-                "startShort": start_short,
-                "endShort": end_short,
-                "startValue": start_value,
-                "endValue": end_value,
-            },
-        )
-    except Exception:
-        pass
+    # Move on as soon as Apply's report data lands, within the old flat 1.2s budget. Apply
+    # may instead submit the form and reload, so otherwise wait for that load to finish.
+    data_loaded = asyncio.Event()
 
-    apply_selector = await first_usable_locator(
-        page, config["payments"]["apply_button"], require_visible=True
-    )
-    applied = False
-    if apply_selector:
+    def on_response(response: Any) -> None:
+        if is_report_data_response(response):
+            data_loaded.set()
+
+    page.on("response", on_response)
+    try:
+        await apply_dates()
         try:
-            await page.locator(apply_selector).first.click(timeout=3000)
-            applied = True
-            await human_pause(
-                page,
-                min_ms=human_min_delay_ms,
-                max_ms=human_max_delay_ms,
-                label="date_apply_click",
-            )
+            await asyncio.wait_for(data_loaded.wait(), timeout=1.2)
+        except asyncio.TimeoutError:
+            try:
+                await page.wait_for_load_state("load", timeout=10000)
+            except PlaywrightTimeoutError:
+                pass
+    finally:
+        try:
+            page.remove_listener("response", on_response)
         except Exception:
-            applied = False
-
-    if not applied:
-        js_apply_selectors = [
-            selector
-            for selector in config["payments"]["apply_button"]
-            if ":has-text(" not in selector and "text=" not in selector
-        ]
-        js_applied = await page.evaluate(
-            """({ applySelectors }) => {
-                const findVisible = (selector) => {
-                    const nodes = Array.from(document.querySelectorAll(selector));
-                    return nodes.find((el) => {
-                        const rect = el.getBoundingClientRect();
-                        return rect.width > 0 && rect.height > 0;
-                    }) || nodes[0] || null;
-                };
-                for (const selector of applySelectors) {
-                    const btn = findVisible(selector);
-                    if (!btn) continue;
-                    btn.click();
-                    btn.dispatchEvent(new MouseEvent('click', { bubbles: true, cancelable: true }));
-                    return true;
-                }
-                const byId = document.querySelector('#filter-apply-handler');
-                if (byId) {
-                    byId.click();
-                    byId.dispatchEvent(new MouseEvent('click', { bubbles: true, cancelable: true }));
-                    return true;
-                }
-                return false;
-            }""",
-            {"applySelectors": js_apply_selectors},
-        )
-        if not js_applied:
-            await page.keyboard.press("Enter")
-    await page.wait_for_timeout(1200)
+            pass
     await human_pause(
         page,
         min_ms=human_min_delay_ms,
         max_ms=human_max_delay_ms,
         label="post_date_apply",
     )
-    # Helpful when debugging "0 rows" in live runs: confirm what the report thinks the date inputs are.
+    if not deep_debug:
+        return
+    # Helpful when debugging "0 rows" in live runs: confirm what the report thinks the date
+    # inputs are. It costs a round-trip per date change, so only --deep-debug runs pay it.
     try:
-        values = await page.evaluate(
-            """() => {
-                const getVal = (sel) => {
-                    const el = document.querySelector(sel);
-                    return el ? (el.value || el.getAttribute('value') || '') : '';
-                };
-                const dateDropdown = document.querySelector('#date-dropdown-container');
-                const dateLabel = dateDropdown?.querySelector('.dropdown-label')?.textContent || '';
-                const customRange = document.querySelector('.custom-range');
-                const customVisible = !!customRange && window.getComputedStyle(customRange).display !== 'none';
-                return {
-                    startDateHidden: getVal('#startDate'),
-                    endDateHidden: getVal('#endDate'),
-                    startDateBacking: getVal(\"input[name='reportDateStart']\"),
-                    endDateBacking: getVal(\"input[name='reportDateEnd']\"),
-                    dateRangeValue: dateDropdown?.getAttribute('data-value') || '',
-                    dateRangeLabel: (dateLabel || '').trim(),
-                    customRangeVisible: customVisible,
-                };
-            }"""
-        )
+        values = await page.evaluate(_DATE_RANGE_VALUES_JS)
         if isinstance(values, dict):
             log_event("date_range_values", **values)
     except Exception:
@@ -1898,21 +2785,27 @@ async def set_date_range(
 
 
 async def extract_metadata_rows(page: Page, config: dict[str, Any]) -> list[dict[str, Any]]:
-    row_selector = config["payments"]["table_rows"]
-    header_selector = config["payments"]["table_headers"]
+    row_selector = selectors_for(config).payments_table_rows
+    header_selector = selectors_for(config).payments_table_headers
     return await page.evaluate(
         """({ rowSelector, headerSelector }) => {
+            // Collapse whitespace here so rows arrive already normalized (and smaller).
+            const WS_RE = /\\s+/g;
+            const norm = (text) => (text || "").replace(WS_RE, " ").trim();
             const headers = Array.from(document.querySelectorAll(headerSelector))
-                .map((el) => el.textContent?.trim() || "");
+                .map((el) => norm(el.textContent));
+            const HREF_RE = /[?&]paymentId=([^&#]+)/i;
+            const INLINE_RE = /paymentId[:=\\s]+([A-Za-z0-9_-]+)/i;
             const rows = Array.from(document.querySelectorAll(rowSelector));
             return rows.map((row) => {
-                const cells = Array.from(row.querySelectorAll("th, td"))
-                    .map((el) => (el.textContent || "").trim());
-                const links = Array.from(row.querySelectorAll("a[href]"))
-                    .map((el) => el.getAttribute("href") || "");
+                const cells = [];
+                for (const el of row.children) {
+                    if (el.tagName === "TD" || el.tagName === "TH") cells.push(norm(el.textContent));
+                }
                 let paymentId = "";
-                for (const href of links) {
-                    const match = href.match(/[?&]paymentId=([^&#]+)/i);
+                // Only links that can carry the id are worth matching.
+                for (const link of row.querySelectorAll("a[href*='paymentId=' i]")) {
+                    const match = HREF_RE.exec(link.getAttribute("href") || "");
                     if (match) {
                         paymentId = decodeURIComponent(match[1]);
                         break;
@@ -1925,7 +2818,7 @@ async def extract_metadata_rows(page: Page, config: dict[str, Any]) -> list[dict
                     }
                 }
                 if (!paymentId) {
-                    const inline = (row.textContent || "").match(/paymentId[:=\s]+([A-Za-z0-9_-]+)/i);
+                    const inline = INLINE_RE.exec(row.textContent || "");
                     if (inline) paymentId = inline[1];
                 }
                 const mapped = {};
@@ -1940,7 +2833,19 @@ async def extract_metadata_rows(page: Page, config: dict[str, Any]) -> list[dict
 
 
 async def click_next_page(page: Page, config: dict[str, Any]) -> bool:
-    for selector in config["payments"]["next_button"]:
+    selectors = selectors_for(config).payments_next_button
+    try:
+        clicked = bool(await page.evaluate(_CLICK_ENABLED_NEXT_JS, selectors))
+    except Exception:
+        clicked = False
+    if clicked:
+        await wait_for_payments_table_ready(page, timeout_sec=15)
+        return True
+
+    # Playwright-only selectors (e.g. :has-text) are skipped in-page; probe them here.
+    for selector in selectors:
+        if not is_playwright_only_selector(selector):
+            continue
         locator = page.locator(selector)
         try:
             count = await locator.count()
@@ -1969,7 +2874,6 @@ async def click_next_page(page: Page, config: dict[str, Any]) -> bool:
     return False
 
 
-PAYMENTDETAILS_PATH_FRAGMENT = "/restaurants/admin/reports/paymentdetails"
 DEFAULT_PAYMENTDETAILS_URL = f"https://www.toasttab.com{PAYMENTDETAILS_PATH_FRAGMENT}"
 PAYMENTDETAILS_FALLBACK_HEADERS: dict[int, str] = {
     0: "payment_id",
@@ -1988,25 +2892,47 @@ PAYMENTDETAILS_FALLBACK_HEADERS: dict[int, str] = {
 }
 
 
-def extract_payment_id_from_cells(cells: list[str]) -> str:
-    patterns = [
+_PAYMENT_ID_CELL_RES = tuple(
+    re.compile(pattern, re.I)
+    for pattern in (
         r"[?&]paymentId=([A-Za-z0-9_-]+)",
         r"data-payment-id=['\"]?([A-Za-z0-9_-]+)",
         r"\bpaymentid[:=\s\"']+([A-Za-z0-9_-]+)",
-    ]
+    )
+)
+_BARE_PAYMENT_ID_RE = re.compile(r"\d{12,}")
+
+
+def extract_payment_id_from_cells(cells: list[str]) -> str:
     for cell in cells:
         text = str(cell or "")
-        for pattern in patterns:
-            match = re.search(pattern, text, flags=re.I)
+        for pattern in _PAYMENT_ID_CELL_RES:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
 
     first = str(cells[0] if cells else "").strip()
-    if re.fullmatch(r"\d{12,}", first):
+    if _BARE_PAYMENT_ID_RE.fullmatch(first):
         return first
     return ""
 
 
+@lru_cache(maxsize=4)
+def split_paymentdetails_template(
+    template_url: str,
+) -> tuple[str, str, str, tuple[tuple[str, tuple[str, ...]], ...]]:
+    # A crawl builds every page URL from the same template; parse it once. The query is
+    # returned as nested tuples so callers can't mutate the cached copy.
+    parsed = urllib.parse.urlsplit(template_url or DEFAULT_PAYMENTDETAILS_URL)
+    query = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+    return (
+        parsed.scheme or "https",
+        parsed.netloc or "www.toasttab.com",
+        parsed.path or PAYMENTDETAILS_PATH_FRAGMENT,
+        tuple((key, tuple(values)) for key, values in query.items()),
+    )
+
+
 def build_paymentdetails_url(
     template_url: str,
     start_date: str,
@@ -2014,8 +2940,8 @@ def build_paymentdetails_url(
     offset: int,
     page_size: int,
 ) -> str:
-    parsed = urllib.parse.urlsplit(template_url or DEFAULT_PAYMENTDETAILS_URL)
-    query = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+    scheme, netloc, path, base_query = split_paymentdetails_template(template_url)
+    query: dict[str, Sequence[str]] = dict(base_query)
 
     query["reportDateRange"] = ["custom"]
     query["reportDateStart"] = [to_us_date(start_date)]
@@ -2023,51 +2949,64 @@ def build_paymentdetails_url(
     query["iDisplayStart"] = [str(max(0, offset))]
     query["iDisplayLength"] = [str(max(1, page_size))]
 
-    scheme = parsed.scheme or "https"
-    netloc = parsed.netloc or "www.toasttab.com"
-    path = parsed.path or PAYMENTDETAILS_PATH_FRAGMENT
     return urllib.parse.urlunsplit(
         (scheme, netloc, path, urllib.parse.urlencode(query, doseq=True), "")
     )
 
 
+# Normalized headers per response, so repeat lookups skip the re-lowering and any
+# headers_array() round-trip.
+_RESPONSE_HEADERS: WeakKeyDictionary[Any, dict[str, str]] = WeakKeyDictionary()
+
+
 async def get_response_headers(response: Any) -> dict[str, str]:
+    try:
+        return _RESPONSE_HEADERS[response]
+    except (KeyError, TypeError):
+        pass
+
     headers: dict[str, str] = {}
     try:
         raw = response.headers or {}
         headers = {str(k).lower(): str(v) for k, v in raw.items()}
     except Exception:
         headers = {}
-    if headers:
-        return headers
+    if not headers:
+        try:
+            pairs = await response.headers_array()
+            headers = {
+                str(item.get("name", "")).lower(): str(item.get("value", ""))
+                for item in pairs
+                if item.get("name")
+            }
+        except Exception:
+            headers = {}
 
     try:
-        pairs = await response.headers_array()
-        return {
-            str(item.get("name", "")).lower(): str(item.get("value", ""))
-            for item in pairs
-            if item.get("name")
-        }
-    except Exception:
-        return {}
+        _RESPONSE_HEADERS[response] = headers
+    except TypeError:
+        # Not weak-referenceable; just skip caching.
+        pass
+    return headers
 
 
 async def response_to_json(response: Any) -> dict[str, Any] | None:
+    # Parse the raw body directly: response.json() decodes to str and uses stdlib json,
+    # while json_loads takes bytes and prefers orjson.
     try:
-        payload = await response.json()
-        if isinstance(payload, dict):
-            return payload
+        payload = json_loads(await response.body())
     except Exception:
-        pass
+        return None
+    return payload if isinstance(payload, dict) else None
 
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a delta-seconds ``Retry-After`` header; HTTP dates are ignored."""
     try:
-        text = await response.text()
-        payload = json.loads(text)
-        if isinstance(payload, dict):
-            return payload
-    except Exception:
+        seconds = float(str(value).strip())
+    except (TypeError, ValueError):
         return None
-    return None
+    return seconds if seconds >= 0 else None
 
 
 async def poll_paymentdetails_location(
@@ -2075,30 +3014,44 @@ async def poll_paymentdetails_location(
     location: str,
     timeout_sec: int = 45,
 ) -> dict[str, Any]:
-    deadline = asyncio.get_event_loop().time() + max(5, timeout_sec)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(5, timeout_sec)
     last_status = ""
     last_message = ""
+    attempt = 0
+    # Validators from the last pending response; unchanged pending bodies then come back
+    # as an empty 304 instead of being re-sent on every poll.
+    conditional: dict[str, str] = {}
 
-    while asyncio.get_event_loop().time() < deadline:
-        response = await context.request.get(location, timeout=45000)
+    while loop.time() < deadline:
+        response = await context.request.get(location, headers=conditional or None, timeout=45000)
         status = int(getattr(response, "status", 0) or 0)
         last_status = str(status)
-
-        if status == 403:
-            # Toast report exports can briefly return AccessDenied while S3 object is pending.
-            await asyncio.sleep(1.0)
-            continue
-
-        payload = await response_to_json(response)
-        if isinstance(payload, dict):
-            if isinstance(payload.get("aaData"), list):
-                return payload
-            nested = payload.get("data")
-            if isinstance(nested, dict) and isinstance(nested.get("aaData"), list):
-                return nested
-            if payload.get("status"):
-                last_message = str(payload.get("message") or payload.get("status"))
-        await asyncio.sleep(1.0)
+        headers = await get_response_headers(response)
+        # Exports are often ready within a few hundred ms; start fast and back off to 1.5s.
+        delay = poll_delay(attempt, base=0.15, cap=1.5)
+        attempt += 1
+
+        # Toast report exports can briefly return AccessDenied while the S3 object is pending;
+        # a 304 means the pending body hasn't changed since the last poll.
+        if status not in (403, 304):
+            payload = await response_to_json(response)
+            if isinstance(payload, dict):
+                if isinstance(payload.get("aaData"), list):
+                    return payload
+                nested = payload.get("data")
+                if isinstance(nested, dict) and isinstance(nested.get("aaData"), list):
+                    return nested
+                if payload.get("status"):
+                    last_message = str(payload.get("message") or payload.get("status"))
+            if headers.get("etag"):
+                conditional = {"If-None-Match": headers["etag"]}
+            elif headers.get("last-modified"):
+                conditional = {"If-Modified-Since": headers["last-modified"]}
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        if retry_after is not None:
+            delay = retry_after
+        await asyncio.sleep(max(0.0, min(delay, deadline - loop.time())))
 
     raise RuntimeError(
         f"paymentdetails_location_timeout status={last_status} message={last_message or 'n/a'}"
@@ -2125,16 +3078,31 @@ async def fetch_paymentdetails_page(context: BrowserContext, request_url: str) -
     raise RuntimeError(f"paymentdetails_request_failed status={status} body={snippet}")
 
 
+@lru_cache(maxsize=32)
+def paymentdetails_column_names(headers: tuple[str, ...], width: int) -> tuple[str, ...]:
+    # Every row of a payload shares its headers, so the names are built once per shape.
+    return tuple(
+        headers[index]
+        if index < len(headers) and headers[index]
+        else PAYMENTDETAILS_FALLBACK_HEADERS.get(index, f"col_{index}")
+        for index in range(width)
+    )
+
+
 def map_paymentdetails_row(
     row: Any,
     headers: list[str],
 ) -> dict[str, Any]:
     if isinstance(row, dict):
-        mapped = {clean_text(k): clean_text(v) for k, v in row.items() if clean_text(k)}
+        mapped: dict[str, Any] = {}
+        for key, value in row.items():
+            name = clean_text(key)
+            if name:
+                mapped[name] = clean_text(value)
         payment_id = (
-            clean_text(mapped.get("payment_id"))
-            or clean_text(mapped.get("Payment ID"))
-            or extract_payment_id_from_cells([str(v) for v in mapped.values()])
+            mapped.get("payment_id")
+            or mapped.get("Payment ID")
+            or extract_payment_id_from_cells(list(mapped.values()))
         )
         return {"payment_id": payment_id, **mapped}
 
@@ -2144,22 +3112,14 @@ def map_paymentdetails_row(
         return {"payment_id": payment_id, "raw_row": text}
 
     cells = [clean_text(cell) for cell in row]
-    payment_id = extract_payment_id_from_cells(cells)
-    mapped: dict[str, Any] = {}
-    for index, cell in enumerate(cells):
-        if not cell:
-            continue
-        key = ""
-        if index < len(headers) and headers[index]:
-            key = headers[index]
-        if not key:
-            key = PAYMENTDETAILS_FALLBACK_HEADERS.get(index, f"col_{index}")
-        mapped[key] = cell
+    names = paymentdetails_column_names(tuple(headers), len(cells))
+    mapped = {names[index]: cell for index, cell in enumerate(cells) if cell}
 
+    payment_id = extract_payment_id_from_cells(cells)
     if payment_id:
         mapped["payment_id"] = payment_id
-    elif mapped.get("payment_id"):
-        payment_id = clean_text(mapped.get("payment_id"))
+    else:
+        payment_id = mapped.get("payment_id", "")
     return {"payment_id": payment_id, **mapped}
 
 
@@ -2192,6 +3152,7 @@ async def discover_paymentdetails_template(
     human_max_delay_ms: int = 900,
 ) -> str:
     captured: dict[str, str] = {"url": ""}
+    seen = asyncio.Event()
 
     def on_request(request: Any) -> None:
         url = str(getattr(request, "url", ""))
@@ -2199,6 +3160,7 @@ async def discover_paymentdetails_template(
             return
         if "?" in url or not captured["url"]:
             captured["url"] = url
+            seen.set()
 
     page.on("request", on_request)
     try:
@@ -2213,10 +3175,13 @@ async def discover_paymentdetails_template(
         await ensure_payments_tab(page)
         await wait_for_payments_table_ready(page, timeout_sec=20)
 
-        for _ in range(16):
-            if captured["url"]:
-                return captured["url"]
-            await page.wait_for_timeout(250)
+        # Usually the request already fired during the Apply above; otherwise wake as soon
+        # as it does rather than polling.
+        try:
+            await asyncio.wait_for(seen.wait(), timeout=4.0)
+            return captured["url"]
+        except asyncio.TimeoutError:
+            pass
 
         perf_url = await page.evaluate(
             """() => {
@@ -2240,38 +3205,190 @@ async def discover_paymentdetails_template(
     return DEFAULT_PAYMENTDETAILS_URL
 
 
-async def crawl_metadata_via_ui(
+async def crawl_metadata_via_ui(
+    page: Page,
+    config: dict[str, Any],
+    max_pages: int,
+) -> list[dict[str, Any]]:
+    all_rows: list[dict[str, Any]] = []
+    seen_ids: set[str] = set()
+    page_count = 0
+
+    while True:
+        page_count += 1
+        rows = await extract_metadata_rows(page, config)
+        if not rows:
+            # DataTables refresh can lag after filter/pagination actions.
+            for _ in range(4):
+                await page.wait_for_timeout(800)
+                rows = await extract_metadata_rows(page, config)
+                if rows:
+                    break
+        for row in rows:
+            payment_id = (row.get("payment_id") or "").strip()
+            if payment_id and payment_id not in seen_ids:
+                seen_ids.add(payment_id)
+                all_rows.append(row)
+
+        if max_pages and page_count >= max_pages:
+            break
+
+        if not await click_next_page(page, config):
+            break
+
+    return all_rows
+
+
+async def crawl_metadata_via_api(
     page: Page,
     config: dict[str, Any],
+    start_date: str,
+    end_date: str,
     max_pages: int,
+    *,
+    page_size: int = 100,
+    concurrency: int = 4,
+    human_min_delay_ms: int = 250,
+    human_max_delay_ms: int = 900,
 ) -> list[dict[str, Any]]:
+    """Page through the paymentdetails DataTables endpoint instead of clicking Next.
+
+    Each page is a plain GET through the browser context, so no render cycle is paid
+    per page. The first page reports the total; the remaining offsets are fetched
+    concurrently, at most ``concurrency`` at a time. Falls back to
+    :func:`crawl_metadata_via_ui` when the endpoint yields nothing, or when a later
+    page fails or repeats ids already seen.
+    """
+    template = await discover_paymentdetails_template(
+        page,
+        config,
+        start_date,
+        end_date,
+        human_min_delay_ms=human_min_delay_ms,
+        human_max_delay_ms=human_max_delay_ms,
+    )
     all_rows: list[dict[str, Any]] = []
     seen_ids: set[str] = set()
-    page_count = 0
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    while True:
-        page_count += 1
-        rows = await extract_metadata_rows(page, config)
-        if not rows:
-            # DataTables refresh can lag after filter/pagination actions.
-            for _ in range(4):
-                await page.wait_for_timeout(800)
-                rows = await extract_metadata_rows(page, config)
-                if rows:
-                    break
-        for row in rows:
+    async def fetch_offset(offset: int) -> tuple[int | None, list[Any]]:
+        url = build_paymentdetails_url(template, start_date, end_date, offset, page_size)
+        async with semaphore:
+            payload = await fetch_paymentdetails_page(page.context, url)
+        return extract_paymentdetails_rows(payload)
+
+    def accept(page_number: int, offset: int, rows: list[Any], total: int | None) -> int:
+        page_added = 0
+        for raw in rows:
+            # Raw aaData rows are positional; map_paymentdetails_row names the known columns.
+            row = map_paymentdetails_row(raw, [])
             payment_id = (row.get("payment_id") or "").strip()
             if payment_id and payment_id not in seen_ids:
                 seen_ids.add(payment_id)
                 all_rows.append(row)
+                page_added += 1
+        log_event(
+            "paymentdetails_api_page_fetched",
+            page=page_number,
+            offset=offset,
+            rows=len(rows),
+            accepted=len(all_rows),
+            total=total,
+        )
+        return page_added
 
-        if max_pages and page_count >= max_pages:
+    try:
+        total, rows = await fetch_offset(0)
+    except Exception as exc:
+        log_event("paymentdetails_api_failed", offset=0, error=str(exc))
+        total, rows = None, []
+    if not rows:
+        return await crawl_metadata_via_ui(page, config, max_pages)
+    accept(1, 0, rows, total)
+    # The server may cap iDisplayLength below what we asked for; step by what it sent.
+    step = len(rows)
+
+    if total is not None:
+        offsets = list(range(step, total, step))
+        if max_pages:
+            offsets = offsets[: max(0, max_pages - 1)]
+        results = await asyncio.gather(
+            *(fetch_offset(offset) for offset in offsets), return_exceptions=True
+        )
+        # A missing page or one with no new ids (the endpoint ignored iDisplayStart) would
+        # leave a silent hole, so either restarts the listing from the table.
+        for page_number, (offset, result) in enumerate(zip(offsets, results), start=2):
+            if isinstance(result, BaseException):
+                log_event("paymentdetails_api_failed", offset=offset, error=str(result))
+                return await crawl_metadata_via_ui(page, config, max_pages)
+            if accept(page_number, offset, result[1], total) == 0:
+                log_event("paymentdetails_api_stalled", page=page_number, offset=offset)
+                return await crawl_metadata_via_ui(page, config, max_pages)
+        return all_rows
+
+    # Without a total there is nothing to fan out over; walk until a page adds nothing.
+    offset = step
+    page_number = 1
+    while not max_pages or page_number < max_pages:
+        page_number += 1
+        try:
+            _, rows = await fetch_offset(offset)
+        except Exception as exc:
+            log_event("paymentdetails_api_failed", offset=offset, error=str(exc))
+            break
+        if not rows or accept(page_number, offset, rows, None) == 0:
             break
+        offset += len(rows)
+    return all_rows
 
-        if not await click_next_page(page, config):
+
+def accept_order_detail_rows(
+    raw_rows: list[dict[str, Any]],
+    seen_ids: set[str],
+    all_rows: list[dict[str, Any]],
+    limit: int = 0,
+) -> tuple[int, str]:
+    """Map unseen order blocks into ``all_rows``; return (rows added, page signature).
+
+    The signature digests the sorted ids of every block on the page, seen or not, so a
+    page served again hashes the same regardless of block order.
+    """
+    page_added = 0
+    page_ids: list[str] = []
+    for row in raw_rows:
+        payment_id = clean_text(row.get("payment_id") or "")
+        payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
+        metadata = normalize_metadata_fields(row.get("metadata") or {})
+        if not payment_id:
+            payment_id = clean_text(metadata.get("payment_id") or "")
+        if not payment_id:
+            continue
+        page_ids.append(payment_id)
+        if payment_id in seen_ids:
+            continue
+
+        seen_ids.add(payment_id)
+        detail = map_detail_payload(payload, metadata_fields=metadata)
+        validation_errors = detail.get("validation_errors") or []
+        last_error = "; ".join(validation_errors) if validation_errors else None
+        all_rows.append(
+            {
+                "payment_id": payment_id,
+                "metadata": metadata,
+                "data": detail,
+                "complete": bool(detail.get("complete")),
+                "last_error": last_error,
+                "parsed_url": clean_text(row.get("parsed_url") or ORDER_DETAILS_URL),
+            }
+        )
+        page_added += 1
+        if limit and len(all_rows) >= limit:
             break
 
-    return all_rows
+    if not page_ids:
+        return page_added, ""
+    digest = hashlib.blake2b("|".join(sorted(page_ids)).encode("utf-8"), digest_size=8)
+    return page_added, digest.hexdigest()
 
 
 async def crawl_metadata(
@@ -2284,6 +3401,7 @@ async def crawl_metadata(
     *,
     human_min_delay_ms: int = 250,
     human_max_delay_ms: int = 900,
+    deep_debug: bool = False,
 ) -> list[dict[str, Any]]:
     await page.goto(ORDER_DETAILS_URL, wait_until="domcontentloaded", timeout=45000)
     await ensure_order_details_tab(page, config)
@@ -2294,6 +3412,7 @@ async def crawl_metadata(
         end_date,
         human_min_delay_ms=human_min_delay_ms,
         human_max_delay_ms=human_max_delay_ms,
+        deep_debug=deep_debug,
     )
     await ensure_order_details_tab(page, config)
     # Mirror the manual flow: wait for "Loading" to clear before deciding whether we have data.
@@ -2307,48 +3426,40 @@ async def crawl_metadata(
 
     while True:
         page_count += 1
-        raw_rows = await extract_order_detail_blocks(page, config)
+        last_allowed_page = bool(max_pages and page_count >= max_pages)
+        # One evaluate extracts the blocks, reads the pagination summary and, when another
+        # page is wanted, clicks Next; near the limit the click is left to the serial path.
+        step = await fetch_order_details_page(
+            page,
+            config,
+            advance=not last_allowed_page,
+            max_rows=limit - len(all_rows) if limit else 0,
+        )
+        raw_rows = step["rows"]
+        current_summary = step["summary"]
+        no_items = step["no_items"]
+        clicked = step["clicked"]
         if not raw_rows:
-            # Order detail pages can render asynchronously after date changes.
-            for _ in range(4):
-                await page.wait_for_timeout(700)
+            # Order detail pages can render asynchronously after date changes. Eight short
+            # backoff steps cover about the same ~2.5s as the old fixed 700ms x4 retries.
+            for attempt in range(8):
+                await asyncio.sleep(poll_delay(attempt))
                 await wait_for_order_details_idle(page, timeout_sec=15)
                 raw_rows = await extract_order_detail_blocks(page, config)
                 if raw_rows:
+                    current_summary = await get_pagination_summary(page)
                     break
 
-        page_added = 0
-        signature_ids: list[str] = []
-        for row in raw_rows:
-            payment_id = clean_text(row.get("payment_id") or "")
-            payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
-            metadata = normalize_metadata_fields(row.get("metadata") or {})
-            if not payment_id:
-                payment_id = clean_text(metadata.get("payment_id") or "")
-            if not payment_id or payment_id in seen_ids:
-                continue
-
-            seen_ids.add(payment_id)
-            if len(signature_ids) < 6:
-                signature_ids.append(payment_id)
-            detail = map_detail_payload(payload, metadata_fields=metadata)
-            validation_errors = detail.get("validation_errors") or []
-            last_error = "; ".join(validation_errors) if validation_errors else None
-            all_rows.append(
-                {
-                    "payment_id": payment_id,
-                    "metadata": metadata,
-                    "data": detail,
-                    "complete": bool(detail.get("complete")),
-                    "last_error": last_error,
-                    "parsed_url": clean_text(row.get("parsed_url") or ORDER_DETAILS_URL),
-                }
-            )
-            page_added += 1
-            if limit and len(all_rows) >= limit:
-                break
+        at_end = bool(current_summary) and current_summary.get("end", 0) >= current_summary.get("total", 0)
+        has_next = clicked or (bool(raw_rows) and not at_end and not last_allowed_page)
+        if has_next and not clicked:
+            if no_items is None:
+                no_items = await detect_no_items_message(page)
+            has_next = not no_items
 
-        signature = "|".join(signature_ids) if signature_ids else ""
+        page_added, signature = await asyncio.to_thread(
+            accept_order_detail_rows, raw_rows, seen_ids, all_rows, limit
+        )
         if signature:
             if signature in page_signatures:
                 log_event(
@@ -2359,10 +3470,6 @@ async def crawl_metadata(
                 break
             page_signatures.add(signature)
 
-        # Read the pagination summary *after* extracting the current page so
-        # we can detect when the next page has finished loading.
-        current_summary = await get_pagination_summary(page)
-
         log_event(
             "order_details_page_fetched",
             page=page_count,
@@ -2381,25 +3488,18 @@ async def crawl_metadata(
                 reason="no_new_ids",
             )
             break
-        if max_pages and page_count >= max_pages:
-            break
-        if await detect_no_items_message(page):
+        if at_end:
+            log_event(
+                "order_details_pagination_complete",
+                page=page_count,
+                collected=len(all_rows),
+                total=current_summary.get("total"),
+            )
             break
-        if not raw_rows:
+        if not has_next:
             break
 
-        # Check whether there are more pages via the pagination summary.
-        if current_summary:
-            if current_summary.get("end", 0) >= current_summary.get("total", 0):
-                log_event(
-                    "order_details_pagination_complete",
-                    page=page_count,
-                    collected=len(all_rows),
-                    total=current_summary.get("total"),
-                )
-                break
-
-        if not await click_next_order_details_page(page, config):
+        if not clicked and not await click_next_order_details_page(page, config):
             break
 
         # Wait for the DOM to reflect the new page data instead of relying on
@@ -2445,13 +3545,22 @@ async def crawl_metadata(
     return all_rows
 
 
+_NON_DECIMAL_RE = re.compile(r"[^0-9.-]")
+_INT_RE = re.compile(r"-?\d+")
+
+
 def parse_decimal(value: Any) -> float | None:
     if value is None:
         return None
-    text = str(value).strip()
+    return _parse_decimal_text(str(value).strip())
+
+
+# The parse_* helpers see the same few money/count strings over and over across a report.
+@lru_cache(maxsize=1024)
+def _parse_decimal_text(text: str) -> float | None:
     if not text:
         return None
-    cleaned = re.sub(r"[^0-9.-]", "", text)
+    cleaned = _NON_DECIMAL_RE.sub("", text)
     if cleaned in {"", "-", ".", "-."}:
         return None
     try:
@@ -2463,10 +3572,14 @@ def parse_decimal(value: Any) -> float | None:
 def parse_int(value: Any) -> int | None:
     if value is None:
         return None
-    text = str(value).strip()
+    return _parse_int_text(str(value).strip())
+
+
+@lru_cache(maxsize=1024)
+def _parse_int_text(text: str) -> int | None:
     if not text:
         return None
-    match = re.search(r"-?\d+", text)
+    match = _INT_RE.search(text)
     if not match:
         return None
     return int(match.group(0))
@@ -2528,31 +3641,68 @@ def parse_datetime_flexible(value: Any) -> datetime | None:
         return value
     if value is None:
         return None
-    text = str(value).strip()
+    return _parse_datetime_text(str(value).strip())
+
+
+# Layout of a datetime string with every digit mapped to 9 and every letter to a, e.g.
+# "1/2/25, 3:04 PM" -> "9/9/99, 9:99 aa". Strings with the same layout parse with the same
+# format, so each layout pays for the full format scan only once.
+_DATETIME_SHAPE_TABLE = str.maketrans(
+    "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ", "9" * 10 + "a" * 52
+)
+_ISO_LAYOUT = "iso"
+# layout -> (format or _ISO_LAYOUT, parse the comma-stripped form)
+_DATETIME_FORMAT_BY_SHAPE: dict[str, tuple[str, bool]] = {}
+
+
+def _parse_datetime_as(normalized: str, fmt: str, strip_commas: bool) -> datetime | None:
+    try:
+        if fmt == _ISO_LAYOUT:
+            return datetime.fromisoformat(normalized.replace("Z", "+00:00"))
+        return datetime.strptime(normalized.replace(",", "") if strip_commas else normalized, fmt)
+    except ValueError:
+        return None
+
+
+# Opened/closed timestamps repeat across a check's items and across pages, and a miss can
+# cost a couple dozen failed strptime calls. datetimes are immutable, so sharing is safe.
+@lru_cache(maxsize=4096)
+def _parse_datetime_text(text: str) -> datetime | None:
     if not text:
         return None
-    normalized = re.sub(r"\s+", " ", text.replace(" at ", " "))
-    iso_candidate = normalized.replace("Z", "+00:00")
-    try:
-        return datetime.fromisoformat(iso_candidate)
-    except Exception:
-        pass
-    for fmt in DATETIME_INPUT_FORMATS:
-        try:
-            return datetime.strptime(normalized, fmt)
-        except ValueError:
-            continue
-    fallback = normalized.replace(",", "")
-    if fallback != normalized:
-        for fmt in DATETIME_INPUT_FORMATS:
-            try:
-                return datetime.strptime(fallback, fmt)
-            except ValueError:
-                continue
+    normalized = _WS_RE.sub(" ", text.replace(" at ", " "))
+    shape = normalized.translate(_DATETIME_SHAPE_TABLE)
+    known = _DATETIME_FORMAT_BY_SHAPE.get(shape)
+    if known is not None:
+        parsed = _parse_datetime_as(normalized, *known)
+        if parsed is not None:
+            return parsed
+
+    candidates = [(_ISO_LAYOUT, False)]
+    candidates.extend((fmt, False) for fmt in DATETIME_INPUT_FORMATS)
+    if "," in normalized:
+        candidates.extend((fmt, True) for fmt in DATETIME_INPUT_FORMATS)
+    for candidate in candidates:
+        parsed = _parse_datetime_as(normalized, *candidate)
+        if parsed is not None:
+            if len(_DATETIME_FORMAT_BY_SHAPE) < 256:
+                _DATETIME_FORMAT_BY_SHAPE[shape] = candidate
+            return parsed
     return None
 
 
 def compute_turnover_minutes(opened: Any, closed: Any) -> float | None:
+    if isinstance(opened, str) and isinstance(closed, str):
+        return _turnover_minutes_text(opened, closed)
+    return _turnover_minutes(opened, closed)
+
+
+@lru_cache(maxsize=4096)
+def _turnover_minutes_text(opened: str, closed: str) -> float | None:
+    return _turnover_minutes(opened, closed)
+
+
+def _turnover_minutes(opened: Any, closed: Any) -> float | None:
     opened_dt = parse_datetime_flexible(opened)
     closed_dt = parse_datetime_flexible(closed)
     if not opened_dt or not closed_dt:
@@ -2571,22 +3721,28 @@ def compute_turnover_minutes(opened: Any, closed: Any) -> float | None:
     return round(delta / 60.0, 2)
 
 
-def pick_value(pairs: dict[str, str], candidates: list[str]) -> str | None:
-    for key, value in pairs.items():
-        normalized = key.lower()
-        for candidate in candidates:
-            if candidate in normalized and value:
-                return value
+class LoweredFields:
+    """Label/value fields with labels lower-cased once, for the many substring lookups per check."""
+
+    __slots__ = ("fields", "by_label")
+
+    def __init__(self, fields: dict[Any, Any] | None) -> None:
+        self.fields = tuple((str(key).lower(), value) for key, value in (fields or {}).items())
+        # Metadata lookups treat labels differing only by case as one field (last value wins).
+        self.by_label = dict(self.fields)
+
+
+def pick_value(pairs: LoweredFields, candidates: list[str]) -> str | None:
+    for key, value in pairs.fields:
+        if value and any(candidate in key for candidate in candidates):
+            return value
     return None
 
 
-def pick_metadata_value(metadata: dict[str, Any] | None, candidates: list[str]) -> str | None:
-    if not metadata:
-        return None
-    lowered = {str(key).lower(): value for key, value in metadata.items()}
+def pick_metadata_value(metadata: LoweredFields, candidates: list[str]) -> str | None:
     for candidate in candidates:
         needle = candidate.lower()
-        for key, value in lowered.items():
+        for key, value in metadata.by_label.items():
             if needle in key:
                 text = str(value).strip()
                 if text:
@@ -2594,14 +3750,20 @@ def pick_metadata_value(metadata: dict[str, Any] | None, candidates: list[str])
     return None
 
 
+_LEADING_PUNCT_RE = re.compile(r"^[^A-Za-z0-9]+")
+_SERVER_PREFIX_RE = re.compile(r"^(?:opened by\s+server|server)\s*:\s*", re.I)
+_BARE_LABEL_RE = re.compile(r"[A-Za-z ]+:")
+_ALNUM_RE = re.compile(r"[A-Za-z0-9]")
+
+
 def sanitize_server_value(value: Any) -> str | None:
     if value is None:
         return None
-    text = re.sub(r"\s+", " ", str(value)).strip()
+    text = _WS_RE.sub(" ", str(value)).strip()
     if not text:
         return None
-    text = re.sub(r"^[^A-Za-z0-9]+", "", text)
-    text = re.sub(r"^(?:opened by\s+server|server)\s*:\s*", "", text, flags=re.I)
+    text = _LEADING_PUNCT_RE.sub("", text)
+    text = _SERVER_PREFIX_RE.sub("", text)
     text = text.strip(" :-")
     if not text:
         return None
@@ -2613,9 +3775,9 @@ def sanitize_server_value(value: Any) -> str | None:
         return None
     if "opened by server" in text.lower():
         return None
-    if re.fullmatch(r"[A-Za-z ]+:", text):
+    if _BARE_LABEL_RE.fullmatch(text):
         return None
-    if not re.search(r"[A-Za-z0-9]", text):
+    if not _ALNUM_RE.search(text):
         return None
     words = text.split()
     if len(words) >= 4 and len(words) % 2 == 0:
@@ -2625,9 +3787,52 @@ def sanitize_server_value(value: Any) -> str | None:
     return text
 
 
-def regex_pick(text: str, patterns: list[str]) -> str | None:
+_BODY_FIELD_RES: dict[str, tuple[re.Pattern[str], ...]] = {
+    field: tuple(re.compile(pattern, re.I) for pattern in patterns)
+    for field, patterns in {
+        "check_number": (
+            r"check\s*#?\s*(\d+)",
+            r"order\s*#?\s*(\d+)",
+        ),
+        "time_opened": (
+            r"(?:time opened|opened)\s*[:\-]?\s*(?:\n|\r\n)\s*([0-9/:\sapmAPM,]+)",
+            r"(?:time opened|opened)\s*[:\-]?\s*([0-9/:\sapmAPM]+)",
+        ),
+        "guest_count": (
+            r"(?:guest count|guests?|covers?)\s*[:\-]?\s*(?:\n|\r\n)\s*(\d+)",
+            r"(?:guest count|guests?|covers?)\s*[:\-]?\s*(\d+)",
+        ),
+        "server": (
+            r"server\s*[:\-]?\s*(?:\n|\r\n)\s*([^\n]+)",
+            r"server\s*[:\-]?\s*([^\n]+)",
+        ),
+        "table": (
+            r"table\s*[:\-]?\s*(?:\n|\r\n)\s*([^\n]+)",
+            r"table\s*[:\-]?\s*([^\n]+)",
+        ),
+        "revenue_center": (
+            r"revenue center\s*[:\-]?\s*(?:\n|\r\n)\s*([^\n]+)",
+            r"revenue center\s*[:\-]?\s*([^\n]+)",
+        ),
+        "subtotal": (r"subtotal\s*:?\s*\$?\s*([0-9,]+\.\d{2})",),
+        "tax": (r"\btax\b\s*:?\s*\$?\s*([0-9,]+\.\d{2})",),
+        "tip": (r"\btip\b\s*:?\s*\$?\s*([0-9,]+\.\d{2})",),
+        "gratuity": (r"gratuity\s*:?\s*\$?\s*([0-9,]+\.\d{2})",),
+        "total": (
+            r"\btotal\b\s*:?\s*\$?\s*([0-9,]+\.\d{2})",
+            r"\btotal\b\s*:\s*(?:[A-Za-z ]+:\s*)*\$?\s*([0-9,]+\.\d{2})",
+        ),
+        "created_by": (
+            r"Created by\s*:\s*([^\n]+)",
+            r"Created by\s*\[[^\]]+\]\s*:\s*([^\n]+)",
+        ),
+    }.items()
+}
+
+
+def regex_pick(text: str, patterns: Sequence[re.Pattern[str]]) -> str | None:
     for pattern in patterns:
-        match = re.search(pattern, text, flags=re.I)
+        match = pattern.search(text)
         if match:
             value = (match.group(1) or "").strip()
             if value:
@@ -2635,21 +3840,131 @@ def regex_pick(text: str, patterns: list[str]) -> str | None:
     return None
 
 
+# Every _BODY_FIELD_RES match contains one of its field's anchor words, so a field whose
+# anchors are absent from the body cannot match and its patterns need not be run.
+_BODY_FIELD_ANCHORS: dict[str, tuple[str, ...]] = {
+    "check_number": ("check", "order"),
+    "time_opened": ("opened",),
+    "guest_count": ("guest", "cover"),
+    "server": ("server",),
+    "table": ("table",),
+    "revenue_center": ("revenue center",),
+    "subtotal": ("subtotal",),
+    "tax": ("tax",),
+    "tip": ("tip",),
+    "gratuity": ("gratuity",),
+    "total": ("total",),
+    "created_by": ("created by",),
+}
+
+
+def pick_body_fields(text: str) -> dict[str, str | None]:
+    """``regex_pick`` each ``_BODY_FIELD_RES`` field, skipping fields with no anchor in ``text``."""
+    # str.lower() agrees with re.I only for ASCII; anything else runs every pattern.
+    lowered = text.lower() if text.isascii() else None
+    return {
+        field: (
+            regex_pick(text, patterns)
+            if lowered is None or any(anchor in lowered for anchor in _BODY_FIELD_ANCHORS[field])
+            else None
+        )
+        for field, patterns in _BODY_FIELD_RES.items()
+    }
+
+
+def tables_text(tables: list[dict[str, Any]]) -> str:
+    """Table text as bodyText used to carry it: one line per row, cells joined by spaces."""
+    return "\n".join(
+        " ".join(cells)
+        for table in tables
+        for cells in (table.get("headers") or [], *(table.get("rows") or []))
+        if cells
+    )
+
+
+_HEADER_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+
+
 def normalize_header(value: Any) -> str:
-    text = str(value or "").strip().lower()
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+    return _normalize_header_text(str(value or ""))
 
 
-def pick_row_value(mapped: dict[str, Any], candidates: list[str]) -> Any:
-    for candidate in candidates:
-        needle = normalize_header(candidate)
-        for key, value in mapped.items():
-            key_text = normalize_header(key)
-            if needle == key_text or needle in key_text:
-                if str(value or "").strip():
-                    return value
-    return None
+# Header names and TableColumns candidates come from a small fixed vocabulary.
+@lru_cache(maxsize=1024)
+def _normalize_header_text(value: str) -> str:
+    text = value.strip().lower()
+    text = _HEADER_SEPARATOR_RE.sub(" ", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+class TableColumns:
+    """Column lookups for one detail table, resolved once from its normalized headers.
+
+    Equivalent to building ``{header: cell}`` for every row and scanning its keys, but the
+    header matching is done once per table and each row is read by index.
+    """
+
+    __slots__ = ("_columns", "_plans")
+
+    def __init__(self, headers: list[str]) -> None:
+        # Distinct headers in first-seen order; a repeated header keeps its rightmost cell,
+        # as a per-row dict would, so indices are stored last-first.
+        positions: dict[str, list[int]] = {}
+        for index, header in enumerate(headers):
+            positions.setdefault(header, []).append(index)
+        self._columns = [(header, tuple(reversed(indices))) for header, indices in positions.items()]
+        self._plans: dict[Any, tuple[tuple[int, ...], ...]] = {}
+
+    def _plan(self, key: Any, matches: Any) -> tuple[tuple[int, ...], ...]:
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = tuple(
+                indices for header, indices in self._columns if matches(header)
+            )
+        return plan
+
+    @staticmethod
+    def _cell(row: list[Any], indices: tuple[int, ...]) -> tuple[bool, Any]:
+        for index in indices:
+            if index < len(row):
+                return True, row[index]
+        return False, None
+
+    def pick(self, row: list[Any], *candidates: str) -> Any:
+        """First non-blank cell under a header containing a candidate, in candidate order."""
+        plan = self._plans.get(candidates)
+        if plan is None:
+            plan = self._plans[candidates] = tuple(
+                indices
+                for needle in map(normalize_header, candidates)
+                for header, indices in self._columns
+                if needle in header
+            )
+        for indices in plan:
+            found, value = self._cell(row, indices)
+            if found and str(value or "").strip():
+                return value
+        return None
+
+    def first_containing(self, row: list[Any], *needles: str, excluding: str = "") -> Any:
+        """Cell under the first header containing any needle (blank or not)."""
+        plan = self._plan(
+            ("contains", needles, excluding),
+            lambda header: any(needle in header for needle in needles)
+            and not (excluding and excluding in header),
+        )
+        for indices in plan:
+            found, value = self._cell(row, indices)
+            if found:
+                return value
+        return None
+
+    def get(self, row: list[Any], header: str) -> Any:
+        for indices in self._plan(("exact", header), lambda name: name == header):
+            found, value = self._cell(row, indices)
+            if found:
+                return value
+        return None
 
 
 def extract_items_from_tables(tables: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -2662,49 +3977,59 @@ def extract_items_from_tables(tables: list[dict[str, Any]]) -> list[dict[str, An
         if not (has_item and has_qty):
             continue
 
-        items: list[dict[str, Any]] = []
-        for row in table.get("rows", []):
-            mapped = {headers[i]: row[i] for i in range(min(len(headers), len(row)))}
-            item_name = (
-                pick_row_value(mapped, ["menu item", "item", "item name", "menu"])
-                or next((v for k, v in mapped.items() if "item" in k), None)
-            )
-            modifiers = pick_row_value(mapped, ["modifiers", "modifier"])
-
-            quantity = parse_decimal(
-                pick_row_value(mapped, ["qty", "quantity", "item qty"])
-                or next((v for k, v in mapped.items() if "qty" in k), None)
+        columns = TableColumns(headers)
+        rows = table.get("rows", [])
+        # Parse each numeric column in one sweep through the memoized parser, then assemble rows.
+        quantities = [
+            parse_decimal(columns.pick(row, "qty", "quantity", "item qty") or columns.first_containing(row, "qty"))
+            for row in rows
+        ]
+        unit_prices = [
+            parse_decimal(
+                columns.pick(row, "price", "unit price", "avg price") or columns.first_containing(row, "price")
             )
-            unit_price = parse_decimal(
-                pick_row_value(mapped, ["price", "unit price", "avg price"])
-                or next((v for k, v in mapped.items() if "price" in k), None)
+            for row in rows
+        ]
+        discounts = [
+            parse_decimal(columns.pick(row, "discount", "discount amount") or columns.get(row, "discount"))
+            for row in rows
+        ]
+        nets = [
+            parse_decimal(columns.pick(row, "net", "line total", "subtotal") or columns.get(row, "net"))
+            for row in rows
+        ]
+        taxes = [
+            parse_decimal(columns.pick(row, "tax", "item tax") or columns.first_containing(row, "tax"))
+            for row in rows
+        ]
+        totals = [
+            parse_decimal(
+                columns.pick(row, "total", "amount", "line total with tax", "gross amount")
+                or columns.first_containing(row, "total", "amount")
             )
-            line_discount = parse_decimal(
-                pick_row_value(mapped, ["discount", "discount amount"])
-                or next((v for k, v in mapped.items() if k == "discount"), None)
+            for row in rows
+        ]
+
+        items: list[dict[str, Any]] = []
+        for row, quantity, unit_price, line_discount, line_total_net, line_tax, line_total_with_tax in zip(
+            rows, quantities, unit_prices, discounts, nets, taxes, totals
+        ):
+            item_name = columns.pick(row, "menu item", "item", "item name", "menu") or columns.first_containing(
+                row, "item"
             )
+            if not item_name:
+                continue
+            modifiers = columns.pick(row, "modifiers", "modifier")
             if line_discount is None:
                 line_discount = 0.0
-            line_total_net = parse_decimal(
-                pick_row_value(mapped, ["net", "line total", "subtotal"])
-                or next((v for k, v in mapped.items() if k == "net"), None)
-            )
             if line_total_net is None and quantity is not None and unit_price is not None:
                 line_total_net = round((quantity * unit_price) - (line_discount or 0.0), 2)
-            line_tax = parse_decimal(
-                pick_row_value(mapped, ["tax", "item tax"])
-                or next((v for k, v in mapped.items() if "tax" in k), None)
-            )
-            line_total_with_tax = parse_decimal(
-                pick_row_value(mapped, ["total", "amount", "line total with tax", "gross amount"])
-                or next((v for k, v in mapped.items() if "total" in k or "amount" in k), None)
-            )
             if line_total_with_tax is None and line_total_net is not None and line_tax is not None:
                 line_total_with_tax = round(line_total_net + line_tax, 2)
             if line_total_with_tax is None:
                 line_total_with_tax = line_total_net
-            voided_value = pick_row_value(mapped, ["voided", "voided?", "void"])
-            reason_value = pick_row_value(mapped, ["reason", "void reason"])
+            voided_value = columns.pick(row, "voided", "voided?", "void")
+            reason_value = columns.pick(row, "reason", "void reason")
             voided = str(voided_value or "").strip().lower() in {"true", "yes", "1"}
 
             items.append(
@@ -2721,9 +4046,8 @@ def extract_items_from_tables(tables: list[dict[str, Any]]) -> list[dict[str, An
                     "reason": reason_value,
                 }
             )
-        filtered = [item for item in items if item["item_name"]]
-        if filtered:
-            return filtered
+        if items:
+            return items
     return []
 
 
@@ -2738,21 +4062,21 @@ def extract_discounts_from_tables(tables: list[dict[str, Any]]) -> list[dict[str
         if not (has_name and has_amount and has_applied):
             continue
 
+        columns = TableColumns(headers)
         discounts: list[dict[str, Any]] = []
         for row in table.get("rows", []):
-            mapped = {headers[i]: row[i] for i in range(min(len(headers), len(row)))}
-            name = pick_row_value(mapped, ["name"])
-            amount = parse_decimal(pick_row_value(mapped, ["amount"]))
+            name = columns.pick(row, "name")
+            amount = parse_decimal(columns.pick(row, "amount"))
             if amount is None:
                 amount = 0.0
             discounts.append(
                 {
                     "name": name,
                     "amount": amount,
-                    "applied_date": pick_row_value(mapped, ["applied date", "date applied"]),
-                    "approver": pick_row_value(mapped, ["approver", "approved by"]),
-                    "reason": pick_row_value(mapped, ["reason"]),
-                    "comment": pick_row_value(mapped, ["comment", "notes", "note"]),
+                    "applied_date": columns.pick(row, "applied date", "date applied"),
+                    "approver": columns.pick(row, "approver", "approved by"),
+                    "reason": columns.pick(row, "reason"),
+                    "comment": columns.pick(row, "comment", "notes", "note"),
                 }
             )
         filtered = [row for row in discounts if row.get("name") or row.get("amount") is not None]
@@ -2761,6 +4085,11 @@ def extract_discounts_from_tables(tables: list[dict[str, Any]]) -> list[dict[str
     return []
 
 
+_CARD_MASKED_LAST4_RE = re.compile(r"(?:\*{4}|x{4}|ending in)\s*(\d{4})", re.I)
+_CARD_LAST4_RE = re.compile(r"\b(\d{4})\b")
+_CARD_TYPE_RE = re.compile(r"(?:credit|debit)\s*:\s*([A-Za-z]+)", re.I)
+
+
 def extract_payments_from_tables(tables: list[dict[str, Any]]) -> list[dict[str, Any]]:
     for table in tables:
         headers = [normalize_header(h) for h in table.get("headers", [])]
@@ -2771,33 +4100,27 @@ def extract_payments_from_tables(tables: list[dict[str, Any]]) -> list[dict[str,
         if not (has_payment and has_amount):
             continue
 
+        columns = TableColumns(headers)
         payments: list[dict[str, Any]] = []
         for row in table.get("rows", []):
-            mapped = {headers[i]: row[i] for i in range(min(len(headers), len(row)))}
-            raw_payment_type = (
-                pick_row_value(mapped, ["payment", "payment method", "method", "type"])
-                or next((v for k, v in mapped.items() if "payment" in k or "method" in k), None)
-            )
+            raw_payment_type = columns.pick(
+                row, "payment", "payment method", "method", "type"
+            ) or columns.first_containing(row, "payment", "method")
             payment_type = normalize_payment_type(raw_payment_type)
-            card_type = pick_row_value(mapped, ["card type"]) or next(
-                (v for k, v in mapped.items() if "card" in k and "last" not in k),
-                None,
+            card_type = columns.pick(row, "card type") or columns.first_containing(
+                row, "card", excluding="last"
             )
-            card_last_4 = pick_row_value(mapped, ["card last 4", "last 4"])
+            card_last_4 = columns.pick(row, "card last 4", "last 4")
             if not card_last_4 and payment_type:
-                card_match = re.search(r"(?:\*{4}|x{4}|ending in)\s*(\d{4})", str(payment_type), re.I)
+                card_match = _CARD_MASKED_LAST4_RE.search(str(payment_type))
                 if card_match:
                     card_last_4 = card_match.group(1)
             if not card_last_4 and payment_type:
-                suffix_match = re.search(r"\b(\d{4})\b", str(payment_type))
+                suffix_match = _CARD_LAST4_RE.search(str(payment_type))
                 if suffix_match:
                     card_last_4 = suffix_match.group(1)
             if not card_type and payment_type:
-                card_type_match = re.search(
-                    r"(?:credit|debit)\s*:\s*([A-Za-z]+)",
-                    str(payment_type),
-                    re.I,
-                )
+                card_type_match = _CARD_TYPE_RE.search(str(payment_type))
                 if card_type_match:
                     card_type = card_type_match.group(1)
             if payment_type and payment_type.lower() == "gift card":
@@ -2806,29 +4129,19 @@ def extract_payments_from_tables(tables: list[dict[str, Any]]) -> list[dict[str,
             payments.append(
                 {
                     "payment_type": payment_type,
-                    "payment_date": pick_row_value(mapped, ["date", "paid at", "payment date"]),
+                    "payment_date": columns.pick(row, "date", "paid at", "payment date"),
                     "amount": parse_decimal(
-                        pick_row_value(mapped, ["amount", "paid", "charge amount"])
-                        or mapped.get("total")
-                        or next((v for k, v in mapped.items() if "amount" in k or "total" in k), None)
-                    ),
-                    "tip": parse_decimal(
-                        pick_row_value(mapped, ["tip"])
-                        or next((v for k, v in mapped.items() if "tip" in k), None)
+                        columns.pick(row, "amount", "paid", "charge amount")
+                        or columns.get(row, "total")
+                        or columns.first_containing(row, "amount", "total")
                     ),
+                    "tip": parse_decimal(columns.pick(row, "tip") or columns.first_containing(row, "tip")),
                     "gratuity": parse_decimal(
-                        pick_row_value(mapped, ["gratuity", "service charge"])
-                        or next((v for k, v in mapped.items() if "gratuity" in k), None)
-                    ),
-                    "total": parse_decimal(
-                        pick_row_value(mapped, ["total"])
-                        or next((v for k, v in mapped.items() if "total" in k), None)
+                        columns.pick(row, "gratuity", "service charge") or columns.first_containing(row, "gratuity")
                     ),
-                    "refund": parse_decimal(
-                        pick_row_value(mapped, ["refund"])
-                        or next((v for k, v in mapped.items() if "refund" in k), None)
-                    ),
-                    "status": pick_row_value(mapped, ["status"]),
+                    "total": parse_decimal(columns.pick(row, "total") or columns.first_containing(row, "total")),
+                    "refund": parse_decimal(columns.pick(row, "refund") or columns.first_containing(row, "refund")),
+                    "status": columns.pick(row, "status"),
                     "card_type": card_type,
                     "card_last_4": card_last_4,
                 }
@@ -2898,12 +4211,12 @@ def map_detail_payload(
     payload: dict[str, Any],
     metadata_fields: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    pairs = payload.get("pairs") or {}
+    pairs = LoweredFields(payload.get("pairs"))
     tables = payload.get("tables") or []
     body_text = payload.get("bodyText") or ""
     summary = payload.get("summary") or {}
     summary_details = payload.get("summaryDetails") or {}
-    metadata = normalize_metadata_fields(metadata_fields or {})
+    metadata = LoweredFields(normalize_metadata_fields(metadata_fields or {}))
 
     payments = extract_payments_from_tables(tables)
     items = extract_items_from_tables(tables)
@@ -2928,66 +4241,27 @@ def map_detail_payload(
         if allow_card_fill and not first.get("card_last_4") and card_last_4:
             first["card_last_4"] = card_last_4
 
-    regex_check_number = parse_int(
-        regex_pick(
-            body_text,
-            [
-                r"check\s*#?\s*(\d+)",
-                r"order\s*#?\s*(\d+)",
-            ],
-        )
-    )
-    regex_time_opened = regex_pick(
-        body_text,
-        [
-            r"(?:time opened|opened)\s*[:\-]?\s*(?:\n|\r\n)\s*([0-9/:\sapmAPM,]+)",
-            r"(?:time opened|opened)\s*[:\-]?\s*([0-9/:\sapmAPM]+)",
-        ],
-    )
-    regex_guest_count = parse_int(
-        regex_pick(
-            body_text,
-            [
-                r"(?:guest count|guests?|covers?)\s*[:\-]?\s*(?:\n|\r\n)\s*(\d+)",
-                r"(?:guest count|guests?|covers?)\s*[:\-]?\s*(\d+)",
-            ],
-        )
-    )
-    regex_server = regex_pick(
-        body_text,
-        [
-            r"server\s*[:\-]?\s*(?:\n|\r\n)\s*([^\n]+)",
-            r"server\s*[:\-]?\s*([^\n]+)",
-        ],
-    )
-    regex_table = regex_pick(
-        body_text,
-        [
-            r"table\s*[:\-]?\s*(?:\n|\r\n)\s*([^\n]+)",
-            r"table\s*[:\-]?\s*([^\n]+)",
-        ],
-    )
-    regex_revenue_center = regex_pick(
-        body_text,
-        [
-            r"revenue center\s*[:\-]?\s*(?:\n|\r\n)\s*([^\n]+)",
-            r"revenue center\s*[:\-]?\s*([^\n]+)",
-        ],
-    )
+    body_fields = pick_body_fields(body_text)
+    if tables and None in body_fields.values():
+        # bodyText leaves tables out (they travel in `tables`), so a value only shown in a
+        # table row, e.g. "Gratuity $5.00", comes from their text instead.
+        table_fields = pick_body_fields(tables_text(tables))
+        body_fields = {
+            field: table_fields[field] if value is None else value
+            for field, value in body_fields.items()
+        }
+    regex_check_number = parse_int(body_fields["check_number"])
+    regex_time_opened = body_fields["time_opened"]
+    regex_guest_count = parse_int(body_fields["guest_count"])
+    regex_server = body_fields["server"]
+    regex_table = body_fields["table"]
+    regex_revenue_center = body_fields["revenue_center"]
     # Toast often renders "TOTAL:" on one line and "$0.00" on the next; allow optional "$".
-    regex_subtotal = parse_decimal(regex_pick(body_text, [r"subtotal\s*:?\s*\$?\s*([0-9,]+\.\d{2})"]))
-    regex_tax = parse_decimal(regex_pick(body_text, [r"\btax\b\s*:?\s*\$?\s*([0-9,]+\.\d{2})"]))
-    regex_tip = parse_decimal(regex_pick(body_text, [r"\btip\b\s*:?\s*\$?\s*([0-9,]+\.\d{2})"]))
-    regex_gratuity = parse_decimal(regex_pick(body_text, [r"gratuity\s*:?\s*\$?\s*([0-9,]+\.\d{2})"]))
-    regex_total = parse_decimal(
-        regex_pick(
-            body_text,
-            [
-                r"\btotal\b\s*:?\s*\$?\s*([0-9,]+\.\d{2})",
-                r"\btotal\b\s*:\s*(?:[A-Za-z ]+:\s*)*\$?\s*([0-9,]+\.\d{2})",
-            ],
-        )
-    )
+    regex_subtotal = parse_decimal(body_fields["subtotal"])
+    regex_tax = parse_decimal(body_fields["tax"])
+    regex_tip = parse_decimal(body_fields["tip"])
+    regex_gratuity = parse_decimal(body_fields["gratuity"])
+    regex_total = parse_decimal(body_fields["total"])
 
     subtotal = parse_decimal(summary.get("subtotal"))
     if subtotal is None:
@@ -3129,13 +4403,7 @@ def map_detail_payload(
             pick_metadata_value(metadata, ["server", "opened by"])
         )
     if not mapped["server"]:
-        server_from_body = regex_pick(
-            body_text,
-            [
-                r"Created by\s*:\s*([^\n]+)",
-                r"Created by\s*\[[^\]]+\]\s*:\s*([^\n]+)",
-            ],
-        )
+        server_from_body = body_fields["created_by"]
         mapped["server"] = sanitize_server_value(server_from_body)
     if not mapped["table"]:
         mapped["table"] = pick_metadata_value(metadata, ["table"])
@@ -3149,7 +4417,7 @@ def map_detail_payload(
     if not time_closed:
         time_closed = pick_metadata_value(metadata, ["payment date", "closed", "closed at"])
     mapped["time_closed"] = time_closed
-    mapped["turnover_time"] = compute_turnover_minutes(mapped.get("time_opened"), mapped.get("time_closed"))
+    mapped["turnover_time"] = compute_turnover_minutes(mapped.get("time_opened"), time_closed)
 
     has_financial = mapped["total"] is not None or any(
         payment.get("amount") is not None for payment in payments
@@ -3161,11 +4429,6 @@ def map_detail_payload(
             bool(mapped["server"]),
         ]
     )
-    if not mapped["time_closed"]:
-        metadata_closed = pick_metadata_value(metadata, ["payment date", "closed", "closed at"])
-        if metadata_closed:
-            mapped["time_closed"] = metadata_closed
-    mapped["turnover_time"] = compute_turnover_minutes(mapped.get("time_opened"), mapped.get("time_closed"))
 
     validation_errors = validate_detail_payload(mapped)
     mapped["validation_errors"] = validation_errors
@@ -3206,7 +4469,7 @@ async def extract_detail_payload(
                     .map((el) => (el.textContent || "").trim())
                     .filter(Boolean);
                 if (cells.length === 2) {
-                    const key = cells[0].replace(/\s+/g, " ").trim();
+                    const key = cells[0].replace(/\\s+/g, " ").trim();
                     if (key && !pairs[key]) {
                         pairs[key] = cells[1];
                     }
@@ -3358,7 +4621,7 @@ def merge_metadata(
                 "complete": bool(row.get("complete", detail.get("complete"))),
                 "attempts": int(existing.get("attempts") or 0) + 1,
                 "last_error": last_error,
-                "extracted_at": utc_now(),
+                "extracted_at": utc_now_ms(),
                 "data": detail,
                 "parsed_url": clean_text(row.get("parsed_url") or ORDER_DETAILS_URL),
             }
@@ -3382,6 +4645,66 @@ def merge_metadata(
     return state, added
 
 
+class TokenBucket:
+    """Capacity-one token bucket shared by the detail workers.
+
+    acquire() reserves the next start slot without awaiting, so no lock is held
+    while workers sleep and each waits only until its own slot.
+    """
+
+    def __init__(self) -> None:
+        self._next_at = 0.0
+
+    async def acquire(self, interval_sec: float, *, not_before: float = 0.0) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start_at = max(now, self._next_at, not_before)
+        self._next_at = start_at + interval_sec
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+class PagePool:
+    """Fixed set of reusable tabs handed out to detail workers.
+
+    Every detail fetch navigates from scratch, so a tab can be reused as-is
+    instead of paying new_page()/close() per payment id.
+    """
+
+    def __init__(self, context: BrowserContext, size: int) -> None:
+        self._context = context
+        self._size = max(1, size)
+        self._created = 0
+        self._idle: asyncio.Queue[Page] = asyncio.Queue()
+        self._pages: list[Page] = []
+
+    async def _new_page(self) -> Page:
+        page = await self._context.new_page()
+        self._pages.append(page)
+        return page
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        if self._idle.empty() and self._created < self._size:
+            # Grow lazily so a short pending list does not open every tab up front.
+            self._created += 1
+            page = await self._new_page()
+        else:
+            page = await self._idle.get()
+        try:
+            yield page
+        finally:
+            if page.is_closed():
+                page = await self._new_page()
+            self._idle.put_nowait(page)
+
+    async def close(self) -> None:
+        for page in self._pages:
+            if not page.is_closed():
+                await page.close()
+        self._pages.clear()
+
+
 async def process_details(
     context: BrowserContext,
     state: dict[str, dict[str, Any]],
@@ -3405,37 +4728,37 @@ async def process_details(
         return
 
     print(f"Processing {len(pending_ids)} payment IDs with {workers} workers...")
-    semaphore = asyncio.Semaphore(max(1, workers))
+    pool = PagePool(context, workers)
+    delta_writer = AsyncJsonlWriter(state_delta_path(state_path))
+    error_writer = AsyncJsonlWriter(error_log_path)
+    delta_writer.start()
+    error_writer.start()
     lock = asyncio.Lock()
-    rate_lock = asyncio.Lock()
+    loop = asyncio.get_running_loop()
+    start_bucket = TokenBucket()
     throttle_lock = asyncio.Lock()
-    next_start_at = 0.0
     throttle_multiplier = 1.0
     throttle_until = 0.0
     throttle_events = 0
 
+    # Saves run in a worker thread while holding `lock`, so rows cannot change mid-dump
+    # but the event loop keeps servicing the other tabs.
     async def run_one(payment_id: str) -> None:
-        nonlocal next_start_at, throttle_multiplier, throttle_until, throttle_events
-        async with semaphore:
-            page = await context.new_page()
+        nonlocal throttle_multiplier, throttle_until, throttle_events
+        async with pool.acquire() as page:
             try:
                 # Global rate-limit navigation bursts across workers.
-                async with rate_lock:
-                    now = asyncio.get_event_loop().time()
-                    global_wait = max(0.0, throttle_until - now)
-                    if global_wait:
-                        await asyncio.sleep(global_wait)
-                    now = asyncio.get_event_loop().time()
-                    wait_for = max(0.0, next_start_at - now)
-                    if wait_for:
-                        await asyncio.sleep(wait_for)
+                while True:
                     # Add jitter around the minimum spacing.
                     interval_ms = jitter_ms(
                         max(0, int(detail_start_min_interval_ms * 0.8)),
                         max(0, int(detail_start_min_interval_ms * 1.3)),
                     )
                     interval_ms = int(max(100, interval_ms * max(1.0, throttle_multiplier)))
-                    next_start_at = asyncio.get_event_loop().time() + (interval_ms / 1000.0)
+                    await start_bucket.acquire(interval_ms / 1000.0, not_before=throttle_until)
+                    # A throttle cooldown may have started while this slot was waiting.
+                    if throttle_until <= loop.time():
+                        break
 
                 metadata_fields = normalize_metadata_fields(state[payment_id].get("metadata") or {})
                 detail = await extract_detail_payload(
@@ -3449,11 +4772,11 @@ async def process_details(
                     row["attempts"] = int(row.get("attempts") or 0) + 1
                     row["data"] = detail
                     row["complete"] = bool(detail.get("complete"))
-                    row["extracted_at"] = utc_now()
+                    row["extracted_at"] = utc_now_ms()
                     row["last_error"] = None
                     row["parsed_url"] = ORDER_DETAILS_URL
-                    save_state(state_path, state)
-                    save_progress(progress_path, state, run_id)
+                    delta_writer.write(row)
+                    await asyncio.to_thread(save_progress, progress_path, state, run_id)
                 async with throttle_lock:
                     if throttle_multiplier > 1.0:
                         throttle_multiplier = max(1.0, round(throttle_multiplier * 0.9, 3))
@@ -3470,11 +4793,10 @@ async def process_details(
                     row["attempts"] = int(row.get("attempts") or 0) + 1
                     row["last_error"] = message
                     row["complete"] = False
-                    row["extracted_at"] = utc_now()
-                    save_state(state_path, state)
-                    save_progress(progress_path, state, run_id)
-                    append_jsonl(
-                        error_log_path,
+                    row["extracted_at"] = utc_now_ms()
+                    delta_writer.write(row)
+                    await asyncio.to_thread(save_progress, progress_path, state, run_id)
+                    error_writer.write(
                         {
                             "ts": utc_now(),
                             "run_id": run_id,
@@ -3489,7 +4811,7 @@ async def process_details(
                         throttle_multiplier = min(8.0, max(1.5, throttle_multiplier * 1.65))
                         cooldown_base = min(120.0, float(2 ** min(throttle_events, 7)))
                         cooldown = cooldown_base + (jitter_ms(0, 1500) / 1000.0)
-                        throttle_until = max(throttle_until, asyncio.get_event_loop().time() + cooldown)
+                        throttle_until = max(throttle_until, loop.time() + cooldown)
                         log_event(
                             "detail_throttle_backoff",
                             run_id=run_id,
@@ -3500,10 +4822,33 @@ async def process_details(
                         )
                 if "AUTH_BLOCKED" in message:
                     raise
-            finally:
-                await page.close()
 
-    await asyncio.gather(*(run_one(payment_id) for payment_id in pending_ids))
+    tasks = [asyncio.create_task(run_one(payment_id)) for payment_id in pending_ids]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # gather() does not stop the other workers when one re-raises AUTH_BLOCKED; settle
+        # them before the writers, state and tabs they use are closed underneath them.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Drain the delta log before compaction deletes it.
+        await delta_writer.close()
+        await error_writer.close()
+        await asyncio.to_thread(compact_state, state_path, state)
+        await pool.close()
+
+
+# Image, font and media URLs by extension. Only matching requests are routed,
+# so report XHRs and documents never wait on a Python round-trip.
+_BLOCKED_RESOURCE_URL_RE = re.compile(
+    r"\.(?:png|jpe?g|gif|webp|avif|svg|ico|bmp|woff2?|ttf|otf|eot|mp4|webm|mp3|wav|ogg|m4a)(?:[?#]|$)",
+    re.IGNORECASE,
+)
+
+
+async def abort_unneeded_resource(route: Route) -> None:
+    await route.abort()
 
 
 def build_launch_kwargs(args: argparse.Namespace) -> dict[str, Any]:
@@ -3579,6 +4924,9 @@ async def run_once(
         await context.add_init_script(
             "Object.defineProperty(navigator, 'webdriver', { get: () => undefined });"
         )
+        await install_page_helpers(context, config)
+        if args.block_resources:
+            await context.route(_BLOCKED_RESOURCE_URL_RE, abort_unneeded_resource)
 
         await ensure_authenticated(
             page=page,
@@ -3591,6 +4939,7 @@ async def run_once(
             artifact_dir=artifact_dir,
             human_min_delay_ms=max(0, args.human_min_delay_ms),
             human_max_delay_ms=max(0, args.human_max_delay_ms),
+            deep_debug=args.deep_debug,
         )
 
         if metadata_required:
@@ -3604,6 +4953,7 @@ async def run_once(
                 limit=max(0, args.limit),
                 human_min_delay_ms=max(0, args.human_min_delay_ms),
                 human_max_delay_ms=max(0, args.human_max_delay_ms),
+                deep_debug=args.deep_debug,
             )
             if not metadata_rows:
                 no_items = await detect_no_items_message(page)
@@ -3614,11 +4964,11 @@ async def run_once(
                     url=ORDER_DETAILS_URL,
                 )
                 await save_order_details_debug_artifacts(
-                    page, artifact_dir, "order_details_zero_rows"
+                    page, artifact_dir, "order_details_zero_rows", deep_debug=args.deep_debug
                 )
             state, added = merge_metadata(state, metadata_rows)
-            save_state(state_path, state)
-            save_progress(progress_path, state, run_id)
+            await asyncio.to_thread(compact_state, state_path, state)
+            await asyncio.to_thread(save_progress, progress_path, state, run_id)
             log_event("metadata_crawl_done", run_id=run_id, rows=len(metadata_rows), new_payment_ids=added)
 
             log_event("menu_summary_crawl_start", run_id=run_id)
@@ -3631,8 +4981,9 @@ async def run_once(
                     max_pages=max(0, args.max_pages),
                     human_min_delay_ms=max(0, args.human_min_delay_ms),
                     human_max_delay_ms=max(0, args.human_max_delay_ms),
+                    deep_debug=args.deep_debug,
                 )
-                save_menu_summary(menu_summary_path, menu_summary_rows)
+                await asyncio.to_thread(save_menu_summary, menu_summary_path, menu_summary_rows.to_rows())
                 log_event(
                     "menu_summary_crawl_done",
                     run_id=run_id,
@@ -3664,7 +5015,7 @@ async def run_once(
             checks_list = sorted(state.values(), key=lambda row: row["payment_id"])
             menu_rows: list[dict[str, Any]] = []
             if menu_summary_path.exists():
-                menu_rows = json.loads(menu_summary_path.read_text(encoding="utf-8"))
+                menu_rows = json_loads(menu_summary_path.read_bytes())
             save_combined_output(
                 Path(args.combined_output),
                 from_date=args.start_date or "",
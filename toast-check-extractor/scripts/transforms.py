@@ -15,6 +15,8 @@ NYC_TZ = ZoneInfo("America/New_York")
 # Toast datetime format: "M/D/YY, H:MM AM/PM" (e.g. "1/1/25, 11:19 AM")
 TOAST_DT_FORMAT = "%m/%d/%y, %I:%M %p"
 
+_CURRENCY_SYMBOLS_RE = re.compile(r"[$,]")
+
 
 def parse_toast_datetime(raw: str | None) -> datetime | None:
     """Parse a Toast datetime string into a timezone-aware datetime (America/New_York)."""
@@ -80,7 +82,7 @@ def parse_currency(raw: str | None) -> int | None:
     if not raw:
         return None
     # Remove $ and commas, handle negative
-    cleaned = re.sub(r"[$,]", "", raw)
+    cleaned = _CURRENCY_SYMBOLS_RE.sub("", raw)
     try:
         return round(float(cleaned) * 100)
     except ValueError:
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Test the body-text field fallbacks against the local reference HTML."""
+
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+# Allow importing from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from toast_extract import _BODY_FIELD_ANCHORS, _BODY_FIELD_RES, pick_body_fields, regex_pick
+
+SAMPLE_PAGE = Path(__file__).resolve().parents[1] / "references" / "sample_page.html"
+
+# Mirrors textLines() in the order-details page helper: a line break at block
+# boundaries, cells joined by spaces, tables and scripts left out of bodyText.
+BLOCK_TAGS = {
+    "address", "article", "br", "dd", "div", "dl", "dt", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "hr", "li", "ol", "option", "p", "section", "table", "tbody", "tfoot",
+    "thead", "tr", "ul",
+}
+SKIP_TAGS = {"noscript", "script", "style", "template", "table"}
+
+
+class BodyTextParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+        self.current = ""
+        self.skipping = 0
+
+    def break_line(self) -> None:
+        line = " ".join(self.current.split())
+        if line:
+            self.lines.append(line)
+        self.current = ""
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skipping += 1
+        elif not self.skipping and tag in BLOCK_TAGS:
+            self.break_line()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skipping -= 1
+        elif not self.skipping and tag in BLOCK_TAGS:
+            self.break_line()
+        elif not self.skipping and tag in ("td", "th"):
+            self.current += " "
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.current += data
+
+
+def sample_body_texts() -> list[str]:
+    """bodyText of each .order-border block in the sample page."""
+    html = SAMPLE_PAGE.read_text(encoding="utf-8")
+    starts = [m.start() for m in re.finditer(r'<div[^>]*class="[^"]*order-border', html)]
+    texts = []
+    for start, end in zip(starts, [*starts[1:], len(html)]):
+        parser = BodyTextParser()
+        parser.feed(html[start:end])
+        parser.break_line()
+        texts.append("\n".join(parser.lines))
+    return texts
+
+
+def every_pattern(text: str) -> dict[str, str | None]:
+    """What pick_body_fields returned before anchors let it skip fields."""
+    return {field: regex_pick(text, patterns) for field, patterns in _BODY_FIELD_RES.items()}
+
+
+def run_tests() -> None:
+    assert SAMPLE_PAGE.exists(), f"Sample page not found: {SAMPLE_PAGE}"
+
+    # ── Test 1: every regex fallback field has anchor words ──
+    assert set(_BODY_FIELD_ANCHORS) == set(_BODY_FIELD_RES), "Anchor and pattern fields differ"
+    print("[TEST 1] PASSED")
+
+    # ── Test 2: sample page blocks parse the same as running every pattern ──
+    texts = sample_body_texts()
+    print(f"[TEST 2] {len(texts)} order blocks")
+    assert len(texts) == 20, f"Expected 20 order blocks, got {len(texts)}"
+    for i, text in enumerate(texts):
+        assert pick_body_fields(text) == every_pattern(text), f"Block {i} differs"
+    first = pick_body_fields(texts[0])
+    assert first["check_number"] == "1", f"Expected check 1, got {first['check_number']}"
+    assert first["revenue_center"] == "Downstairs Bar", first["revenue_center"]
+    print("[TEST 2] PASSED")
+
+    # ── Test 3: label aliases still reach their fields ──
+    cases = [
+        ("Covers: 4", "guest_count", "4"),
+        ("Guests\n3", "guest_count", "3"),
+        ("Guest Count: 2", "guest_count", "2"),
+        ("Order #123", "check_number", "123"),
+        ("ORDER # 77", "check_number", "77"),
+        ("Check #45", "check_number", "45"),
+        ("Opened:\n10/1/24, 5:00 PM", "time_opened", "10/1/24, 5:00 PM"),
+        ("Time Opened: 2/1/26 11:31 AM", "time_opened", "2/1/26 11:31 AM"),
+        ("Revenue Center:\nPatio", "revenue_center", "Patio"),
+        ("Created by: Sam", "created_by", "Sam"),
+        # Non-ASCII bodies run every pattern rather than the lowered anchor check
+        ("Gratuity: $5.00 — café", "gratuity", "5.00"),
+    ]
+    for text, field, expected in cases:
+        fields = pick_body_fields(text)
+        print(f"[TEST 3] {text!r} => {field}={fields[field]!r}")
+        assert fields[field] == expected, f"Expected {field}={expected!r} for {text!r}"
+        assert fields == every_pattern(text), f"Anchors changed the result for {text!r}"
+    print("[TEST 3] PASSED")
+
+    # ── Test 4: a body with no anchor words yields nothing ──
+    assert all(value is None for value in pick_body_fields("nothing to see here").values())
+    print("[TEST 4] PASSED")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    run_tests()
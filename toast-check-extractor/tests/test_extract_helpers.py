@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Test the pure-Python helpers in toast_extract.py that the extraction loops lean on."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Allow importing from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import toast_extract
+from toast_extract import (
+    LoweredFields,
+    MenuSummaryColumns,
+    TableColumns,
+    TokenBucket,
+    accept_order_detail_rows,
+    parse_datetime_flexible,
+    parse_retry_after,
+    pick_metadata_value,
+    pick_value,
+)
+
+
+def order_row(payment_id: str) -> dict:
+    return {"payment_id": payment_id, "payload": {}, "metadata": {}}
+
+
+async def run_tests() -> None:
+    # ── Test 1: TokenBucket hands out one start slot per interval ──
+    bucket = TokenBucket()
+    loop = asyncio.get_running_loop()
+    started: list[float] = []
+
+    async def worker() -> None:
+        await bucket.acquire(0.05)
+        started.append(loop.time())
+
+    begin = loop.time()
+    await asyncio.gather(*(worker() for _ in range(3)))
+    offsets = sorted(t - begin for t in started)
+    print(f"[TEST 1] start offsets {[round(t, 3) for t in offsets]}")
+    assert offsets[0] < 0.03 and offsets[1] >= 0.045 and offsets[2] >= 0.095, offsets
+    begin = loop.time()
+    await bucket.acquire(0.0, not_before=begin + 0.05)
+    assert loop.time() - begin >= 0.045, "not_before should delay the slot"
+    print("[TEST 1] PASSED")
+
+    # ── Test 2: MenuSummaryColumns.to_rows round-trips rows with differing keys ──
+    rows = [
+        {"item": "Burger", "qty": "2"},
+        {"item": "Fries", "net": "$4.00"},
+        {"qty": "1"},
+    ]
+    menu = MenuSummaryColumns()
+    for row in rows:
+        menu.append(row)
+    assert len(menu) == 3
+    assert menu.to_rows() == rows, menu.to_rows()
+    assert all(len(column) == 3 for column in menu.columns.values()), "Columns should stay aligned"
+    print("[TEST 2] PASSED")
+
+    # ── Test 3: parse_retry_after accepts delta-seconds only ──
+    cases = [("5", 5.0), (" 1.5 ", 1.5), ("0", 0.0), ("-3", None), ("", None), (None, None),
+             ("Wed, 21 Oct 2015 07:28:00 GMT", None)]
+    for value, expected in cases:
+        assert parse_retry_after(value) == expected, f"{value!r} => {parse_retry_after(value)!r}"
+    print("[TEST 3] PASSED")
+
+    # ── Test 4: accept_order_detail_rows returns (added, signature) ──
+    seen: set[str] = set()
+    accepted: list[dict] = []
+    added, signature = accept_order_detail_rows([order_row("a"), order_row("b")], seen, accepted)
+    assert added == 2 and isinstance(signature, str) and len(signature) == 16, (added, signature)
+    assert [row["payment_id"] for row in accepted] == ["a", "b"]
+    added, again = accept_order_detail_rows([order_row("b"), order_row("a")], seen, accepted)
+    assert added == 0 and again == signature, "A repeated page should hash the same in any order"
+    assert accept_order_detail_rows([{"payload": {}}], seen, accepted) == (0, "")
+    limited: list[dict] = []
+    added, _ = accept_order_detail_rows([order_row(str(n)) for n in range(5)], set(), limited, limit=2)
+    assert added == 2 and len(limited) == 2, "The limit should stop the page early"
+    print("[TEST 4] PASSED")
+
+    # ── Test 5: parse_datetime_flexible caches the format per input shape ──
+    toast_extract._DATETIME_FORMAT_BY_SHAPE.clear()
+    first = parse_datetime_flexible("1/2/25, 3:04 PM")
+    assert first is not None and (first.month, first.day, first.hour) == (1, 2, 15), first
+    assert toast_extract._DATETIME_FORMAT_BY_SHAPE == {"9/9/99, 9:99 aa": ("%m/%d/%y, %I:%M %p", False)}
+    second = parse_datetime_flexible("5/6/25, 7:08 AM")
+    assert second is not None and (second.month, second.day, second.hour, second.minute) == (5, 6, 7, 8)
+    assert len(toast_extract._DATETIME_FORMAT_BY_SHAPE) == 1, "Same shape should reuse the cached format"
+    iso = parse_datetime_flexible("2025-01-02T03:04:05+00:00")
+    assert iso is not None and iso.utcoffset() is not None and iso.hour == 3
+    assert parse_datetime_flexible("13/01/2025") is None
+    assert parse_datetime_flexible("") is None and parse_datetime_flexible(None) is None
+    print("[TEST 5] PASSED")
+
+    # ── Test 6: TableColumns picks by candidate order and keeps the rightmost repeat ──
+    columns = TableColumns(["item", "qty", "price", "qty", "net price"])
+    row = ["Burger", "1", "$10.00", "2", "$9.00"]
+    assert columns.pick(row, "qty") == "2", "Repeated header should keep its rightmost cell"
+    assert columns.pick(row, "net", "price") == "$9.00", "Candidate order should win over column order"
+    assert columns.pick(["Burger", "1", "", "2", "  "], "price") is None, "Blank cells should be skipped"
+    assert columns.pick(["Burger"], "qty") is None, "Short rows should not raise"
+    assert columns.first_containing(row, "price", excluding="net") == "$10.00"
+    assert columns.get(row, "item") == "Burger"
+    assert columns.get(row, "missing") is None
+    print("[TEST 6] PASSED")
+
+    # ── Test 7: LoweredFields lowers labels once; metadata lookups let the last label win ──
+    fields = LoweredFields({"Server": "Ann", "Guest Count": "", "GUESTS": "4", "server": "Bob"})
+    assert fields.fields[0] == ("server", "Ann")
+    assert fields.by_label["server"] == "Bob", "Case-only duplicates should keep the last value"
+    assert pick_value(fields, ["guest"]) == "4", "Empty values should be skipped"
+    assert pick_value(fields, ["table"]) is None
+    assert pick_metadata_value(fields, ["Server"]) == "Bob"
+    assert pick_metadata_value(LoweredFields(None), ["server"]) is None
+    print("[TEST 7] PASSED")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_tests())
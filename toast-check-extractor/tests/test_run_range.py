@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Test run_range.py's resume completeness check, day-launch pacing and output scanning."""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+# Allow importing from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from run_range import TokenBucket, _looks_complete, build_day_jobs, iter_stream_lines, run_day_async
+
+
+def looks_complete(directory: Path, name: str, text: str) -> bool | None:
+    path = directory / name
+    path.write_text(text, encoding="utf-8")
+    return _looks_complete(path, path.stat().st_size)
+
+
+# Stands in for toast_extract.py: one line longer than the 8MB pipe limit, then the summary.
+FAKE_EXTRACTOR = """
+import sys
+sys.stdout.write("x" * (9 * 1024 * 1024) + "\\n")
+sys.stdout.write('{"event": "run_complete", "total": 3, "complete": 2, "incomplete": 1}\\n')
+sys.stderr.write("429 Too Many Requests\\n")
+"""
+
+
+async def read_lines(data: bytes, limit: int) -> list[bytes]:
+    stream = asyncio.StreamReader(limit=limit)
+    stream.feed_data(data)
+    stream.feed_eof()
+    return [line async for line in iter_stream_lines(stream)]
+
+
+async def run_tests() -> None:
+    # ── Test 1: _looks_complete only vouches for finished documents ──
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        done = '{"from_date": "2025-01-01", "checks": [{"payment_id": "1"}]}\n'
+        assert looks_complete(directory, "done.json", done) is True
+        padded = '{"from_date": "2025-01-01", "pad": "' + "x" * 4096 + '", "checks": []}'
+        assert looks_complete(directory, "padded.json", padded) is True
+        assert looks_complete(directory, "truncated.json", done[:40]) is None
+        assert looks_complete(directory, "no_date.json", '{"checks": []}') is None
+        assert looks_complete(directory, "not_checks.json", '{"from_date": "x", "n": 1}') is None
+        assert looks_complete(directory, "empty.json", "") is None
+    print("[TEST 1] PASSED")
+
+    # ── Test 2: TokenBucket backs off on throttle and recovers up to the cap ──
+    bucket = TokenBucket(1.0, floor=0.1)
+    assert bucket.interval == 1.0
+    bucket.on_throttle()
+    assert bucket.rate == 0.5 and bucket.tokens == 0.0, (bucket.rate, bucket.tokens)
+    for _ in range(5):
+        bucket.on_throttle()
+    assert bucket.rate == 0.1, f"Rate should clamp to the floor, got {bucket.rate}"
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.rate == 1.0, f"Rate should recover to the cap, got {bucket.rate}"
+    print("[TEST 2] PASSED")
+
+    # ── Test 3: TokenBucket.acquire spends the initial token, then waits for a refill ──
+    bucket = TokenBucket(20.0, floor=1.0)
+    begin = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - begin < 0.03, "The first launch should not wait"
+    await bucket.acquire()
+    waited = time.monotonic() - begin
+    print(f"[TEST 3] second launch after {waited:.3f}s")
+    assert waited >= 0.045, "The second launch should wait about one interval"
+    print("[TEST 3] PASSED")
+
+    # ── Test 4: lines over the reader limit arrive in pieces instead of raising ──
+    data = b"short\n" + b"x" * 40 + b"\nafter\n" + b"y" * 20 + b"\ntail"
+    lines = await read_lines(data, limit=16)
+    print(f"[TEST 4] {len(lines)} pieces")
+    assert b"".join(lines) == data, "No output should be lost"
+    assert lines[0] == b"short\n" and lines[-1] == b"tail"
+    assert b"after\n" in lines, "Lines after an oversized one should still be whole"
+    assert all(len(line) <= 41 for line in lines), lines
+    print("[TEST 4] PASSED")
+
+    # ── Test 5: run_day_async scans past an oversized line and reaps the child ──
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        script = directory / "fake_extract.py"
+        script.write_text(FAKE_EXTRACTOR, encoding="utf-8")
+        job = build_day_jobs([date(2025, 1, 1)], str(directory / "output"), directory)[0]
+        args = argparse.Namespace(extract_script=str(script), user_data_dir=str(directory / "profile"))
+        stats = await run_day_async(job, args, slot=0)
+    print(f"[TEST 5] {stats}")
+    assert stats["exit_code"] == 0, stats
+    assert (stats["total"], stats["complete"], stats["incomplete"]) == (3, 2, 1), stats
+    assert stats["throttled"] is True
+    print("[TEST 5] PASSED")
+
+    # ── Test 6: concurrent days get their own error log and artifact directory ──
+    jobs = build_day_jobs([date(2025, 1, 1), date(2025, 1, 2)], "output", Path("/tmp/range"))
+    assert len({job.error_log_file for job in jobs}) == 2
+    assert len({job.artifact_dir for job in jobs}) == 2
+    assert jobs[0].error_log_file == Path("output/toast_errors/2025-01-01.jsonl")
+    assert jobs[0].artifact_dir == Path("output/toast_artifacts/2025-01-01")
+    print("[TEST 6] PASSED")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_tests())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Test schema.py's DDL statement splitter."""
+
+import sys
+from pathlib import Path
+
+# Allow importing from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from schema import split_sql
+
+
+def run_tests() -> None:
+    # ── Test 1: split_sql splits on top-level semicolons only ──
+    script = """
+    -- leading comment; not a statement
+    CREATE TABLE a (note TEXT DEFAULT 'x;y');
+    CREATE FUNCTION f() RETURNS void AS $$ BEGIN PERFORM 1; END $$ LANGUAGE plpgsql;
+    DO $body$ BEGIN RAISE NOTICE 'a;b'; END $body$;
+    SELECT 'it''s; fine' AS note -- trailing; comment
+    ;
+    -- only a comment;
+    """
+    statements = split_sql(script)
+    print(f"[TEST 1] {len(statements)} statements")
+    assert len(statements) == 4, statements
+    assert statements[0].startswith("-- leading comment") and statements[0].endswith("'x;y')")
+    assert "PERFORM 1; END $$" in statements[1]
+    assert "'a;b'; END $body$" in statements[2]
+    assert statements[3].startswith("SELECT 'it''s; fine' AS note")
+    print("[TEST 1] PASSED")
+
+    # ── Test 2: empty and comment-only scripts yield no statements ──
+    assert split_sql("") == []
+    assert split_sql("-- nothing here;") == []
+    assert split_sql("  ;\n;  ") == []
+    print("[TEST 2] PASSED")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    run_tests()